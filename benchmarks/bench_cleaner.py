@@ -0,0 +1,72 @@
+# benchmarks/bench_cleaner.py - per-record cost of clean_text before/after on a mixed raw corpus
+#
+#   python benchmarks/bench_cleaner.py --n 100000
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import PLATFORMS, make_raw_text
+from utils.cleaner import HTML_PLATFORMS, clean_batch, clean_text
+
+
+def legacy_clean_text(text):
+    """The original implementation: four string-pattern re.sub calls (plus Mastodon's inline tag strip)."""
+    if not text:
+        return ""
+    text = re.sub(r"http\S+", "", text)
+    text = re.sub(r"[\r\n\t]+", " ", text)
+    text = re.sub(r"[^\w\s\'\"]", "", text)
+    text = re.sub(r"\s+", " ", text).strip()
+    return text
+
+
+def legacy_mastodon(text):
+    return legacy_clean_text(re.sub('<[^<]+?>', '', text))
+
+
+PLAIN_ANGLE_BRACKETS = [
+    "I <3 python but x > y here",
+    "if a<b and c>d then",
+    "price < 5 and > 2 dollars",
+    "List<String> vs <T> generics in Java",
+]
+
+
+def per_record(label, fn, texts):
+    start = time.perf_counter()
+    fn(texts)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed * 1e6 / len(texts):8.2f} µs/record")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n", type=int, default=100_000)
+    args = parser.parse_args()
+
+    rng = random.Random(3)
+    corpus = [(p, make_raw_text(rng, p)) for p in (PLATFORMS[i % len(PLATFORMS)] for i in range(args.n))]
+    texts = [t for _, t in corpus]
+
+    before = per_record("original (re.sub x4)",
+                        lambda ts: [legacy_mastodon(t) if p == "mastodon" else legacy_clean_text(t) for p, t in corpus],
+                        texts)
+    flags = [p in HTML_PLATFORMS for p, _ in corpus]
+    after = per_record("clean_text (fused)", lambda ts: [clean_text(t, h) for t, h in zip(ts, flags)], texts)
+    per_record("clean_batch", lambda ts: clean_batch(ts, html=flags), texts)
+    print(f"speedup: {before / after:.1f}x")
+
+    # Plain text keeps "<" and ">" as content, never as tags
+    plain = [t for p, t in corpus if p not in HTML_PLATFORMS] + PLAIN_ANGLE_BRACKETS
+    same = sum(legacy_clean_text(t) == clean_text(t) for t in plain)
+    print(f"identical output on non-HTML records: {same}/{len(plain)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# benchmarks/bench_columnar.py - analysis load time: SQLite vs the partitioned Parquet export
+#
+#   python benchmarks/bench_columnar.py                      # 100k and 1M rows in temp directories
+#   python benchmarks/bench_columnar.py --rows 1000000 --repeat 5
+#
+# Builds a SQLite corpus with the pipeline's writer, exports it with
+# utils.columnar, then times the same reads through utils.visualizer against
+# each backend (pandas DataFrames on both sides).
+import argparse
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from benchmarks.synthetic import iter_records
+from utils import columnar, visualizer
+from utils.database import DatabaseWriter
+
+
+def timed(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), result
+
+
+def cases(db_path, parquet_dir):
+    """(label, sqlite fn, parquet fn) for the reads the dashboard and analysis do."""
+    def sqlite_full():
+        conn = sqlite3.connect(db_path)
+        try:
+            # What the charts originally did: the whole table into pandas
+            return pd.read_sql("SELECT * FROM osint_data", conn)
+        finally:
+            conn.close()
+
+    def load(**kw):
+        return (lambda: visualizer.load_posts(db_path=db_path, parquet_dir=None, **kw),
+                lambda: visualizer.load_posts(db_path=db_path, parquet_dir=parquet_dir, **kw))
+
+    def sentiment():
+        return (lambda: visualizer.sentiment_by_platform(db_path, parquet_dir=None),
+                lambda: visualizer.sentiment_by_platform(db_path, parquet_dir=parquet_dir))
+
+    full_cols = [c for c in visualizer.POST_COLUMNS if c != "date"]
+    return [
+        ("full table, all columns", sqlite_full,
+         lambda: columnar.read_table(full_cols + ["platform"], out_dir=parquet_dir).to_pandas(types_mapper=pd.ArrowDtype)),
+        ("platform, ts, sentiment (all rows)", *load()),
+        ("one platform, one week", *load(platform="reddit", since="2025-10-08", until="2025-10-15")),
+        ("text of one platform, one day", *load(columns=("ts", "text"), platform="mastodon",
+                                                 since="2025-10-10", until="2025-10-11")),
+        ("avg sentiment by platform", *sentiment()),
+    ]
+
+
+def run(rows, repeat):
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        parquet_dir = os.path.join(tmp, "parquet")
+        start = time.perf_counter()
+        with DatabaseWriter(db_path, batch_size=5000) as writer:
+            writer.write(iter_records(rows, seed=11))
+        built = time.perf_counter() - start
+        start = time.perf_counter()
+        columnar.export_new_rows(db_path, parquet_dir)
+        exported = time.perf_counter() - start
+        sqlite_mb = os.path.getsize(db_path) / 1e6
+        parquet_mb = sum(os.path.getsize(os.path.join(d, f)) for d, _, fs in os.walk(parquet_dir) for f in fs) / 1e6
+        print(f"\n== {rows:,} rows: SQLite {sqlite_mb:.0f} MB (built in {built:.1f}s), "
+              f"Parquet {parquet_mb:.0f} MB (exported in {exported:.1f}s)")
+        print(f"   {'read':<38} {'sqlite':>9} {'parquet':>9} {'speedup':>8} {'rows':>9}")
+        for label, sqlite_fn, parquet_fn in cases(db_path, parquet_dir):
+            t_sqlite, a = timed(sqlite_fn, repeat)
+            t_parquet, b = timed(parquet_fn, repeat)
+            assert len(a) == len(b), (label, len(a), len(b))
+            print(f"   {label:<38} {t_sqlite * 1000:7.1f}ms {t_parquet * 1000:7.1f}ms "
+                  f"{t_sqlite / t_parquet:7.1f}x {len(a):9,d}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite vs Parquet load time for analysis reads")
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=3, help="runs per read (median reported)")
+    args = parser.parse_args()
+    for n in args.rows:
+        run(n, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
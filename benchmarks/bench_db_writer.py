@@ -0,0 +1,112 @@
+# benchmarks/bench_db_writer.py - rows/sec of save_to_db: per-row legacy vs batched writer
+#
+#   python benchmarks/bench_db_writer.py                 # 10k, 100k, 1M
+#   python benchmarks/bench_db_writer.py --sizes 10000
+#   python benchmarks/bench_db_writer.py --writers 3     # also N processes into one database
+import argparse
+import multiprocessing
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import make_records
+from utils.database import DatabaseWriter, INSERT_SQL, _row, check_daily_sentiment, init_db
+
+
+def legacy_save_to_db(records, db_path):
+    """The original implementation: init_db + one execute per record.
+
+    Rows carry the current columns (ts, content_hash), so both sides pay the
+    same index and FTS costs and only the write strategy differs.
+    """
+    init_db(db_path)
+    conn = sqlite3.connect(db_path)
+    cur = conn.cursor()
+    inserted = 0
+    for r in records:
+        try:
+            cur.execute(INSERT_SQL, _row(r))
+            if cur.rowcount == 1:
+                inserted += 1
+        except Exception:
+            continue
+    conn.commit()
+    conn.close()
+    return inserted
+
+
+def run(impl, records, chunk):
+    """Time saving `records` in pipeline-sized chunks to a fresh database."""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        start = time.perf_counter()
+        inserted = 0
+        if impl == "legacy":
+            for i in range(0, len(records), chunk):
+                inserted += legacy_save_to_db(records[i:i + chunk], db_path)
+        else:
+            # The pipeline keeps one writer (and connection) for the whole run
+            with DatabaseWriter(db_path) as writer:
+                for i in range(0, len(records), chunk):
+                    inserted += writer.write(records[i:i + chunk])
+        elapsed = time.perf_counter() - start
+        if impl != "legacy":
+            aggregated, scored = check_daily_sentiment(db_path)
+            assert aggregated == scored, ("daily_sentiment", aggregated, scored)
+    assert inserted == len(records), (impl, inserted, len(records))
+    return elapsed
+
+
+def _write_share(db_path, records, chunk):
+    with DatabaseWriter(db_path) as writer:
+        for i in range(0, len(records), chunk):
+            writer.write(records[i:i + chunk])
+
+
+def run_concurrent(records, chunk, writers):
+    """Time `writers` processes saving disjoint shares of `records` to one database.
+
+    Backfill workers and scheduled runs write concurrently; the aggregates
+    must still count every row exactly once.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        init_db(db_path)
+        procs = [multiprocessing.Process(target=_write_share, args=(db_path, records[k::writers], chunk))
+                 for k in range(writers)]
+        start = time.perf_counter()
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join()
+        elapsed = time.perf_counter() - start
+        assert all(p.exitcode == 0 for p in procs), [p.exitcode for p in procs]
+        aggregated, scored = check_daily_sentiment(db_path)
+    assert aggregated == scored == len(records), ("daily_sentiment", aggregated, scored, len(records))
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--chunk", type=int, default=500, help="records per save_to_db call (pipeline chunk size)")
+    parser.add_argument("--writers", type=int, default=0, help="also time N concurrent writer processes")
+    args = parser.parse_args()
+
+    print(f"{'rows':>9}  {'legacy rows/s':>14}  {'batched rows/s':>15}  speedup")
+    for n in args.sizes:
+        records = make_records(n)
+        legacy = run("legacy", records, args.chunk)
+        batched = run("batched", records, args.chunk)
+        print(f"{n:>9}  {n / legacy:>14,.0f}  {n / batched:>15,.0f}  {legacy / batched:6.1f}x")
+        if args.writers > 1:
+            concurrent = run_concurrent(records, args.chunk, args.writers)
+            print(f"{'':>9}  {args.writers} writers: {n / concurrent:,.0f} rows/s, daily_sentiment matches")
+
+
+if __name__ == "__main__":
+    main()
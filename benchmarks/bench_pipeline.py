@@ -0,0 +1,246 @@
+# benchmarks/bench_pipeline.py - every pipeline stage, isolated and end to end, on synthetic corpora
+#
+#   python benchmarks/bench_pipeline.py                                  # 1k, 100k, 1M records
+#   python benchmarks/bench_pipeline.py --sizes 1000 10000 --latency 0.05 --fail-rate 0.01
+#   python benchmarks/bench_pipeline.py --sizes 10000 --compare benchmarks/results/<earlier>.json
+#
+# Each size runs in a fresh interpreter with OSINT_DATA_DIR set to a temporary
+# directory, so the live data/ (osint.db, dedupe index, caches) is never read
+# or written. Per size it measures:
+#   functions  each stage function alone, single-threaded, over the corpus in
+#              pipeline-sized chunks: clean_text (normalize), is_english
+#              (language filter), dedupe, add_sentiment (score), save_to_db,
+#              then the visualizer queries and chart rendering (forced, then
+#              with nothing changed) on the resulting database
+#   pipeline   run_pipeline() end to end with mock collectors (see
+#              mock_collectors.py), reporting wall/CPU/backpressure per stage
+#              from utils.metrics
+# Results are written as JSON to benchmarks/results/ (named by time and git
+# commit) so runs on different commits can be compared with --compare.
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def bench_functions(n, chunk, seed, data_dir):
+    """Time each stage function on its own, feeding each the previous one's output chunk by chunk."""
+    import main
+    from benchmarks.mock_collectors import mock_collectors
+    from utils import sentiment
+    from utils.cache import LRUCache
+    from utils import visualizer
+    from utils.database import DatabaseWriter, check_daily_sentiment, get_daily_sentiment, get_top_terms
+    from utils.dedupe import NearDuplicateIndex
+    from utils.language import LanguageFilter
+
+    db_path = os.path.join(data_dir, "functions.db")
+    language_filter = LanguageFilter(cache=LRUCache())
+    dedupe = NearDuplicateIndex(os.path.join(data_dir, "functions_dedupe.db"))
+    writer = DatabaseWriter(db_path)
+    sentiment._cache.clear()
+
+    steps = [
+        ("clean_text", main._normalize),
+        ("is_english", language_filter.filter),
+        ("dedupe", dedupe.filter),
+        ("add_sentiment", main._score),
+        ("save_to_db", writer.write),
+    ]
+    totals = {name: {"seconds": 0.0, "records_in": 0, "records_out": 0} for name, _ in steps}
+
+    def run_chunk(records):
+        for name, fn in steps:
+            start = time.perf_counter()
+            out = fn(records)
+            stat = totals[name]
+            stat["seconds"] += time.perf_counter() - start
+            stat["records_in"] += len(records)
+            stat["records_out"] += out if isinstance(out, int) else len(out)
+            if isinstance(out, int) or not out:
+                return
+            records = out
+        dedupe.commit()
+
+    # The same corpus the pipeline pass collects, without simulated latency or failures
+    buf = []
+    for record in (r for c in mock_collectors(n, seed=seed) for r in c.fetch(c.queries[0], c.limit)):
+        buf.append(record)
+        if len(buf) >= chunk:
+            run_chunk(buf)
+            buf = []
+    if buf:
+        run_chunk(buf)
+    dedupe.close()
+    writer.close()
+    aggregated, scored = check_daily_sentiment(db_path)
+    assert aggregated == scored, ("daily_sentiment", aggregated, scored)
+
+    visualizer.OUTDIR = os.path.join(data_dir, "charts")
+    for name, fn in (("query_sentiment_by_platform", lambda: visualizer.sentiment_by_platform(db_path)),
+                     ("query_daily_sentiment", lambda: get_daily_sentiment(db_path=db_path)),
+                     ("query_top_terms", lambda: get_top_terms(20, db_path=db_path)),
+                     ("render_charts", lambda: visualizer.render_charts(db_path, force=True)),
+                     ("render_charts_unchanged", lambda: visualizer.render_charts(db_path))):
+        start = time.perf_counter()
+        rows = fn()
+        totals[name] = {"seconds": time.perf_counter() - start, "records_in": 0, "records_out": len(rows)}
+
+    for stat in totals.values():
+        stat["seconds"] = round(stat["seconds"], 4)
+        stat["per_sec"] = round(stat["records_in"] / stat["seconds"], 1) if stat["records_in"] and stat["seconds"] else None
+    return totals
+
+
+def bench_pipeline(n, seed, latency, fail_rate, page_size):
+    """run_pipeline() end to end against mock collectors; stage numbers come from utils.metrics."""
+    import main
+    from benchmarks.mock_collectors import mock_collectors
+    from utils import language, sentiment
+    from utils.metrics import last_run
+
+    sentiment._cache.clear()
+    language._shared_cache.clear()
+    # Generating a million synthetic records in one collector thread outlasts the default deadline
+    collectors = mock_collectors(n, seed=seed, latency=latency, fail_rate=fail_rate,
+                                 page_size=page_size, timeout=24 * 3600)
+    start = time.perf_counter()
+    counts = main.run_pipeline(visualize=False, collectors=collectors)
+    wall = time.perf_counter() - start
+    metrics = last_run().to_dict()
+    return {"wall": round(wall, 4), "cpu": metrics["cpu"], "counts": counts, "stages": metrics["stages"],
+            "collectors": metrics["collectors"], "drops": metrics["drops"]}
+
+
+def child(args):
+    """Runs in the per-size subprocess (OSINT_DATA_DIR is already set)."""
+    data_dir = os.environ["OSINT_DATA_DIR"]
+    result = {"records": args.child,
+              "functions": bench_functions(args.child, args.chunk, args.seed, data_dir)}
+    result["pipeline"] = bench_pipeline(args.child, args.seed, args.latency, args.fail_rate, args.page_size)
+    result["peak_rss_mb"] = round(_peak_rss_mb(), 1)
+    with open(args.child_out, "w", encoding="utf-8") as fh:
+        json.dump(result, fh)
+
+
+def run_size(n, args):
+    with tempfile.TemporaryDirectory(prefix="osint-bench-") as tmp:
+        out = os.path.join(tmp, "result.json")
+        env = dict(os.environ, OSINT_DATA_DIR=tmp, HTTP_CACHE="off")
+        cmd = [sys.executable, os.path.abspath(__file__), "--child", str(n), "--child-out", out,
+               "--chunk", str(args.chunk), "--seed", str(args.seed), "--latency", str(args.latency),
+               "--fail-rate", str(args.fail_rate), "--page-size", str(args.page_size)]
+        log = None if args.verbose else subprocess.DEVNULL
+        subprocess.run(cmd, cwd=ROOT, env=env, stdout=log, check=True)
+        with open(out, encoding="utf-8") as fh:
+            return json.load(fh)
+
+
+def git_commit():
+    try:
+        sha = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                             text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT,
+                               capture_output=True, text=True).stdout.strip()
+        return sha + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def print_size(result):
+    n = result["records"]
+    print(f"\n== {n:,} records (peak RSS {result['peak_rss_mb']:.0f} MB)")
+    print(f"   {'function':<28} {'seconds':>9} {'in':>9} {'out':>9} {'records/s':>11}")
+    for name, s in result["functions"].items():
+        rate = f"{s['per_sec']:11,.0f}" if s["per_sec"] else f"{'':>11}"
+        print(f"   {name:<28} {s['seconds']:9.3f} {s['records_in']:9d} {s['records_out']:9d} {rate}")
+    p = result["pipeline"]
+    print(f"   run_pipeline: {p['wall']:.2f}s wall, {p['cpu']:.2f}s cpu, "
+          f"{p['counts']['saved']:,} saved, {n / p['wall']:,.0f} records/s")
+    print(f"   {'stage':<28} {'wall':>9} {'cpu':>9} {'in':>9} {'out':>9} {'blocked':>9}")
+    for name, s in p["stages"].items():
+        if "wall" in s:
+            print(f"   {name:<28} {s['wall']:9.3f} {s['cpu']:9.3f} {s['records_in']:9d} "
+                  f"{s['records_out']:9d} {s['blocked']:9.3f}")
+
+
+def compare(old_path, new):
+    """Print new/old time ratios for every function and stage present in both runs."""
+    with open(old_path, encoding="utf-8") as fh:
+        old = json.load(fh)
+    print(f"\nvs {os.path.basename(old_path)} (commit {old.get('commit')}): new/old time, <1 is faster")
+    for size, result in new["sizes"].items():
+        before = old["sizes"].get(size)
+        if before is None:
+            continue
+        print(f"   {int(size):,} records")
+        rows = [(name, before["functions"].get(name, {}).get("seconds"), s["seconds"])
+                for name, s in result["functions"].items()]
+        rows += [(f"pipeline/{name}", before["pipeline"]["stages"].get(name, {}).get("wall"), s["wall"])
+                 for name, s in result["pipeline"]["stages"].items() if "wall" in s]
+        rows.append(("pipeline total", before["pipeline"]["wall"], result["pipeline"]["wall"]))
+        for name, was, now in rows:
+            if was:
+                print(f"      {name:<34} {was:9.3f}s -> {now:9.3f}s  {now / was:6.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline per-stage and end-to-end pipeline benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000, 1_000_000])
+    parser.add_argument("--chunk", type=int, default=500, help="records per call in the isolated function pass")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.0, help="mock API seconds per page")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="probability a mock page fails")
+    parser.add_argument("--page-size", type=int, default=100, help="records per mock API page")
+    parser.add_argument("--out", help="results file (default benchmarks/results/<time>-<commit>.json)")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    parser.add_argument("--verbose", action="store_true", help="show the pipeline's own output")
+    parser.add_argument("--child", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--child-out", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        child(args)
+        return
+
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "options": {"chunk": args.chunk, "seed": args.seed, "latency": args.latency,
+                    "fail_rate": args.fail_rate, "page_size": args.page_size},
+        "sizes": {},
+    }
+    for n in args.sizes:
+        result = run_size(n, args)
+        report["sizes"][str(n)] = result
+        print_size(result)
+
+    out = args.out or os.path.join(RESULTS_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{report['commit']}.json")
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w", encoding="utf-8") as fh:
+        json.dump(report, fh, indent=2)
+    print(f"\nresults written to {out}")
+    if args.compare:
+        compare(args.compare, report)
+
+
+if __name__ == "__main__":
+    main()
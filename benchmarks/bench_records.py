@@ -0,0 +1,82 @@
+# benchmarks/bench_records.py - memory per record: collector dicts + cleaned copies vs in-place Records
+#
+#   python benchmarks/bench_records.py --n 100000
+#
+# Field values (texts, urls, users) are generated before tracing starts and
+# shared by both layouts, so the numbers are the cost of the representation:
+# containers, the cleaned copy, and the sentiment float.
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import make_records
+from utils.record import Record
+
+
+def legacy(values):
+    """Original shape: collector dicts, then a new cleaned dict per record plus a sentiment key."""
+    raw = [{"platform": p, "user": u, "timestamp": t, "text": x, "url": l, "ts": ts, "lang": "en"}
+           for p, u, t, x, l, ts in values]
+    cleaned = []
+    for r in raw:
+        cleaned.append({
+            "platform": r.get("platform"),
+            "user": r.get("user", "unknown"),
+            "timestamp": r.get("timestamp", ""),
+            "text": r["text"],
+            "url": r.get("url", ""),
+            "lang": r.get("lang"),
+            "ts": r.get("ts"),
+        })
+    for i, c in enumerate(cleaned):
+        c["sentiment"] = i / (len(cleaned) + 1.0)
+    return raw, cleaned
+
+
+def slotted(values):
+    """Records produced by the collectors and updated in place by normalize/score."""
+    records = [Record(platform=p, user=u, timestamp=t, text=x, url=l, ts=ts, lang="en")
+               for p, u, t, x, l, ts in values]
+    for i, r in enumerate(records):
+        r.text = r.text
+        r.sentiment = i / (len(records) + 1.0)
+    return records
+
+
+def measure(fn, values):
+    gc.collect()
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    kept = fn(values)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return current, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="tracemalloc bytes per record, dict vs Record")
+    parser.add_argument("--n", type=int, default=100_000)
+    args = parser.parse_args()
+
+    # Epoch ints are created here too, so neither layout is charged for them
+    values = [(r.platform, r.user, r.timestamp, r.text, r.url, 1_760_000_000 + i)
+              for i, r in enumerate(make_records(args.n, seed=3))]
+    n = len(values)
+
+    print(f"{'layout':<34} {'bytes/record':>13} {'peak bytes/record':>18}")
+    results = {}
+    for label, fn in (("dicts (raw + cleaned copy)", legacy), ("Record (__slots__, in place)", slotted)):
+        current, peak = measure(fn, values)
+        results[label] = current
+        print(f"{label:<34} {current / n:13.0f} {peak / n:18.0f}")
+    before, after = results.values()
+    print(f"\nRecord layout uses {after / before:.0%} of the dict layout ({(before - after) / n:.0f} bytes/record saved)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+# benchmarks/bench_search.py - FTS5 search latency vs a LIKE scan on a synthetic corpus
+#
+#   python benchmarks/bench_search.py                    # 1M rows in a temp database
+#   python benchmarks/bench_search.py --rows 100000 --repeat 20
+#   python benchmarks/bench_search.py --db /tmp/corpus.db   # build once, reuse on later runs
+import argparse
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import iter_records
+from utils.database import DatabaseWriter
+from utils.search import search
+
+# Rare tokens planted in a small share of posts, like IOCs or handles an analyst hunts for
+IOC = "cve20243094"
+HANDLE = "darkleaks"
+IOC_EVERY = 10_000
+HANDLE_EVERY = 1_000
+
+
+def corpus(n):
+    for i, r in enumerate(iter_records(n, seed=7)):
+        if i % IOC_EVERY == 0:
+            r["text"] += f" {IOC}"
+        if i % HANDLE_EVERY == 0:
+            r["text"] = f"{HANDLE} " + r["text"]
+        yield r
+
+
+def build(db_path, n):
+    start = time.perf_counter()
+    with DatabaseWriter(db_path, batch_size=5000) as writer:
+        inserted = writer.write(corpus(n))
+    return inserted, time.perf_counter() - start
+
+
+def timed(fn, repeat):
+    samples = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    return statistics.median(samples), p95, result
+
+
+def like_scan(db_path, term, limit=20):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute("SELECT id FROM osint_data WHERE text LIKE ? LIMIT ?", (f"%{term}%", limit)).fetchall()
+    finally:
+        conn.close()
+
+
+def like_count(db_path, term):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM osint_data WHERE text LIKE ?", (f"%{term}%",)).fetchone()
+    finally:
+        conn.close()
+
+
+def run(db_path, repeat):
+    # Synthetic posts span 2025-10-01 .. 2025-10-28
+    week = dict(since="2025-10-08", until="2025-10-15")
+    cases = [
+        (f"rare term ({IOC})", lambda: search(IOC, db_path=db_path)),
+        (f"handle ({HANDLE})", lambda: search(HANDLE, db_path=db_path)),
+        (f"handle + platform + 7 days", lambda: search(HANDLE, platform="reddit", db_path=db_path, **week)),
+        ("phrase \"credential dump\"", lambda: search("credential dump", mode="phrase", db_path=db_path)),
+        ("two common terms", lambda: search("ransomware botnet", db_path=db_path)),
+        ("prefix phish*", lambda: search("phish*", mode="raw", db_path=db_path)),
+        (f"LIKE '%{IOC}%' (first 20)", lambda: like_scan(db_path, IOC)),
+        (f"LIKE '%{IOC}%' (count)", lambda: like_count(db_path, IOC)),
+    ]
+    print(f"{'query':<36} {'p50 ms':>9} {'p95 ms':>9}  hits")
+    for label, fn in cases:
+        p50, p95, result = timed(fn, repeat)
+        hits = result[0] if label.endswith("(count)") else len(result)
+        print(f"{label:<36} {p50:9.2f} {p95:9.2f}  {hits}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--db", help="corpus database to build (if missing) and reuse")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = args.db or os.path.join(tmp, "search.db")
+        if not os.path.exists(db_path):
+            inserted, elapsed = build(db_path, args.rows)
+            print(f"built {inserted:,} rows with FTS sync in {elapsed:.1f}s ({inserted / elapsed:,.0f} rows/s)")
+        run(db_path, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+# benchmarks/bench_sentiment.py - sentiment throughput and agreement with TextBlob
+#
+#   python benchmarks/bench_sentiment.py --n 20000 --workers 4
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from textblob import TextBlob
+
+from benchmarks.synthetic import make_records
+from utils import sentiment
+
+
+def timed(label, n, fn):
+    sentiment._cache.clear()
+    start = time.perf_counter()
+    out = fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<34} {elapsed:8.2f}s  {n / elapsed:>10,.0f} texts/s")
+    return np.asarray(out, dtype=np.float64)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n", type=int, default=20_000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    args = parser.parse_args()
+
+    texts = [r["text"] for r in make_records(args.n, seed=7)]
+
+    reference = timed("TextBlob loop (original)", args.n,
+                      lambda: [TextBlob(t).sentiment.polarity for t in texts])
+    timed("score_batch textblob, 1 process", args.n,
+          lambda: sentiment.score_batch(texts, backend="textblob", workers=1))
+    timed(f"score_batch textblob, {args.workers} processes", args.n,
+          lambda: sentiment.score_batch(texts, backend="textblob", workers=args.workers, min_parallel=0))
+    lexicon = timed("score_batch lexicon, 1 process", args.n,
+                    lambda: sentiment.score_batch(texts, backend="lexicon", workers=1))
+
+    print()
+    print("lexicon vs TextBlob agreement")
+    print(f"  exact (|diff| < 1e-9): {np.mean(np.abs(lexicon - reference) < 1e-9):.2%}")
+    print(f"  same sign:             {np.mean(np.sign(lexicon) == np.sign(reference)):.2%}")
+    print(f"  mean abs error:        {np.mean(np.abs(lexicon - reference)):.4f}")
+    print(f"  pearson r:             {np.corrcoef(lexicon, reference)[0, 1]:.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+# benchmarks/bench_startup.py - cold-start import cost of the pipeline entry points
+#
+#   python benchmarks/bench_startup.py                     # import main, 5 fresh interpreters
+#   python benchmarks/bench_startup.py --module run_scheduler --repeat 10 --top 25
+#
+# Each sample runs `python -X importtime -c "import <module>"` in a new
+# process and parses the per-module timings it writes to stderr.
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Libraries that should only load when their stage or source actually runs
+HEAVY = ("numpy", "pandas", "matplotlib", "pyarrow", "praw", "tweepy", "mastodon", "linkedin_api", "textblob", "nltk", "langdetect", "requests")
+
+
+def sample(module):
+    """Return {module: (self_us, cumulative_us)} for one cold import of `module`."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    timings = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        timings[name.strip()] = (int(self_us), int(cumulative_us))
+    return timings
+
+
+def run(module, repeat, top):
+    samples = [sample(module) for _ in range(repeat)]
+    totals = [s[module][1] / 1000 for s in samples if module in s]
+    print(f"import {module}: median {statistics.median(totals):.1f} ms, "
+          f"min {min(totals):.1f} ms, max {max(totals):.1f} ms over {repeat} cold starts")
+
+    last = samples[-1]
+    print(f"\n{'module':<48} {'self ms':>9} {'cumul. ms':>10}")
+    for name, (self_us, cumulative_us) in sorted(last.items(), key=lambda kv: -kv[1][1])[:top]:
+        print(f"{name:<48} {self_us / 1000:9.1f} {cumulative_us / 1000:10.1f}")
+
+    loaded = [name for name in HEAVY if name in last]
+    print(f"\nheavy libraries imported at startup: {', '.join(loaded) if loaded else 'none'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start import time via python -X importtime")
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="slowest modules to list (cumulative)")
+    args = parser.parse_args()
+    run(args.module, args.repeat, args.top)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+# benchmarks/mock_collectors.py - offline collectors emitting synthetic records with simulated API latency and failures
+import random
+import time
+import zlib
+from typing import List, Sequence
+
+from benchmarks.synthetic import PLATFORMS, iter_collector_records
+from collectors.base import Collector
+
+
+class MockCollectorError(RuntimeError):
+    """Simulated API failure raised by MockCollector."""
+
+
+class MockCollector(Collector):
+    """Stand-in for one platform's collector that never touches the network.
+
+    Options (same dict shape as a `sources.json` section):
+    - `platform`: whose record shape to emit (default "twitter")
+    - `limit`, `queries`, `timeout`: as for real collectors
+    - `page_size`: records per simulated API page (default 100)
+    - `latency`: seconds slept before each page (default 0)
+    - `jitter`: +/- fraction applied to each page's latency (default 0.2)
+    - `fail_rate`: probability that a page raises MockCollectorError
+    - `seed`: base seed; the corpus is reproducible for a given seed and query
+    """
+
+    name = "mock"
+    label = "🧪 Mock"
+    enabled_by_default = True
+    default_queries = ("osint",)
+
+    def __init__(self, options=None):
+        super().__init__(options)
+        self.platform = self.options.get("platform", "twitter")
+        self.name = f"mock_{self.platform}"
+        self.label = f"🧪 {self.platform} (mock)"
+
+    def fetch(self, query, limit, since=None):
+        page_size = max(1, int(self.options.get("page_size", 100)))
+        latency = float(self.options.get("latency", 0.0))
+        jitter = float(self.options.get("jitter", 0.2))
+        fail_rate = float(self.options.get("fail_rate", 0.0))
+        seed = int(self.options.get("seed", 0)) ^ zlib.crc32(f"{self.platform}:{query}".encode())
+        rng = random.Random(seed)
+        for i, record in enumerate(iter_collector_records(limit, seed=seed, platforms=(self.platform,))):
+            if i % page_size == 0:
+                if latency:
+                    time.sleep(latency * rng.uniform(1 - jitter, 1 + jitter))
+                if fail_rate and rng.random() < fail_rate:
+                    raise MockCollectorError(f"{self.name}: simulated failure on page {i // page_size}")
+            yield record
+
+
+def mock_collectors(n: int, platforms: Sequence[str] = PLATFORMS, **options) -> List[MockCollector]:
+    """One MockCollector per platform, together emitting `n` records; `options` apply to each."""
+    share, extra = divmod(n, len(platforms))
+    return [MockCollector(dict(options, platform=p, limit=share + (i < extra)))
+            for i, p in enumerate(platforms)]
@@ -0,0 +1,123 @@
+# benchmarks/synthetic.py - deterministic synthetic records for offline benchmarks
+import random
+import time
+from typing import Iterator, List, Sequence
+
+from utils.record import Record
+
+PLATFORMS = ("twitter", "reddit", "mastodon", "github", "stackoverflow", "hackernews", "linkedin")
+
+WORDS = (
+    "osint threat intel breach leak malware phishing ransomware exploit patch "
+    "vulnerability credential password dump forum actor campaign botnet domain "
+    "network security analyst report research data privacy tool python script "
+    "great terrible awesome worried happy angry good bad new old critical urgent "
+    "the a of and to in is for on with that this it as are be by from at"
+).split()
+
+
+def make_text(rng: random.Random, min_words: int = 6, max_words: int = 40) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(min_words, max_words)))
+
+
+# Short non-English phrases so the language filter has something to drop
+FOREIGN = (
+    "el ataque de seguridad afecta a los datos de los usuarios",
+    "die sicherheitslücke ist noch nicht geschlossen worden",
+    "une nouvelle attaque vise les comptes des utilisateurs",
+    "o vazamento de dados expôs milhares de senhas",
+    "утечка данных затронула тысячи пользователей",
+)
+
+EMOJI = ("🔥", "🚨", "👀", "✅", "💀", "🙏")
+PUNCT = (".", ",", "!", "?", ":", " -", " —", "...", " #", " @")
+
+
+def make_raw_text(rng: random.Random, platform: str) -> str:
+    """Uncleaned text roughly as each collector returns it: URLs, HTML, entities, emoji, punctuation."""
+    words = [rng.choice(WORDS) for _ in range(rng.randint(6, 40))]
+    for _ in range(rng.randint(0, 4)):
+        words.insert(rng.randrange(len(words) + 1), rng.choice(PUNCT) + rng.choice(WORDS))
+    text = " ".join(words)
+    if rng.random() < 0.3:
+        text += f" https://t.co/{rng.getrandbits(40):x}"
+    if rng.random() < 0.2:
+        text += " " + rng.choice(EMOJI)
+    if platform == "mastodon":
+        text = f"<p>{text.replace(' &', ' &amp;')} &quot;{rng.choice(WORDS)}&quot;</p><p><a href=\"https://x.social/tags/osint\" class=\"mention hashtag\">#<span>osint</span></a></p>"
+    elif platform == "reddit":
+        text = text + "\n\n" + make_text(rng, 0, 60)
+    return text
+
+
+def iter_records(n: int, seed: int = 0) -> Iterator[Record]:
+    """Yield `n` records in the collectors' output shape, reproducibly for a given seed."""
+    rng = random.Random(seed)
+    for i in range(n):
+        platform = PLATFORMS[i % len(PLATFORMS)]
+        yield Record(
+            platform=platform,
+            user=f"user{rng.randint(0, 50_000)}",
+            timestamp=f"2025-10-{1 + i % 28:02d} {i % 24:02d}:{i % 60:02d}:00",
+            text=make_text(rng),
+            url=f"https://example.com/{platform}/{seed}/{i}",
+            sentiment=round(rng.uniform(-1, 1), 3),
+        )
+
+
+def make_records(n: int, seed: int = 0) -> List[Record]:
+    return list(iter_records(n, seed))
+
+
+def make_collector_text(rng: random.Random, platform: str) -> str:
+    """The `text` field in the shape each collector builds it.
+
+    Stack Overflow and Hacker News return HTML-escaped titles, GitHub a
+    repository description, LinkedIn a headline; Mastodon HTML content and
+    Reddit title + selftext come from `make_raw_text`.
+    """
+    if platform == "stackoverflow":
+        return f"How to {make_text(rng, 4, 12)} with &quot;{rng.choice(WORDS)}&quot;?"
+    if platform == "hackernews":
+        return make_text(rng, 4, 14).capitalize() + rng.choice(("", " [pdf]", " (2025)", " &amp; more"))
+    if platform == "github":
+        return rng.choice(("", make_text(rng, 3, 20).capitalize() + "."))
+    if platform == "linkedin":
+        return f"{make_text(rng, 2, 5).title()} | {make_text(rng, 2, 6).title()}"
+    return make_raw_text(rng, platform)
+
+
+def iter_collector_records(n: int, seed: int = 0, platforms: Sequence[str] = PLATFORMS,
+                           foreign: float = 0.05, duplicates: float = 0.05,
+                           start_ts: int = 1_760_000_000) -> Iterator[Record]:
+    """Yield `n` unscored records as collectors emit them, reproducibly for a given seed.
+
+    A `foreign` share of texts is non-English and a `duplicates` share
+    repeats an earlier text (reposts), so every pipeline stage has work to
+    drop. Timestamps advance one minute per record from `start_ts`.
+    """
+    rng = random.Random(seed)
+    recent: List[str] = []
+    for i in range(n):
+        platform = platforms[i % len(platforms)]
+        roll = rng.random()
+        if roll < foreign:
+            text = rng.choice(FOREIGN) + " " + rng.choice(FOREIGN)
+        elif roll < foreign + duplicates and recent:
+            text = rng.choice(recent)
+        else:
+            text = make_collector_text(rng, platform)
+            if len(recent) < 1000:
+                recent.append(text)
+            else:
+                recent[rng.randrange(1000)] = text
+        ts = start_ts + i * 60
+        yield Record(
+            platform=platform,
+            user=f"user{rng.randint(0, 50_000)}",
+            timestamp=time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(ts)),
+            text=text,
+            url=f"https://example.com/{platform}/{seed}/{i}",
+            ts=ts,
+            lang="en" if platform == "stackoverflow" else None,
+        )
@@ -0,0 +1,198 @@
+# collectors/base.py
+import importlib.util
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from utils.database import get_cursor, update_cursor
+from utils.env import getenv
+from utils.http_cache import cache_mode
+from utils.record import Record
+
+
+class Collector:
+    """Shared interface for every platform collector.
+
+    Subclasses wrap a module's `fetch_*` function behind a uniform
+    `fetch(query, limit)` signature so the orchestrator can schedule,
+    parallelise and time every source the same way. Class attributes
+    describe the source; per-source settings (queries, limit, timeout, interval)
+    come from the sources config file and are passed in as `options`.
+    """
+
+    name: str = ""                  # registry key and config section
+    platform: str = ""              # value written to the `platform` column
+    label: str = ""                 # human readable name for progress output
+    enabled_by_default: bool = True
+    default_queries: tuple = ()
+    default_limit: int = 10
+    # Record key holding a monotonically increasing integer (tweet id,
+    # status id, creation epoch) used as the per-query incremental cursor.
+    # None means the source does not support incremental collection.
+    cursor_field: Optional[str] = None
+    # True when fetch(since=...) pages forward: oldest items first, starting
+    # just after the cursor. A fetch cut off at `limit` has then collected
+    # everything up to its newest item. Newest-first sources can't advance
+    # the cursor past a cut-off fetch without skipping the items in between.
+    pages_forward: bool = False
+    # True when every request goes through utils.http, so the source can run
+    # from the response cache with HTTP_CACHE=replay.
+    replayable: bool = False
+
+    def __init__(self, options: Optional[Dict] = None):
+        self.options = options or {}
+
+    def is_enabled(self) -> bool:
+        enabled = self.options.get("enabled")
+        if enabled is None:
+            return self.enabled_by_default
+        return bool(enabled)
+
+    @property
+    def queries(self) -> List[str]:
+        queries = self.options.get("queries") or list(self.default_queries)
+        if isinstance(queries, str):
+            queries = [queries]
+        return list(queries)
+
+    @property
+    def limit(self) -> int:
+        return int(self.options.get("limit", self.default_limit))
+
+    @property
+    def timeout(self) -> Optional[float]:
+        timeout = self.options.get("timeout")
+        return float(timeout) if timeout is not None else None
+
+    @property
+    def interval(self) -> Optional[float]:
+        """Seconds between scheduled runs of this source (None: the scheduler default)."""
+        interval = self.options.get("interval")
+        return float(interval) if interval is not None else None
+
+    @property
+    def incremental(self) -> bool:
+        # Recorded and replayed runs fetch without cursors so replays issue the recorded requests
+        if cache_mode() in ("record", "replay"):
+            return False
+        return self.cursor_field is not None and bool(self.options.get("incremental", True))
+
+    def unavailable(self) -> Optional[str]:
+        """Why this source can't fetch here (missing credentials or client library), else None.
+
+        Sources that print a message and yield nothing when unconfigured
+        override this, so callers can tell "not configured" from "no matches".
+        """
+        return None
+
+    def cursor_value(self, record: Record) -> Optional[int]:
+        value = record.get(self.cursor_field) if self.cursor_field else None
+        try:
+            return int(value) if value is not None else None
+        except (TypeError, ValueError):
+            return None
+
+    def fetch(self, query: str, limit: int, since: Optional[int] = None) -> Iterable[Record]:
+        """Yield up to `limit` `utils.record.Record`s (platform, user, timestamp, text, url, ...).
+
+        Plain dicts with those keys are still accepted and converted by the
+        normalize stage.
+
+        Implementations should follow the API's pagination and yield records
+        lazily so large fetches never sit in memory as a single list.
+
+        `since` is the last cursor value already collected for this query;
+        implementations should ask the API for newer items only, oldest
+        first where the API allows it (see `pages_forward`).
+
+        Missing credentials or client libraries may just yield nothing, but
+        API errors must propagate rather than end the generator early: the
+        job is then reported as failed and its cursor is not committed, so
+        the items after the failure are fetched again next run.
+        """
+        raise NotImplementedError
+
+    def jobs(self) -> List["CollectJob"]:
+        """One job per configured query."""
+        return [CollectJob(self, q, self.limit) for q in self.queries]
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {self.name}>"
+
+
+def missing(modules: Iterable[str] = (), env: Iterable[str] = ()) -> Optional[str]:
+    """Describe which of the importable `modules` and `env` settings are absent, or None if all are there."""
+    gone = [f"{m} not installed" for m in modules if importlib.util.find_spec(m) is None]
+    unset = [name for name in env if not getenv(name)]
+    if unset:
+        gone.append(", ".join(unset) + " not set")
+    return "; ".join(gone) or None
+
+
+@dataclass
+class CollectJob:
+    """A single (collector, query) unit of work for the collection stage.
+
+    For incremental sources the job reads the stored cursor, requests only
+    newer items and remembers the new cursor. The cursor is written back by
+    `commit_cursor()` once the records are safely in the database, so a
+    failed run re-fetches instead of losing items. `skipped` counts the
+    items the source still returned at or below the cursor, which the job
+    drops; items an API filtered out server-side are never seen, so they
+    are not counted.
+
+    A fetch that stops at `limit` may leave newer items behind. For sources
+    that page forward the cursor stops one below the last item, since a
+    page can end partway through one timestamp. For newest-first sources
+    the cursor is left where it was (`truncated`): the items between it and
+    the oldest one fetched were never seen. A first run (no cursor yet)
+    still sets it, as everything older is history for backfill.
+    """
+    collector: Collector
+    query: str
+    limit: int
+    since: Optional[int] = None
+    new_cursor: Optional[int] = None
+    fetched: int = 0
+    skipped: int = 0
+    truncated: bool = False
+
+    @property
+    def name(self) -> str:
+        if len(self.collector.queries) > 1:
+            return f"{self.collector.name}:{self.query}"
+        return self.collector.name
+
+    def __call__(self) -> Iterator[Record]:
+        """Stream the job's records; fetched/skipped/new_cursor/truncated are final once exhausted."""
+        collector = self.collector
+        if not collector.incremental:
+            for r in collector.fetch(self.query, self.limit):
+                self.fetched += 1
+                yield r
+            return
+
+        self.since = get_cursor(collector.name, self.query)
+        for r in collector.fetch(self.query, self.limit, since=self.since):
+            value = collector.cursor_value(r)
+            # APIs with inclusive bounds (or no server-side filter) can still
+            # hand back items at or below the cursor; drop them here.
+            if self.since is not None and value is not None and value <= self.since:
+                self.skipped += 1
+                continue
+            if value is not None and (self.new_cursor is None or value > self.new_cursor):
+                self.new_cursor = value
+            self.fetched += 1
+            yield r
+        if self.since is None or self.fetched + self.skipped < self.limit or self.new_cursor is None:
+            return
+        if collector.pages_forward:
+            self.new_cursor = max(self.since, self.new_cursor - 1)
+        else:
+            self.truncated = True
+            self.new_cursor = None
+            print(f"⚠ {self.name}: stopped at limit={self.limit} before reaching the cursor; "
+                  f"cursor kept at {self.since} (raise the limit or shorten the interval)")
+
+    def commit_cursor(self) -> None:
+        if self.collector.incremental and (self.fetched or self.skipped or self.new_cursor is not None):
+            update_cursor(self.collector.name, self.query, self.new_cursor, self.fetched, self.skipped)
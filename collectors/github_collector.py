@@ -1,49 +1,73 @@
 # collectors/github_collector.py
-import os
-from dotenv import load_dotenv
-from typing import List, Dict
+from typing import Iterator, List
+from collectors.base import Collector
+from utils.record import Record
+from utils.env import getenv
+from utils.timeutil import to_epoch
 
-load_dotenv()
+PAGE_SIZE = 100  # GitHub search maximum per_page
+SEARCH_URL = "https://api.github.com/search/repositories"
 
-def fetch_github(query="leak", limit=10) -> List[Dict]:
-    """Fetch GitHub repositories using PyGithub.
+
+def iter_github(query="leak", limit=10) -> Iterator[Record]:
+    """Yield GitHub repositories from the REST search API.
     
     Requires GITHUB_TOKEN in .env (optional but recommended for higher rate limits)
     Create a personal access token at https://github.com/settings/tokens
+    Follows `page` until `limit` repositories have been yielded (the search
+    API stops at 1000 results). Requests go through utils.http, so they are
+    rate limited, retried, and cached/revalidated with GitHub's ETags.
+    
+    Yields Records (platform, user, timestamp, text, url, ...).
+    """
+    from utils.http import get_client
+
+    headers = {"Accept": "application/vnd.github+json"}
+    token = getenv("GITHUB_TOKEN")
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    else:
+        print("GitHub token not provided. Rate limits may be lower.")
+
+    per_page = min(PAGE_SIZE, max(1, limit))
+    yielded = 0
+    page = 1
+    while yielded < limit:
+        params = {"q": query, "per_page": per_page, "page": page}
+        data = get_client().get_json(SEARCH_URL, params=params, headers=headers)
+        items = data.get("items", [])
+        for repo in items:
+            yield Record(
+                platform="github",
+                user=(repo.get("owner") or {}).get("login", ""),
+                timestamp=repo.get("created_at", ""),
+                text=repo.get("description") or "",
+                url=repo.get("html_url", ""),
+                ts=to_epoch(repo.get("created_at"))
+            )
+            yielded += 1
+            if yielded >= limit:
+                return
+        if len(items) < per_page or page * per_page >= min(1000, data.get("total_count", 0)):
+            break
+        page += 1
+
+
+def fetch_github(query="leak", limit=10) -> List[Record]:
+    """Fetch GitHub repositories from the REST search API.
     
-    Returns a list of dicts with keys: platform, user, timestamp, text, url.
+    Returns a list of Records (platform, user, timestamp, text, url, ...).
     """
-    try:
-        from github import Github
-        
-        token = os.getenv("GITHUB_TOKEN")
-        
-        if token:
-            g = Github(token.strip())
-        else:
-            g = Github()  # Unauthenticated (lower rate limits)
-            print("GitHub token not provided. Rate limits may be lower.")
-        
-        repos = g.search_repositories(query=query)
-        results = []
-        
-        for i, repo in enumerate(repos):
-            if i >= limit:
-                break
-            
-            results.append({
-                "platform": "github",
-                "user": repo.owner.login,
-                "timestamp": str(repo.created_at),
-                "text": repo.description or "",
-                "url": repo.html_url
-            })
-        
-        return results
-        
-    except ImportError:
-        print("PyGithub not installed. Install with: pip install PyGithub")
-        return []
-    except Exception as e:
-        print(f"GitHub collector failed: {type(e).__name__}: {e}")
-        return []
\ No newline at end of file
+    return list(iter_github(query, limit))
+
+
+class GitHubCollector(Collector):
+    name = "github"
+    platform = "github"
+    label = "🐙 GitHub"
+    default_queries = ("osint",)
+    default_limit = 5
+    replayable = True
+
+    def fetch(self, query, limit):
+        return iter_github(query, limit)
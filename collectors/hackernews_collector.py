@@ -1,45 +1,149 @@
 # collectors/hackernews_collector.py
-import requests
-from typing import List, Dict
 import time
+from typing import Iterator, List
+from collectors.base import Collector
+from utils.record import Record
 
-def fetch_hackernews(query="osint", limit=5) -> List[Dict]:
-    """Fetch HackerNews stories using their free API.
+PAGE_SIZE = 1000  # Algolia maximum hitsPerPage
+
+
+SEARCH_URL = "http://hn.algolia.com/api/v1/search_by_date"
+
+
+def _story(item) -> Record:
+    # Get the actual story URL
+    story_url = f"https://news.ycombinator.com/item?id={item.get('objectID', '')}"
+    return Record(
+        platform="hackernews",
+        user=item.get('author', 'anonymous'),
+        timestamp=item.get('created_at', ''),
+        text=item.get('title', ''),
+        url=story_url,
+        ts=item.get('created_at_i')
+    )
+
+
+def iter_hackernews(query="osint", limit=5, created_after=None) -> Iterator[Record]:
+    """Yield HackerNews stories using the free Algolia HN Search API.
     
     No API key required, completely free to use.
-    API Docs: https://github.com/HackerNews/API
+    API Docs: https://hn.algolia.com/api
+    Without created_after stories come newest first: follows `page` until
+    `limit` stories have been yielded. Algolia stops paginating after 1000
+    hits per query, so deeper fetches slide the window with `created_at_i<`
+    on the oldest story seen so far.
+    If created_after (unix epoch) is given only newer stories are requested,
+    oldest first (see `_iter_forward`).
+    Errors propagate, so a partial fetch is never mistaken for a complete one.
     
-    Returns a list of dicts with keys: platform, user, timestamp, text, url.
+    Yields Records (platform, user, timestamp, text, url, ...).
     """
-    try:
-        # Search using Algolia HN Search API (free, no key needed)
-        search_url = "http://hn.algolia.com/api/v1/search"
+    if created_after:
+        yield from _iter_forward(query, limit, int(created_after))
+        return
+
+    from utils.http import get_client
+
+    # A constant page size keeps `page` offsets aligned (a smaller last page
+    # would re-request stories already yielded); extra hits are cut below.
+    hits_per_page = min(PAGE_SIZE, max(1, limit))
+    yielded = 0
+    page = 0
+    created_before = None
+    while yielded < limit:
+        filters = []
+        if created_before:
+            filters.append(f"created_at_i<{int(created_before)}")
         params = {
             'query': query,
             'tags': 'story',
-            'hitsPerPage': limit
+            'hitsPerPage': hits_per_page,
+            'page': page
         }
+        if filters:
+            params['numericFilters'] = ",".join(filters)
         
-        response = requests.get(search_url, params=params, timeout=10)
-        response.raise_for_status()
-        
-        data = response.json()
-        results = []
+        # Pooled, rate-limited and retried (utils.http). search_by_date
+        # returns newest first, which makes the sliding window line up.
+        data = get_client().get_json(SEARCH_URL, params=params)
+        hits = data.get('hits', [])
+        if not hits:
+            break
         
-        for item in data.get('hits', []):
-            # Get the actual story URL
-            story_url = f"https://news.ycombinator.com/item?id={item.get('objectID', '')}"
-            
-            results.append({
-                "platform": "hackernews",
-                "user": item.get('author', 'anonymous'),
-                "timestamp": item.get('created_at', ''),
-                "text": item.get('title', ''),
-                "url": story_url
-            })
+        for item in hits:
+            yield _story(item)
+            yielded += 1
+            if yielded >= limit:
+                return
         
-        return results
-        
-    except Exception as e:
-        print(f"HackerNews collector failed: {type(e).__name__}: {e}")
-        return []
\ No newline at end of file
+        page += 1
+        if page >= data.get('nbPages', 0):
+            if len(hits) < hits_per_page:
+                break
+            # Hit Algolia's pagination cap: restart below the oldest story seen
+            created_before = min(h.get('created_at_i') or 0 for h in hits)
+            page = 0
+
+
+def _iter_forward(query, limit, created_after) -> Iterator[Record]:
+    """Yield stories created after `created_after`, oldest first.
+
+    search_by_date only sorts newest first, so time is walked forward in
+    windows (lo, hi] that each fit in one page, and every window is fetched
+    whole before the next. A window holding more stories than the remaining
+    `limit` is halved until it fits; after one that fits the width doubles
+    again, and a window reaching the present is open-ended. A fetch cut off
+    at `limit` has therefore seen every story up to the newest one it
+    yielded (short of more stories in one second than fit in a page).
+    """
+    from utils.http import get_client
+
+    lo, width, yielded = created_after, None, 0
+    while yielded < limit:
+        budget = min(PAGE_SIZE, limit - yielded)
+        hi = lo + width if width else None
+        if hi is not None and hi >= time.time():
+            hi = None
+        filters = [f"created_at_i>{lo}"] + ([f"created_at_i<={hi}"] if hi is not None else [])
+        data = get_client().get_json(SEARCH_URL, params={
+            'query': query,
+            'tags': 'story',
+            'hitsPerPage': budget,
+            'page': 0,
+            'numericFilters': ",".join(filters),
+        })
+        hits = data.get('hits', [])
+        overflow = max(data.get('nbHits', 0), len(hits)) > budget
+        if overflow:
+            top = hi if hi is not None else max(h.get('created_at_i') or lo for h in hits)
+            if top - lo > 1:
+                width = max(1, (top - lo) // 2)
+                continue
+        for item in sorted(hits, key=lambda h: h.get('created_at_i') or 0):
+            yield _story(item)
+            yielded += 1
+        if hi is None or overflow:
+            return
+        lo, width = hi, width * 2
+
+
+def fetch_hackernews(query="osint", limit=5, created_after=None) -> List[Record]:
+    """Fetch HackerNews stories using their free API.
+    
+    Returns a list of Records (platform, user, timestamp, text, url, ...).
+    """
+    return list(iter_hackernews(query, limit, created_after))
+
+
+class HackerNewsCollector(Collector):
+    name = "hackernews"
+    platform = "hackernews"
+    label = "🗞 HackerNews"
+    default_queries = ("osint",)
+    default_limit = 5
+    cursor_field = "ts"
+    pages_forward = True
+    replayable = True
+
+    def fetch(self, query, limit, since=None):
+        return iter_hackernews(query, limit, created_after=since)
@@ -1,48 +1,99 @@
 # collectors/linkedin_collector.py
 import os
-from dotenv import load_dotenv
-from typing import List, Dict
+from typing import Iterator, List
+from collectors.base import Collector, missing
+from utils.record import Record
+from utils.clients import SESSION_DIR, get_pool
+from utils.env import getenv
 
-load_dotenv()
+def _cookie_path(email):
+    # linkedin-api stores one pickled cookie jar per account as <dir><username>.jr
+    return os.path.join(SESSION_DIR, f"{email}.jr")
 
-def fetch_linkedin(keyword="cybersecurity", limit=10) -> List[Dict]:
-    """Fetch LinkedIn people/posts using linkedin-api.
+
+def _make_linkedin_client():
+    """Log in to LinkedIn, reusing the session cookies persisted in SESSION_DIR.
+
+    linkedin-api only performs the username/password handshake when no
+    cached cookie jar exists or its JSESSIONID has expired.
+    """
+    from linkedin_api import Linkedin
+    from linkedin_api.cookie_repository import LinkedinSessionExpired
+
+    email = getenv("LINKEDIN_EMAIL", "")
+    password = getenv("LINKEDIN_PASSWORD", "")
+    os.makedirs(SESSION_DIR, exist_ok=True)
+    cookies_dir = os.path.join(SESSION_DIR, "")
+    try:
+        return Linkedin(email, password, cookies_dir=cookies_dir)
+    except LinkedinSessionExpired:
+        return Linkedin(email, password, refresh_cookies=True, cookies_dir=cookies_dir)
+
+
+def _forget_session():
+    email = getenv("LINKEDIN_EMAIL", "")
+    if email and os.path.exists(_cookie_path(email)):
+        os.remove(_cookie_path(email))
+
+
+def iter_linkedin(keyword="cybersecurity", limit=10) -> Iterator[Record]:
+    """Yield LinkedIn people/posts using linkedin-api.
     
     Requires LINKEDIN_EMAIL and LINKEDIN_PASSWORD in .env
     Note: Use a test account as this method may violate LinkedIn ToS.
+    linkedin-api pages through search results internally up to `limit`.
+    The logged-in client is pooled across runs and its cookies are kept in
+    SESSION_DIR, so the login handshake only happens again after LinkedIn
+    rejects the session.
     
-    Returns a list of dicts with keys: platform, user, timestamp, text, url.
+    Yields Records (platform, user, timestamp, text, url, ...).
     """
     try:
-        from linkedin_api import Linkedin
-        
-        email = os.getenv("LINKEDIN_EMAIL")
-        password = os.getenv("LINKEDIN_PASSWORD")
-        
-        if not (email and password):
-            print("LinkedIn credentials missing. Set LINKEDIN_EMAIL and LINKEDIN_PASSWORD in .env")
-            print("Note: LinkedIn may block automated access. Use a test account.")
-            return []
-        
-        api = Linkedin(email.strip(), password.strip())
-        results = []
-        
-        # Search for people related to keyword
-        people = api.search_people(keywords=keyword, limit=limit)
-        for p in people:
-            results.append({
-                "platform": "linkedin",
-                "user": p.get("public_id", ""),
-                "timestamp": "N/A",
-                "text": p.get("headline", ""),
-                "url": f"https://linkedin.com/in/{p.get('public_id', '')}"
-            })
-        
-        return results
-        
+        import linkedin_api
     except ImportError:
         print("linkedin-api not installed. Install with: pip install linkedin-api")
-        return []
-    except Exception as e:
-        print(f"LinkedIn collector failed: {type(e).__name__}: {e}")
-        return []
\ No newline at end of file
+        return
+
+    email = getenv("LINKEDIN_EMAIL")
+    password = getenv("LINKEDIN_PASSWORD")
+
+    if not (email and password):
+        print("LinkedIn credentials missing. Set LINKEDIN_EMAIL and LINKEDIN_PASSWORD in .env")
+        print("Note: LinkedIn may block automated access. Use a test account.")
+        return
+
+    pool = get_pool("linkedin", _make_linkedin_client, on_invalidate=_forget_session)
+    # Search for people related to keyword; an auth failure logs in once more and retries
+    people = pool.call(lambda api: api.search_people(keywords=keyword, limit=limit))
+
+    for p in people:
+        yield Record(
+            platform="linkedin",
+            user=p.get("public_id", ""),
+            timestamp="N/A",
+            text=p.get("headline", ""),
+            url=f"https://linkedin.com/in/{p.get('public_id', '')}",
+            ts=None  # people search results carry no date
+        )
+
+
+def fetch_linkedin(keyword="cybersecurity", limit=10) -> List[Record]:
+    """Fetch LinkedIn people/posts using linkedin-api.
+    
+    Returns a list of Records (platform, user, timestamp, text, url, ...).
+    """
+    return list(iter_linkedin(keyword, limit))
+
+
+class LinkedInCollector(Collector):
+    name = "linkedin"
+    platform = "linkedin"
+    label = "💼 LinkedIn"
+    default_queries = ("cybersecurity",)
+    default_limit = 5
+
+    def unavailable(self):
+        return missing(modules=("linkedin_api",), env=("LINKEDIN_EMAIL", "LINKEDIN_PASSWORD"))
+
+    def fetch(self, query, limit):
+        return iter_linkedin(query, limit)
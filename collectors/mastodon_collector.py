@@ -1,63 +1,120 @@
 # collectors/mastodon_collector.py
-import os
-from dotenv import load_dotenv
-from typing import List, Dict
+from typing import Iterator, List
+from collectors.base import Collector, missing
+from utils.record import Record
+from utils.clients import get_pool
+from utils.env import getenv
+from utils.timeutil import to_epoch
 
-load_dotenv()
+PAGE_SIZE = 40  # Mastodon caps timeline pages at 40 statuses
 
-def fetch_mastodon(hashtag="osint", limit=10) -> List[Dict]:
-    """Fetch Mastodon posts using Mastodon.py.
+
+def iter_mastodon(hashtag="osint", limit=10, since_id=None) -> Iterator[Record]:
+    """Yield Mastodon posts using Mastodon.py.
     
     Requires MASTODON_ACCESS_TOKEN and MASTODON_API_BASE_URL in .env
     Register an app at your Mastodon instance to get credentials.
+    Without since_id the newest posts come first, paging backwards with
+    max_id. With since_id only newer statuses are requested, paging forward
+    with min_id and oldest first, so a fetch cut off at `limit` has every
+    status up to the last one it yielded.
+    `text` is the raw status HTML.
     
-    Returns a list of dicts with keys: platform, user, timestamp, text, url.
+    Yields Records (platform, user, timestamp, text, url, ...).
     """
     try:
         from mastodon import Mastodon
-        
-        access_token = os.getenv("MASTODON_ACCESS_TOKEN")
-        api_base_url = os.getenv("MASTODON_API_BASE_URL", "https://mastodon.social")
-        
-        if not access_token:
-            print("Mastodon access token missing. Set MASTODON_ACCESS_TOKEN in .env")
-            print("To get token: Create app at your Mastodon instance > Copy access token")
-            return []
-        
-        mastodon = Mastodon(
-            access_token=access_token.strip(),
-            api_base_url=api_base_url.strip()
-        )
-        
-        results = []
-        
+    except ImportError:
+        print("Mastodon.py not installed. Install with: pip install Mastodon.py")
+        return
+    
+    access_token = getenv("MASTODON_ACCESS_TOKEN")
+    api_base_url = getenv("MASTODON_API_BASE_URL", "https://mastodon.social")
+    
+    if not access_token:
+        print("Mastodon access token missing. Set MASTODON_ACCESS_TOKEN in .env")
+        print("To get token: Create app at your Mastodon instance > Copy access token")
+        return
+    
+    # One client per instance URL, reused across jobs and scheduler runs
+    pool = get_pool(f"mastodon:{api_base_url.strip()}", lambda: Mastodon(
+        access_token=access_token.strip(),
+        api_base_url=api_base_url.strip()
+    ))
+    mastodon = pool.acquire()
+    error = None
+    forward = since_id is not None
+    start = {"min_id": since_id} if forward else {}
+    try:
         # Try hashtag timeline first, fall back to public timeline if hashtag fails
+        timeline = lambda **kw: mastodon.timeline_hashtag(hashtag, **kw)
         try:
-            posts = mastodon.timeline_hashtag(hashtag, limit=limit)
-            if not posts:  # If no posts found for hashtag, try public timeline
-                posts = mastodon.timeline_public(limit=limit)
+            posts = timeline(limit=min(PAGE_SIZE, limit), **start)
+            # If no posts found for hashtag, try public timeline. With a cursor an
+            # empty page just means nothing new since the last run.
+            if not posts and not forward:
+                timeline = mastodon.timeline_public
+                posts = timeline(limit=min(PAGE_SIZE, limit))
         except Exception as hashtag_error:
             print(f"Hashtag search failed, using public timeline: {hashtag_error}")
-            posts = mastodon.timeline_public(limit=limit)
+            timeline = mastodon.timeline_public
+            posts = timeline(limit=min(PAGE_SIZE, limit), **start)
         
-        for p in posts:
-            # Remove HTML tags from content
-            import re
-            clean_text = re.sub('<[^<]+?>', '', p["content"])
+        yielded = 0
+        while posts:
+            if forward:
+                # A min_id page holds the statuses just after min_id, newest first
+                posts = sorted(posts, key=lambda p: int(p["id"]))
+            for p in posts:
+                # Content is HTML; mastodon is in utils.cleaner.HTML_PLATFORMS, so clean_text
+                # strips tags and decodes entities in the same pass as the rest of the cleaning.
+                yield Record(
+                    platform="mastodon",
+                    user=p["account"]["username"],
+                    timestamp=str(p["created_at"]),
+                    text=p["content"],
+                    url=p["url"],
+                    source_id=p["id"],
+                    lang=p.get("language"),
+                    ts=to_epoch(p["created_at"])
+                )
+                yielded += 1
+                if yielded >= limit:
+                    return
             
-            results.append({
-                "platform": "mastodon",
-                "user": p["account"]["username"],
-                "timestamp": str(p["created_at"]),
-                "text": clean_text,
-                "url": p["url"]
-            })
+            if forward:
+                posts = timeline(limit=min(PAGE_SIZE, limit - yielded), min_id=posts[-1]["id"])
+            else:
+                oldest = min(p["id"] for p in posts)
+                posts = timeline(limit=min(PAGE_SIZE, limit - yielded), max_id=oldest)
         
-        return results
-        
-    except ImportError:
-        print("Mastodon.py not installed. Install with: pip install Mastodon.py")
-        return []
     except Exception as e:
-        print(f"Mastodon collector failed: {type(e).__name__}: {e}")
-        return []
\ No newline at end of file
+        # Propagated so the job fails and its cursor stays put
+        error = e
+        raise
+    finally:
+        pool.release(mastodon, error)
+
+
+def fetch_mastodon(hashtag="osint", limit=10, since_id=None) -> List[Record]:
+    """Fetch Mastodon posts using Mastodon.py.
+    
+    Returns a list of Records (platform, user, timestamp, text, url, ...).
+    """
+    return list(iter_mastodon(hashtag, limit, since_id))
+
+
+class MastodonCollector(Collector):
+    name = "mastodon"
+    platform = "mastodon"
+    label = "🦣 Mastodon"
+    default_queries = ("cybersecurity",)
+    default_limit = 10
+    cursor_field = "source_id"
+    pages_forward = True
+
+    def unavailable(self):
+        return missing(modules=("mastodon",), env=("MASTODON_ACCESS_TOKEN",))
+
+    def fetch(self, query, limit, since=None):
+        return iter_mastodon(query, limit, since_id=since)
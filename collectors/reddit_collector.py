@@ -1,19 +1,8 @@
 # collectors/reddit_collector.py
-import os
-from dotenv import load_dotenv
-load_dotenv()
-import praw
-
-REDDIT_ID = os.getenv("REDDIT_ID")
-REDDIT_SECRET = os.getenv("REDDIT_SECRET")
-REDDIT_USERNAME = os.getenv("REDDIT_USERNAME")
-REDDIT_PASSWORD = os.getenv("REDDIT_PASSWORD")
-
-# Trim accidental whitespace from environment values
-for varname in ("REDDIT_ID", "REDDIT_SECRET", "REDDIT_USERNAME", "REDDIT_PASSWORD"):
-    val = locals().get(varname)
-    if isinstance(val, str):
-        locals()[varname] = val.strip()
+from collectors.base import Collector, missing
+from utils.record import Record
+from utils.clients import get_pool
+from utils.env import getenv
 
 
 def _make_reddit_client():
@@ -22,6 +11,13 @@ def _make_reddit_client():
     Tries app-only auth with client_id/client_secret first. If that fails and
     REDDIT_USERNAME/REDDIT_PASSWORD are provided, will fall back to script
     authentication (username/password)."""
+    import praw
+
+    REDDIT_ID = getenv("REDDIT_ID")
+    REDDIT_SECRET = getenv("REDDIT_SECRET")
+    REDDIT_USERNAME = getenv("REDDIT_USERNAME")
+    REDDIT_PASSWORD = getenv("REDDIT_PASSWORD")
+
     if REDDIT_ID and REDDIT_SECRET:
         # App-only (client credentials)
         return praw.Reddit(client_id=REDDIT_ID, client_secret=REDDIT_SECRET, user_agent="osint_lab_script")
@@ -35,35 +31,74 @@ def _make_reddit_client():
     raise RuntimeError("Missing Reddit credentials")
 
 
-def fetch_reddit(subreddit="technology", limit=100):
+def iter_reddit(subreddit="technology", limit=100, created_after=None):
+    """Yield posts from a subreddit.
+
+    PRAW listings are lazy and request further pages (100 posts each, using
+    the `after` fullname) only as the generator is consumed.
+    Without a cursor this reads the "hot" listing. With created_after (unix
+    epoch) it walks the "new" listing and stops at the first post that was
+    already collected, so PRAW never requests the older pages.
+    """
+    # PRAW instances are not thread-safe: each concurrent job leases its own
+    # from the pool and hands it back for later jobs and scheduler runs.
+    pool = get_pool("reddit", _make_reddit_client)
     try:
-        reddit = _make_reddit_client()
+        reddit = pool.acquire()
     except Exception as e:
         print("Reddit credentials missing or misconfigured; skipping Reddit fetch.", type(e).__name__, e)
-        return []
+        return
 
+    error = None
     try:
-        results = []
-        for post in reddit.subreddit(subreddit).hot(limit=limit):
+        sub = reddit.subreddit(subreddit)
+        listing = sub.new(limit=limit) if created_after else sub.hot(limit=limit)
+        for post in listing:
+            if created_after and post.created_utc <= created_after:
+                break
             try:
                 text = (post.title or "") + " " + (post.selftext or "")
-                results.append({
-                    "platform": "reddit",
-                    "user": str(post.author),
-                    "timestamp": str(post.created_utc),
-                    "text": text,
-                    "url": f"https://reddit.com{post.permalink}"
-                })
+                record = Record(
+                    platform="reddit",
+                    user=str(post.author),
+                    timestamp=str(post.created_utc),
+                    text=text,
+                    url=f"https://reddit.com{post.permalink}",
+                    ts=int(post.created_utc)
+                )
             except Exception:
                 # skip problematic post
                 continue
-        return results
+            yield record
     except Exception as e:
+        error = e
         # Improve guidance for common auth error (401)
         en = type(e).__name__
         msg = str(e)
         if "401" in msg or "401" in en or "Unauthorized" in msg:
             print("Reddit fetch failed with 401 Unauthorized. Double-check that your REDDIT_ID and REDDIT_SECRET are correct, that the app type is 'script' or supports script/app-only auth, and that there are no trailing spaces in .env.")
-        else:
-            print(f"Reddit fetch failed: {en}: {msg}")
-        return []
+        # Propagated so the job fails and its cursor stays put
+        raise
+    finally:
+        # A rejected client is dropped so the next job authenticates afresh
+        pool.release(reddit, error)
+
+
+def fetch_reddit(subreddit="technology", limit=100, created_after=None):
+    """Fetch posts from a subreddit as a list."""
+    return list(iter_reddit(subreddit, limit, created_after))
+
+
+class RedditCollector(Collector):
+    name = "reddit"
+    platform = "reddit"
+    label = "🔴 Reddit"
+    default_queries = ("cybersecurity",)
+    default_limit = 10
+    cursor_field = "ts"
+
+    def unavailable(self):
+        return missing(modules=("praw",), env=("REDDIT_ID", "REDDIT_SECRET"))
+
+    def fetch(self, query, limit, since=None):
+        return iter_reddit(query, limit=limit, created_after=since)
@@ -0,0 +1,77 @@
+# collectors/registry.py
+import importlib
+import json
+import os
+import pkgutil
+from typing import Dict, List, Optional, Type
+
+from collectors.base import Collector, CollectJob
+from utils.http_cache import cache_mode
+
+COLLECTORS_DIR = os.path.dirname(os.path.abspath(__file__))
+CONFIG_PATH_DEFAULT = os.path.join(os.path.dirname(COLLECTORS_DIR), "sources.json")
+
+_registry: Optional[Dict[str, Type[Collector]]] = None
+
+
+def discover(refresh: bool = False) -> Dict[str, Type[Collector]]:
+    """Import every `collectors/*_collector.py` module and index its Collector subclasses by name.
+
+    Modules whose optional dependencies are missing are skipped with a message
+    instead of breaking the whole pipeline.
+    """
+    global _registry
+    if _registry is not None and not refresh:
+        return _registry
+
+    registry = {}
+    for mod in pkgutil.iter_modules([COLLECTORS_DIR]):
+        if not mod.name.endswith("_collector"):
+            continue
+        try:
+            module = importlib.import_module(f"collectors.{mod.name}")
+        except Exception as e:
+            print(f"Skipping collector module {mod.name}: {type(e).__name__}: {e}")
+            continue
+        for obj in vars(module).values():
+            if isinstance(obj, type) and issubclass(obj, Collector) and obj is not Collector and obj.name:
+                registry[obj.name] = obj
+
+    _registry = registry
+    return registry
+
+
+def load_config(path: Optional[str] = None) -> Dict:
+    """Load the sources config (JSON). Path defaults to $OSINT_SOURCES_CONFIG or ./sources.json."""
+    path = path or os.getenv("OSINT_SOURCES_CONFIG", CONFIG_PATH_DEFAULT)
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def get_collectors(config: Optional[Dict] = None, only: Optional[List[str]] = None) -> List[Collector]:
+    """Instantiate the enabled collectors, configured from the `sources` section."""
+    config = load_config() if config is None else config
+    sources = config.get("sources", {})
+    replay = cache_mode() == "replay"
+    collectors = []
+    for name, cls in discover().items():
+        if only is not None and name not in only:
+            continue
+        collector = cls(sources.get(name, {}))
+        if not collector.is_enabled():
+            continue
+        if replay and not collector.replayable:
+            print(f"Skipping {name}: its client library bypasses the HTTP cache, so it can't replay offline")
+            continue
+        collectors.append(collector)
+    return collectors
+
+
+def build_jobs(collectors: List[Collector]) -> List[CollectJob]:
+    """Expand collectors into one job per configured query."""
+    jobs = []
+    for collector in collectors:
+        jobs.extend(collector.jobs())
+    return jobs
@@ -1,30 +1,34 @@
 # collectors/snscrape_collector.py
 import json
+import os
 import shutil
 import subprocess
-from typing import List, Dict
+import tempfile
+from typing import Iterator, List
+from collectors.base import Collector
+from utils.record import Record
+from utils.timeutil import to_epoch
 
 
-def _fetch_with_package(query: str, limit: int) -> List[Dict]:
+def _iter_with_package(query: str, limit: int) -> Iterator[Record]:
     # Import inside function to avoid import-time failures on some Python versions
     import snscrape.modules.twitter as sntwitter
 
-    results = []
     for i, tweet in enumerate(sntwitter.TwitterSearchScraper(query).get_items()):
         if i >= limit:
             break
-        results.append({
-            "platform": "twitter",
-            "user": tweet.user.username,
-            "timestamp": str(tweet.date),
-            "text": tweet.content,
-            "url": tweet.url
-        })
-    return results
-
-
-def _fetch_with_cli(query: str, limit: int) -> List[Dict]:
-    """Fallback that calls the `snscrape` CLI and parses JSON lines."""
+        yield Record(
+            platform="twitter",
+            user=tweet.user.username,
+            timestamp=str(tweet.date),
+            text=tweet.content,
+            url=tweet.url,
+            ts=to_epoch(tweet.date)
+        )
+
+
+def _iter_with_cli(query: str, limit: int) -> Iterator[Record]:
+    """Fallback that calls the `snscrape` CLI and streams its JSON lines."""
     if not shutil.which("snscrape"):
         raise RuntimeError("snscrape Python package import failed and CLI 'snscrape' not found")
 
@@ -36,47 +40,85 @@ def _fetch_with_cli(query: str, limit: int) -> List[Dict]:
         query,
     ]
 
-    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-    out, err = proc.communicate()
-    if proc.returncode != 0:
-        # Provide the stderr for debugging but don't crash the caller
-        raise RuntimeError(f"snscrape CLI failed: {err.strip()}")
-
-    results = []
-    for line in out.splitlines():
-        if not line.strip():
-            continue
+    # stderr goes to a temp file so a chatty CLI can't fill the pipe and stall stdout
+    with tempfile.TemporaryFile(mode="w+") as err:
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=err, text=True)
         try:
-            obj = json.loads(line)
-            results.append({
-                "platform": "twitter",
-                "user": obj.get("user", {}).get("username") if isinstance(obj.get("user"), dict) else obj.get("user"),
-                "timestamp": obj.get("date"),
-                "text": obj.get("content") or obj.get("rawContent") or "",
-                "url": obj.get("url")
-            })
-        except Exception:
-            continue
-    return results
-
-
-def fetch_twitter_scrape(query: str = "osint", limit: int = 200) -> List[Dict]:
-    """Fetch tweets using snscrape. Tries Python package first, then CLI fallback.
+            for line in proc.stdout:
+                if not line.strip():
+                    continue
+                try:
+                    obj = json.loads(line)
+                    record = Record(
+                        platform="twitter",
+                        user=obj.get("user", {}).get("username") if isinstance(obj.get("user"), dict) else obj.get("user"),
+                        timestamp=obj.get("date"),
+                        text=obj.get("content") or obj.get("rawContent") or "",
+                        url=obj.get("url"),
+                        ts=to_epoch(obj.get("date"))
+                    )
+                except Exception:
+                    continue
+                yield record
+            proc.wait()
+        finally:
+            if proc.poll() is None:
+                proc.kill()
+                proc.wait()
+        if proc.returncode != 0:
+            err.seek(0)
+            # Provide the stderr for debugging but don't crash the caller
+            raise RuntimeError(f"snscrape CLI failed: {err.read().strip()}")
+
 
-    Returns a list of dicts with keys: platform, user, timestamp, text, url.
+def iter_twitter_scrape(query: str = "osint", limit: int = 200) -> Iterator[Record]:
+    """Yield tweets using snscrape. Tries Python package first, then CLI fallback.
+
+    Yields Records (platform, user, timestamp, text, url, ...).
     """
+    yielded = 0
     try:
-        return _fetch_with_package(query, limit)
+        for record in _iter_with_package(query, limit):
+            yield record
+            yielded += 1
+        return
     except AttributeError as ae:
         # Known incompatibility: older snscrape uses importer.find_module which
         # is removed in newer importlib/FileFinder implementations. Fail gracefully.
         print("snscrape package import failed due to legacy importer API; skipping snscrape (", ae, ")")
-        return []
-    except Exception as e_pkg:
-        # Try CLI fallback
-        try:
-            return _fetch_with_cli(query, limit)
-        except Exception as e_cli:
-            # Raise a combined error for debugging
-            raise RuntimeError(f"snscrape fetch failed (package error: {e_pkg}; cli error: {e_cli})")
+        return
+    except Exception as e:
+        if yielded:
+            raise RuntimeError(f"snscrape fetch failed after {yielded} tweets: {e}")
+        e_pkg = e
+
+    # Try CLI fallback
+    try:
+        yield from _iter_with_cli(query, limit)
+    except Exception as e_cli:
+        # Raise a combined error for debugging
+        raise RuntimeError(f"snscrape fetch failed (package error: {e_pkg}; cli error: {e_cli})")
+
+
+def fetch_twitter_scrape(query: str = "osint", limit: int = 200) -> List[Record]:
+    """Fetch tweets using snscrape. Tries Python package first, then CLI fallback.
+
+    Returns a list of Records (platform, user, timestamp, text, url, ...).
+    """
+    return list(iter_twitter_scrape(query, limit))
+
+
+class SnscrapeCollector(Collector):
+    """Twitter scraping via snscrape - disabled unless USE_SNSCRAPE=true or enabled in config."""
+    name = "snscrape"
+    platform = "twitter"
+    label = "🐦 Twitter (snscrape)"
+    default_queries = ("AI OR cybersecurity OR osint",)
+    default_limit = 10
+
+    @property
+    def enabled_by_default(self):
+        return os.getenv("USE_SNSCRAPE", "false").lower() == "true"
 
+    def fetch(self, query, limit):
+        return iter_twitter_scrape(query, limit=limit)
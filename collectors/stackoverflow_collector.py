@@ -1,55 +1,99 @@
 # collectors/stackoverflow_collector.py
-import requests
-from typing import List, Dict
-import time
-from datetime import datetime
+from typing import Iterator, List
+from datetime import datetime, timezone
+from collectors.base import Collector
+from utils.record import Record
 
-def fetch_stackoverflow(query="osint", limit=5) -> List[Dict]:
-    """Fetch Stack Overflow questions using their free API.
+PAGE_SIZE = 100  # Stack Exchange maximum pagesize
+
+
+def iter_stackoverflow(query="osint", limit=5, fromdate=None) -> Iterator[Record]:
+    """Yield Stack Overflow questions using their free API, following `page`/`has_more`.
     
     No API key required, but has rate limits (300 requests/day per IP).
     API Docs: https://api.stackexchange.com/docs
+    If fromdate (unix epoch) is given only questions created at or after it
+    are requested, oldest first (sort=creation, order=asc), so a fetch cut
+    off at `limit` has every question up to the last one it yielded.
+    Without it the most recently active questions come first.
+    Errors (including an exhausted quota) propagate, so a partial fetch is
+    never mistaken for a complete one.
     
-    Returns a list of dicts with keys: platform, user, timestamp, text, url.
+    Yields Records (platform, user, timestamp, text, url, ...).
     """
-    try:
-        url = "https://api.stackexchange.com/2.3/search"
+    from utils.http import get_client
+
+    url = "https://api.stackexchange.com/2.3/search"
+    # Every page has the same size: `page` is an offset in units of pagesize,
+    # so shrinking the last page would re-request items already yielded.
+    pagesize = min(PAGE_SIZE, max(1, limit))
+    yielded = 0
+    page = 1
+    while yielded < limit:
         params = {
-            'order': 'desc',
-            'sort': 'activity',
+            'order': 'asc' if fromdate else 'desc',
+            'sort': 'creation' if fromdate else 'activity',
             'intitle': query,
             'site': 'stackoverflow',
-            'pagesize': limit,
+            'pagesize': pagesize,
+            'page': page,
             'filter': 'default'  # Include more fields
         }
+        if fromdate:
+            params['fromdate'] = int(fromdate)
         
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
-        
-        data = response.json()
-        results = []
+        # Pooled, rate-limited and retried (utils.http); a `backoff` field in
+        # the response holds further requests to the API for that long.
+        data = get_client().get_json(url, params=params)
         
         for item in data.get('items', []):
-            # Convert Unix timestamp to readable format
+            # Convert Unix timestamp to readable format (UTC, like the other sources)
             timestamp = datetime.fromtimestamp(
-                item.get('creation_date', 0)
+                item.get('creation_date', 0), tz=timezone.utc
             ).strftime('%Y-%m-%d %H:%M:%S')
             
-            results.append({
-                "platform": "stackoverflow",
-                "user": item.get('owner', {}).get('display_name', 'anonymous'),
-                "timestamp": timestamp,
-                "text": item.get('title', ''),
-                "url": item.get('link', '')
-            })
+            yield Record(
+                platform="stackoverflow",
+                user=item.get('owner', {}).get('display_name', 'anonymous'),
+                timestamp=timestamp,
+                text=item.get('title', ''),
+                url=item.get('link', ''),
+                ts=item.get('creation_date'),
+                lang="en"  # stackoverflow.com is English-only
+            )
+            yielded += 1
+            if yielded >= limit:
+                return
         
         # Check rate limit info
         quota_remaining = data.get('quota_remaining', 'unknown')
         if quota_remaining != 'unknown' and quota_remaining < 50:
             print(f"⚠️ Stack Overflow API quota low: {quota_remaining} requests remaining")
-        
-        return results
-        
-    except Exception as e:
-        print(f"Stack Overflow collector failed: {type(e).__name__}: {e}")
-        return []
\ No newline at end of file
+        if not data.get('has_more'):
+            break
+        if quota_remaining == 0:
+            raise RuntimeError(f"Stack Overflow API quota exhausted after {yielded} questions")
+        page += 1
+
+
+def fetch_stackoverflow(query="osint", limit=5, fromdate=None) -> List[Record]:
+    """Fetch Stack Overflow questions using their free API.
+    
+    Returns a list of Records (platform, user, timestamp, text, url, ...).
+    """
+    return list(iter_stackoverflow(query, limit, fromdate))
+
+
+class StackOverflowCollector(Collector):
+    name = "stackoverflow"
+    platform = "stackoverflow"
+    label = "📚 Stack Overflow"
+    default_queries = ("osint",)
+    default_limit = 5
+    cursor_field = "ts"
+    pages_forward = True
+    replayable = True
+
+    def fetch(self, query, limit, since=None):
+        # fromdate is inclusive, so start one second after the last question seen
+        return iter_stackoverflow(query, limit, fromdate=since + 1 if since else None)
@@ -1,40 +1,103 @@
 # collectors/twitter_collector.py
-import os, time
-from dotenv import load_dotenv
-import tweepy
+import time
+from typing import Iterator, List
+from collectors.base import Collector, missing
+from utils.record import Record
+from utils.clients import get_pool
+from utils.env import getenv
+from utils.timeutil import to_epoch
 
-load_dotenv()
-BEARER = os.getenv("TWITTER_BEARER")
+PAGE_SIZE = 100  # search_recent_tweets accepts 10-100 per page
 
-def fetch_twitter_v2(query="osint", max_results=200):
-    """Fetch recent tweets (10-100) using Twitter API v2 (bearer token)."""
-    if not BEARER:
+
+def _make_twitter_client():
+    import tweepy
+    return tweepy.Client(bearer_token=getenv("TWITTER_BEARER"))
+
+
+def iter_twitter_v2(query="osint", max_results=200, since_id=None) -> Iterator[Record]:
+    """Yield recent tweets using Twitter API v2 (bearer token), following next_token pagination.
+
+    max_results is the total across pages. If since_id is given only tweets
+    newer than that id are requested.
+    """
+    if not getenv("TWITTER_BEARER"):
         print("TWITTER_BEARER not set; skipping v2 fetch")
-        return []
-    if max_results < 10:
-        max_results = 10
-    if max_results > 100:
-        max_results = 100
-
-    client = tweepy.Client(bearer_token=BEARER)
-    # Single attempt: if rate-limited, don't block the pipeline — return empty and log.
+        return
+    try:
+        import tweepy
+    except ImportError:
+        print("tweepy not installed. Install with: pip install tweepy")
+        return
+    from utils.http import MAX_RETRIES, MAX_WAIT, backoff_delay, rate_limit_wait
+
+    pool = get_pool("twitter", _make_twitter_client)
+    client = pool.acquire()
+    params = {"query": query, "tweet_fields": ["created_at","lang","author_id"],
+              "max_results": max(10, min(PAGE_SIZE, max_results))}
+    if since_id:
+        params["since_id"] = since_id
+    yielded = 0
+    attempt = 0
+    error = None
     try:
-        resp = client.search_recent_tweets(query=query, tweet_fields=["created_at","lang","author_id"], max_results=max_results)
-    except tweepy.TooManyRequests:
-        print("Twitter API rate-limited (429). Skipping twitter v2 fetch this run.")
-        return []
+        while yielded < max_results:
+            # Paginate by hand so a rate-limited page can be retried from its next_token
+            try:
+                resp = client.search_recent_tweets(**params)
+            except (tweepy.TooManyRequests, tweepy.TwitterServerError) as e:
+                wait = rate_limit_wait(e.response.headers) if isinstance(e, tweepy.TooManyRequests) else None
+                if wait is None:
+                    wait = backoff_delay(attempt)
+                # Windows reset every 15 minutes; don't block the pipeline past that. The
+                # job fails, so the cursor stays put and the next run fetches the gap.
+                if attempt >= MAX_RETRIES or wait > MAX_WAIT:
+                    raise RuntimeError(f"Twitter API unavailable ({type(e).__name__}, retry in {wait:.0f}s) "
+                                       f"after {yielded} tweets") from e
+                time.sleep(wait)
+                attempt += 1
+                continue
+            attempt = 0
+            for t in resp.data or []:
+                yield Record(
+                    platform="twitter",
+                    user=str(t.author_id),
+                    timestamp=str(t.created_at),
+                    text=t.text,
+                    url=f"https://twitter.com/i/web/status/{t.id}",
+                    source_id=t.id,
+                    lang=t.lang,
+                    ts=to_epoch(t.created_at)
+                )
+                yielded += 1
+                if yielded >= max_results:
+                    return
+            next_token = (resp.meta or {}).get("next_token")
+            if not next_token:
+                break
+            params["next_token"] = next_token
     except Exception as e:
-        print("Twitter API error:", e)
-        return []
-
-    results = []
-    if resp and resp.data:
-        for t in resp.data:
-            results.append({
-                "platform": "twitter",
-                "user": str(t.author_id),
-                "timestamp": str(t.created_at),
-                "text": t.text,
-                "url": f"https://twitter.com/i/web/status/{t.id}"
-            })
-    return results
+        error = e
+        raise
+    finally:
+        pool.release(client, error)
+
+
+def fetch_twitter_v2(query="osint", max_results=200, since_id=None) -> List[Record]:
+    """Fetch recent tweets using Twitter API v2 (bearer token)."""
+    return list(iter_twitter_v2(query, max_results, since_id))
+
+
+class TwitterV2Collector(Collector):
+    name = "twitter_v2"
+    platform = "twitter"
+    label = "🐦 Twitter API v2"
+    default_queries = ("AI",)
+    default_limit = 10
+    cursor_field = "source_id"
+
+    def unavailable(self):
+        return missing(modules=("tweepy",), env=("TWITTER_BEARER",))
+
+    def fetch(self, query, limit, since=None):
+        return iter_twitter_v2(query, max_results=limit, since_id=since)
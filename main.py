@@ -1,132 +1,236 @@
 # main.py - Multi-Platform OSINT Pipeline
+#
+# Heavy dependencies (client libraries, pandas/matplotlib, pyarrow, langdetect,
+# TextBlob) are imported by the stages and sources that use them, so
+# short-lived runs only pay for what is enabled; see benchmarks/bench_startup.py.
 import os
-from collectors.snscrape_collector import fetch_twitter_scrape
-from collectors.twitter_collector import fetch_twitter_v2
-from collectors.reddit_collector import fetch_reddit
-from collectors.linkedin_collector import fetch_linkedin
-from collectors.mastodon_collector import fetch_mastodon
-from collectors.github_collector import fetch_github
-from collectors.stackoverflow_collector import fetch_stackoverflow
-from collectors.hackernews_collector import fetch_hackernews
-
-from utils.cleaner import clean_text, is_english
-from utils.sentiment import add_sentiment
+import time
+from utils.env import load_env
+load_env()  # once, before any module reads its settings
+from collectors.registry import load_config, get_collectors, build_jobs
+
+from utils.cleaner import HTML_PLATFORMS, clean_batch
+from utils.language import LanguageFilter
+from utils.sentiment import score_batch, cache_info
 from utils.database import save_to_db, init_db
-from utils.visualizer import plot_sentiment_by_platform, plot_top_words
-
-def run_pipeline():
-    """Multi-Platform OSINT pipeline orchestrator."""
-    print("🚀 Starting Multi-Platform OSINT Pipeline...")
-    
-    init_db()
-    data = []
-
-    # 1) snscrape (Twitter scraping) - disabled by default
-    use_snscrape = os.getenv("USE_SNSCRAPE", "false").lower() == "true"
-    if use_snscrape:
-        try:
-            print("🐦 Collecting from Twitter (snscrape)...")
-            data.extend(fetch_twitter_scrape("AI OR cybersecurity OR osint", limit=10))
-        except Exception as e:
-            print(f"snscrape collector failed: {e}")
-
-    # 2) Twitter API v2 (official API)
-    try:
-        print("🐦 Collecting from Twitter API v2...")
-        data.extend(fetch_twitter_v2("AI", max_results=10))
-    except Exception as e:
-        print(f"twitter v2 collector failed: {e}")
-
-    # 3) Reddit
+from utils.visualizer import render_charts
+from utils import columnar
+from utils.concurrency import run_collectors, format_timings
+from utils.dedupe import NearDuplicateIndex
+from utils.pipeline import CommitGate, Pipeline, PipelineError, Stage
+from utils.record import Record
+from utils.clients import pool_stats
+from utils.metrics import RunMetrics, profiler_from_env
+
+DEFAULT_BATCH_SIZES = {"normalize": 500, "lang": 500, "dedupe": 500, "score": 1000, "persist": 1000}
+
+
+def _normalize(records):
+    """Clean texts in place and drop empty/very short ones.
+
+    Collectors yield `Record`s, so the cleaned text is written back into the
+    same object instead of copying each record into a new dict.
+    """
+    normalized = []
+    texts = clean_batch([r.get("text") for r in records],
+                        html=[r.get("platform") in HTML_PLATFORMS for r in records])
+    for r, text in zip(records, texts):
+        if not text or len(text) < 10:
+            continue
+        r = Record.from_dict(r)
+        r.text = text
+        normalized.append(r)
+    return normalized
+
+
+def _score(records):
+    scores = score_batch([record.text for record in records])
+    for record, score in zip(records, scores):
+        record.sentiment = float(score)
+    return records
+
+
+def _batch_sizes(config):
+    sizes = dict(DEFAULT_BATCH_SIZES)
+    sizes.update({k: int(v) for k, v in config.get("batch_sizes", {}).items()})
+    for stage in sizes:
+        env = os.getenv(f"PIPELINE_{stage.upper()}_BATCH")
+        if env:
+            sizes[stage] = int(env)
+    return sizes
+
+
+def export_parquet():
+    """Append rows new since the last export to the Parquet copy, if enabled."""
+    if not columnar.export_enabled():
+        return
+    # Columnar copy for the charts and analysis; exports whatever rows are new since the last run
+    start = time.perf_counter()
     try:
-        print("🔴 Collecting from Reddit...")
-        data.extend(fetch_reddit("cybersecurity", limit=10))
+        exported = columnar.export_new_rows()
+        print(f"🧱 Parquet export: {exported} new rows in {time.perf_counter() - start:.2f}s ({columnar.PARQUET_DIR})")
     except Exception as e:
-        print(f"reddit collector failed: {e}")
+        # The rows are already saved; the next run exports them from the watermark
+        print(f"Parquet export failed: {e}")
 
-    # 4) LinkedIn (requires authentication)
-    try:
-        print("💼 Collecting from LinkedIn...")
-        data.extend(fetch_linkedin("cybersecurity", 5))
-    except Exception as e:
-        print(f"linkedin collector failed: {e}")
 
-    # 5) Mastodon (requires token)
-    try:
-        print("🦣 Collecting from Mastodon...")
-        data.extend(fetch_mastodon("cybersecurity", 10))
-    except Exception as e:
-        print(f"mastodon collector failed: {e}")
+def run_pipeline(sources=None, visualize=True, collectors=None, export=True):
+    """Multi-Platform OSINT pipeline orchestrator.
 
-    # 6) GitHub (public repos)
-    try:
-        print("🐙 Collecting from GitHub...")
-        data.extend(fetch_github("osint", 5))
-    except Exception as e:
-        print(f"github collector failed: {e}")
-
-    # 7) Stack Overflow (free API)
-    try:
-        print("📚 Collecting from Stack Overflow...")
-        data.extend(fetch_stackoverflow("osint", 5))
-    except Exception as e:
-        print(f"stackoverflow collector failed: {e}")
+    `sources` limits the run to those collector names (the scheduler passes
+    the ones that are due); `visualize=False` skips chart generation and
+    `export=False` the Parquet export (the scheduler runs both once for
+    all sources instead of from every source's thread).
+    `collectors` runs the given Collector instances instead of the
+    configured sources (benchmarks/bench_pipeline.py passes mock ones).
+    Returns the run's record counts.
+    """
+    print("🚀 Starting Multi-Platform OSINT Pipeline...")
+    metrics = RunMetrics(sources)
+    
+    init_db()
 
-    # 8) HackerNews (free API)
+    config = load_config()
+    max_workers = int(os.getenv("COLLECTOR_WORKERS", config.get("max_workers", 4)))
+    timeout = float(os.getenv("COLLECTOR_TIMEOUT", config.get("timeout", 60)))
+
+    if collectors is None:
+        collectors = get_collectors(config, only=sources)
+    for c in collectors:
+        print(f"{c.label}: {', '.join(c.queries)} (limit {c.limit})")
+    collect_jobs = {job.name: job for job in build_jobs(collectors)}
+    jobs = [(name, job, job.collector.timeout) for name, job in collect_jobs.items()]
+
+    chunk_size = int(os.getenv("COLLECTOR_CHUNK_SIZE", config.get("chunk_size", 500)))
+    queue_size = int(os.getenv("PIPELINE_QUEUE_SIZE", config.get("queue_size", 4)))
+    batch_sizes = _batch_sizes(config)
+
+    print(f"🌐 Collecting {len(jobs)} queries from {len(collectors)} sources ({max_workers} workers, {timeout:.0f}s deadline each)...")
+
+    # collect -> normalize -> lang -> dedupe -> score -> persist, each stage on
+    # its own thread behind a bounded queue. Every batch is saved as soon as it
+    # reaches the persist stage, so a failure late in the run keeps what was
+    # already stored; memory is bounded by queue_size x batch sizes.
+    dedupe = NearDuplicateIndex()
+    language_filter = LanguageFilter()
+    # Texts are marked as seen only once every record dedupe let through is stored
+    gate = CommitGate(dedupe.commit, max_pending=max(batch_sizes["dedupe"] * queue_size * 2,
+                                                    batch_sizes["score"] + batch_sizes["persist"]))
+
+    def _dedupe(records):
+        with gate:
+            kept = dedupe.filter(records)
+            gate.passed(len(kept))
+        return kept
+
+    def _persist(records):
+        saved = save_to_db(records)
+        gate.persisted(len(records))
+        return saved
+
+    stages = [
+        Stage("normalize", _normalize, batch_sizes["normalize"], drop_reason="too_short"),
+        Stage("lang", language_filter.filter, batch_sizes["lang"], drop_reason="non_english"),
+        Stage("dedupe", _dedupe, batch_sizes["dedupe"], drop_reason="duplicate"),
+        Stage("score", _score, batch_sizes["score"]),
+        Stage("persist", _persist, batch_sizes["persist"], drop_reason="already_stored"),
+    ]
+    # PROFILE_STAGE=<name> [PROFILER=pyinstrument] profiles one stage's batches
+    profiler = profiler_from_env()
+    if profiler is not None and profiler.stage not in {s.name for s in stages}:
+        print(f"⚠ PROFILE_STAGE={profiler.stage} matches no stage; profiling disabled")
+        profiler = None
+    for stage in stages:
+        if profiler is not None and stage.name == profiler.stage:
+            stage.fn = profiler.wrap(stage.fn)
+    normalize_stage, score_stage, persist_stage = stages[0], stages[3], stages[4]
+    skipped = []
+
+    def _job_end(result):
+        # Runs after every record of the job is stored
+        raw = normalize_stage.per_job.get(result.name, [0, 0])[0]
+        cleaned = score_stage.per_job.get(result.name, [0, 0])[0]
+        saved = persist_stage.per_job.get(result.name, [0, 0])[1]
+        print(f"🧹 {result.name}: {raw} raw -> {cleaned} cleaned -> {saved} saved ({result.elapsed:.2f}s)")
+        if result.timed_out:
+            print(f"⏱ {result.name} collector timed out after {result.elapsed:.1f}s")
+        elif result.error:
+            print(f"{result.name} collector failed: {result.error}")
+        else:
+            job = collect_jobs[result.name]
+            job.commit_cursor()
+            skipped.append(job.skipped)
+
+    pipeline = Pipeline(stages, queue_size=queue_size, on_job_end=_job_end, gates=[gate])
     try:
-        print("🗞 Collecting from HackerNews...")
-        data.extend(fetch_hackernews("osint", 5))
-    except Exception as e:
-        print(f"hackernews collector failed: {e}")
-
-    print(f"📊 Raw data collected: {len(data)} records")
-
-    # Clean, filter, deduplicate
-    print("🧹 Cleaning and filtering data...")
-    cleaned = []
-    seen_texts = set()
-    for r in data:
-        text = clean_text(r.get("text") or "")
-        if not text or len(text) < 10:
-            continue
-        if not is_english(text):
-            continue
-        if text in seen_texts:
-            continue
-        seen_texts.add(text)
-        
-        cleaned_record = {
-            "platform": r.get("platform"),
-            "user": r.get("user", "unknown"),
-            "timestamp": r.get("timestamp", ""),
-            "text": text,
-            "url": r.get("url", "")
-        }
-        cleaned.append(cleaned_record)
-
-    print(f"✅ Cleaned records: {len(cleaned)}")
-
-    # Add sentiment analysis
-    print("😊 Adding sentiment analysis...")
-    for record in cleaned:
-        record["sentiment"] = add_sentiment(record["text"])
-
-    # Save to database
-    print("💾 Saving to database...")
-    saved_count = save_to_db(cleaned)
-
+        results = pipeline.run(run_collectors(jobs, max_workers=max_workers, timeout=timeout, chunk_size=chunk_size))
+    except PipelineError as e:
+        # Batches already saved stay saved (and their texts stay marked);
+        # texts still in flight are unmarked so the next run re-processes them
+        dedupe.rollback()
+        dedupe.close()
+        print(f"❌ Pipeline aborted: {e}; {persist_stage.records_out} records saved before the failure")
+        metrics.record_pipeline(pipeline)
+        metrics.finish("failed", str(e)).write()
+        raise
+
+    raw_count = normalize_stage.records_in
+    cleaned_count = score_stage.records_in
+    saved_count = persist_stage.records_out
+    skipped_total = sum(skipped)
+
+    print(f"📊 Raw data collected: {raw_count} records")
+    print("⏱ Collector timings:")
+    print(format_timings(results))
+    print(f"✅ Cleaned records: {cleaned_count}")
+    print(f"🌍 Language filter: {language_filter.format_stats()}")
+    print(f"🔀 Stages (in, out, batches, busy, cpu, backpressure):")
+    print(pipeline.format_stats())
+    print(f"🔁 Near-duplicates dropped: {dedupe.duplicates} of {dedupe.seen} ({dedupe.dedupe_ratio:.1%})")
+    for cluster_id, size, platforms in dedupe.cluster_sizes(top=5):
+        print(f"   cluster {cluster_id}: {size} posts ({platforms})")
+    dedupe.close()
     print(f"💾 Saved {saved_count} records to database")
+    if export:
+        export_parquet()
+    print(f"⏭ Already collected (dropped at the cursor): {skipped_total} items")
+    info = cache_info()
+    print(f"😊 Sentiment cache: {info['hits']} hits, {info['misses']} scored, {info['size']} cached")
+    from utils.http import get_client
+    http = get_client()
+    if http.cache is not None:
+        info = http.cache.info()
+        print(f"🗄 HTTP cache ({http.mode}): {info['hits']} hits, {info['revalidated']} revalidated, "
+              f"{info['misses']} fetched, {info['entries']} entries ({info['bytes'] / 1e6:.1f} MB)")
+
+    clients = pool_stats()
+    if clients:
+        print("🔑 API clients: " + ", ".join(
+            f"{name} {s['created']} built/{s['reused']} reused/{s['refreshed']} refreshed" for name, s in clients.items()))
 
     # Generate visualizations
-    print("📈 Generating visualizations...")
-    try:
-        plot_sentiment_by_platform()
-        plot_top_words()
-        print("📊 Charts saved to screenshots/ directory")
-    except Exception as e:
-        print(f"Visualization failed: {e}")
+    if visualize:
+        print("📈 Generating visualizations...")
+        try:
+            charts = render_charts()
+            print("📊 Charts (screenshots/): " + ", ".join(f"{name} {status}" for name, status in charts.items()))
+        except Exception as e:
+            print(f"Visualization failed: {e}")
+
+    metrics.record_pipeline(pipeline)
+    metrics.record_collectors(results)
+    metrics.record_quota(http.quota)
+    metrics.finish().write()
+    print(f"📏 Run {metrics.run_id}: {metrics.wall:.2f}s wall, {metrics.cpu:.2f}s cpu; dropped {metrics.format_drops()}")
+    for host, quota in sorted(http.quota.items()):
+        if "remaining" in quota:
+            print(f"   {host}: {quota['remaining']:.0f}/{quota.get('limit', float('nan')):.0f} API calls left")
+    if profiler is not None:
+        path = profiler.report(metrics.run_id)
+        print(f"🔬 {profiler.kind} profile of stage {profiler.stage}: {path}")
 
     print("✅ Pipeline completed successfully!")
+    return {"raw": raw_count, "cleaned": cleaned_count, "saved": saved_count, "skipped": skipped_total}
 
 if __name__ == "__main__":
     run_pipeline()
@@ -0,0 +1,365 @@
+# run_backfill.py - multi-process historical backfill: one shard database per worker, merged into data/osint.db
+#
+#   python run_backfill.py --sources reddit hackernews stackoverflow --queries-file keywords.txt --limit 1000 --workers 8
+#   python run_backfill.py                   # resume: run the jobs still pending, then merge
+#   python run_backfill.py --status
+#   python run_backfill.py --retry-failed
+#   python run_backfill.py --merge-only
+import argparse
+import glob
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from utils.env import load_env
+load_env()
+from utils.database import DB_DIR, DB_PATH_DEFAULT
+
+BACKFILL_DIR = os.getenv("OSINT_BACKFILL_DIR", os.path.join(DB_DIR, "backfill"))
+BATCH_SIZE = 500
+
+Job = Tuple[str, str, int]  # (source, query, limit)
+
+
+class Manifest:
+    """Backfill jobs and merge progress in `<dir>/manifest.db`.
+
+    A job is one (source, query) pair. Adding the same pair again is a
+    no-op, so re-running a backfill command only adds new keywords, and
+    jobs that are already done are never fetched twice. A job left
+    `running` by an interrupted backfill goes back to `pending` on the next
+    start. Each shard's merge progress is the highest shard row id already
+    merged, so merging is resumable too.
+
+    Only the coordinating process writes here; workers report back
+    through their futures.
+    """
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(path, isolation_level=None)
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                source TEXT NOT NULL,
+                query TEXT NOT NULL,
+                lim INTEGER NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                shard TEXT,
+                fetched INTEGER DEFAULT 0,
+                saved INTEGER DEFAULT 0,
+                attempts INTEGER DEFAULT 0,
+                error TEXT,
+                updated_at REAL,
+                PRIMARY KEY (source, query)
+            )
+            """
+        )
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS shards (
+                path TEXT PRIMARY KEY,
+                merged_id INTEGER NOT NULL DEFAULT 0,
+                merged_rows INTEGER NOT NULL DEFAULT 0,
+                duplicates INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+
+    def add(self, jobs: Iterable[Job]) -> int:
+        before = self.conn.total_changes
+        self.conn.execute("BEGIN")
+        self.conn.executemany("INSERT OR IGNORE INTO jobs (source, query, lim) VALUES (?, ?, ?)", jobs)
+        self.conn.execute("COMMIT")
+        return self.conn.total_changes - before
+
+    def requeue(self, status: str = "running") -> int:
+        """Put jobs in `status` (interrupted `running` ones, or `failed` for a retry) back to pending."""
+        return self.conn.execute("UPDATE jobs SET status = 'pending' WHERE status = ?", (status,)).rowcount
+
+    def pending(self) -> List[Job]:
+        return self.conn.execute("SELECT source, query, lim FROM jobs WHERE status = 'pending' ORDER BY rowid").fetchall()
+
+    def mark(self, source: str, query: str, status: str, shard: Optional[str] = None, fetched: int = 0,
+             saved: int = 0, error: Optional[str] = None) -> None:
+        self.conn.execute(
+            "UPDATE jobs SET status = ?, shard = COALESCE(?, shard), fetched = ?, saved = ?, error = ?, "
+            "attempts = attempts + (? = 'running'), updated_at = ? WHERE source = ? AND query = ?",
+            (status, shard, fetched, saved, error, status, time.time(), source, query),
+        )
+
+    def merged_id(self, shard: str) -> int:
+        row = self.conn.execute("SELECT merged_id FROM shards WHERE path = ?", (shard,)).fetchone()
+        return row[0] if row else 0
+
+    def set_merged(self, shard: str, merged_id: int, rows: int, duplicates: int) -> None:
+        self.conn.execute(
+            """
+            INSERT INTO shards (path, merged_id, merged_rows, duplicates) VALUES (?, ?, ?, ?)
+            ON CONFLICT(path) DO UPDATE SET merged_id = excluded.merged_id,
+                merged_rows = merged_rows + excluded.merged_rows, duplicates = duplicates + excluded.duplicates
+            """,
+            (shard, merged_id, rows, duplicates),
+        )
+
+    def summary(self) -> Dict[str, int]:
+        return dict(self.conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+
+    def failures(self, top: int = 10) -> List[Tuple[str, str, str]]:
+        return self.conn.execute(
+            "SELECT source, query, error FROM jobs WHERE status = 'failed' ORDER BY updated_at DESC LIMIT ?", (top,)
+        ).fetchall()
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+# --- worker processes --------------------------------------------------------
+
+_worker: Dict = {}
+
+
+def _init_worker(shard_dir: str, workers: int) -> None:
+    # History doesn't change between attempts: a retried job is served the pages it already fetched.
+    # Workers share http_cache.db; its connections wait out each other's writes (BUSY_TIMEOUT).
+    os.environ.setdefault("HTTP_CACHE", "on")
+    # Parallelism comes from the backfill workers; no nested process pools
+    os.environ["SENTIMENT_WORKERS"] = "1"
+    os.environ["LANG_DETECT_WORKERS"] = "1"
+    from utils.http import set_rate_share
+    # Each process has its own token buckets; split every host's rate between them
+    set_rate_share(1.0 / workers)
+    _worker["shard"] = os.path.join(shard_dir, f"shard-{os.getpid()}.db")
+
+
+def _run_job(source: str, query: str, limit: int) -> Dict:
+    """Fetch one (source, query), then clean, language-filter, score and save it to this worker's shard.
+
+    The job only returns (and is marked done) when the collector finished
+    without error; collectors raise on API errors, rate limits and quota
+    exhaustion, which fails the job instead of recording a partial fetch as
+    complete. Unconfigured collectors (credentials or client library
+    missing) would print a message and yield nothing, so the job checks
+    `Collector.unavailable()` first and fails with the reason; a query with
+    no matches is done with fetched=0. Records already written to the shard
+    by a failed attempt stay there and a retry's INSERT OR IGNORE skips them.
+    """
+    import main
+    from collectors.registry import discover, load_config
+    from utils.database import get_writer
+    from utils.language import LanguageFilter
+
+    collector_cls = discover().get(source)
+    if collector_cls is None:
+        raise RuntimeError(f"no collector named {source!r}")
+    options = dict(load_config().get("sources", {}).get(source, {}), limit=limit)
+    collector = collector_cls(options)
+    reason = collector.unavailable()
+    if reason:
+        raise RuntimeError(f"source not configured: {reason}")
+    writer = get_writer(_worker["shard"])
+    language_filter = _worker.setdefault("lang", LanguageFilter())
+    counts = {"fetched": 0, "cleaned": 0, "saved": 0}
+    start = time.perf_counter()
+
+    def flush(batch):
+        counts["fetched"] += len(batch)
+        kept = language_filter.filter(main._normalize(batch))
+        counts["cleaned"] += len(kept)
+        if kept:
+            counts["saved"] += writer.write(main._score(kept))
+
+    # Full history: no incremental cursor, and the live collector_cursors are left alone
+    batch = []
+    for record in collector.fetch(query, limit):
+        batch.append(record)
+        if len(batch) >= BATCH_SIZE:
+            flush(batch)
+            batch = []
+    if batch:
+        flush(batch)
+    return dict(counts, shard=_worker["shard"], elapsed=time.perf_counter() - start)
+
+
+# --- coordinator -------------------------------------------------------------
+
+def run_jobs(manifest: Manifest, shard_dir: str, workers: int) -> None:
+    """Run every pending job across `workers` processes, recording each outcome in the manifest."""
+    jobs = manifest.pending()
+    if not jobs:
+        print("No pending backfill jobs")
+        return
+    os.makedirs(shard_dir, exist_ok=True)
+    print(f"📦 Backfilling {len(jobs)} jobs with {workers} worker processes...")
+    done = 0
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(shard_dir, workers))
+    try:
+        futures = {}
+        for source, query, limit in jobs:
+            manifest.mark(source, query, "running")
+            futures[pool.submit(_run_job, source, query, limit)] = (source, query)
+        for future in as_completed(futures):
+            source, query = futures[future]
+            done += 1
+            try:
+                result = future.result()
+            except BrokenProcessPool:
+                # A worker died (OOM, kill); leave the job for the next run rather than failing it
+                manifest.mark(source, query, "pending")
+                print(f"[{done}/{len(jobs)}] {source}:{query} lost with its worker process; left pending")
+            except Exception as e:
+                manifest.mark(source, query, "failed", error=f"{type(e).__name__}: {e}")
+                print(f"[{done}/{len(jobs)}] {source}:{query} failed: {type(e).__name__}: {e}")
+            else:
+                manifest.mark(source, query, "done", shard=result["shard"], fetched=result["fetched"],
+                              saved=result["saved"])
+                print(f"[{done}/{len(jobs)}] {source}:{query}: {result['fetched']} fetched -> "
+                      f"{result['cleaned']} cleaned -> {result['saved']} saved ({result['elapsed']:.1f}s)")
+    except KeyboardInterrupt:
+        print("Interrupted; unfinished jobs resume on the next run")
+        pool.shutdown(wait=False, cancel_futures=True)
+        raise
+    pool.shutdown()
+
+
+def dedupe_path_for(db_path: str) -> str:
+    """The near-duplicate index that belongs to `db_path`: the live one for data/osint.db, else `<db>.dedupe.db`."""
+    from utils.dedupe import DEDUPE_DB_DEFAULT
+    if os.path.abspath(db_path) == os.path.abspath(DB_PATH_DEFAULT):
+        return DEDUPE_DB_DEFAULT
+    return os.path.splitext(db_path)[0] + ".dedupe.db"
+
+
+def merge_shards(manifest: Manifest, shard_dir: str, db_path: str = DB_PATH_DEFAULT,
+                 dedupe_path: Optional[str] = None, chunk_size: int = 5000) -> Tuple[int, int]:
+    """Merge shard rows not merged yet into `db_path`; returns (saved, near-duplicates dropped).
+
+    Rows go through the near-duplicate index of `db_path` (`dedupe_path`,
+    default `dedupe_path_for(db_path)`), so backfilled posts are
+    deduplicated against each other and against everything already stored
+    there, and a scratch database never touches the live index; exact URL
+    repeats are ignored by the database. Per
+    chunk the rows are saved, then the index is committed, then the shard's
+    merge position advances, so an interrupted merge repeats at most one
+    chunk, whose rows the index and the URL constraint then drop.
+    """
+    from utils.database import DatabaseWriter
+    from utils.dedupe import NearDuplicateIndex
+    from utils.record import Record
+
+    dedupe = NearDuplicateIndex(dedupe_path or dedupe_path_for(db_path))
+    saved = dropped = 0
+    try:
+        with DatabaseWriter(db_path) as writer:
+            for shard in sorted(glob.glob(os.path.join(shard_dir, "shard-*.db"))):
+                last_id = manifest.merged_id(shard)
+                conn = sqlite3.connect(shard)
+                try:
+                    while True:
+                        rows = conn.execute(
+                            "SELECT id, platform, user, timestamp, ts, text, url, sentiment FROM osint_data "
+                            "WHERE id > ? ORDER BY id LIMIT ?", (last_id, chunk_size)
+                        ).fetchall()
+                        if not rows:
+                            break
+                        records = [Record(platform=p, user=u, timestamp=t, ts=ts, text=x, url=l, sentiment=s)
+                                   for _, p, u, t, ts, x, l, s in rows]
+                        kept = dedupe.filter(records)
+                        saved += writer.write(kept)
+                        dedupe.commit()
+                        dropped += len(records) - len(kept)
+                        last_id = rows[-1][0]
+                        manifest.set_merged(shard, last_id, len(rows), len(records) - len(kept))
+                finally:
+                    conn.close()
+    except BaseException:
+        dedupe.rollback()
+        raise
+    finally:
+        dedupe.close()
+    return saved, dropped
+
+
+def _read_queries(path: str) -> List[str]:
+    with open(path, encoding="utf-8") as fh:
+        return [line.strip() for line in fh if line.strip() and not line.lstrip().startswith("#")]
+
+
+def plan(sources: List[str], queries: Optional[List[str]], limit: Optional[int]) -> List[Job]:
+    """Jobs for every source x query, interleaved by source so concurrent workers spread over hosts."""
+    from collectors.registry import discover, load_config
+    registry = discover()
+    unknown = [s for s in sources if s not in registry]
+    if unknown:
+        raise SystemExit(f"Unknown sources: {', '.join(unknown)} (available: {', '.join(sorted(registry))})")
+    config = load_config().get("sources", {})
+    per_source = {}
+    for source in sources:
+        collector = registry[source](config.get(source, {}))
+        per_source[source] = (queries or collector.queries, limit or collector.limit)
+    jobs = []
+    for i in range(max(len(q) for q, _ in per_source.values())):
+        for source, (source_queries, source_limit) in per_source.items():
+            if i < len(source_queries):
+                jobs.append((source, source_queries[i], source_limit))
+    return jobs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sharded multi-process backfill into data/osint.db")
+    parser.add_argument("--sources", nargs="+", help="collector names (default with --queries: the enabled ones)")
+    parser.add_argument("--queries", nargs="+", help="queries/keywords for every source (default: each source's)")
+    parser.add_argument("--queries-file", help="file with one query per line ('#' comments allowed)")
+    parser.add_argument("--limit", type=int, help="items per job (default: each source's limit)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--dir", default=BACKFILL_DIR, help="manifest and shard directory")
+    parser.add_argument("--db", default=DB_PATH_DEFAULT, help="database the shards are merged into")
+    parser.add_argument("--dedupe-db", help="near-duplicate index for the merge (default: the one belonging to --db)")
+    parser.add_argument("--status", action="store_true", help="print job counts and exit")
+    parser.add_argument("--retry-failed", action="store_true", help="requeue failed jobs")
+    parser.add_argument("--merge-only", action="store_true", help="skip fetching; merge finished shards")
+    args = parser.parse_args()
+
+    manifest = Manifest(os.path.join(args.dir, "manifest.db"))
+    shard_dir = os.path.join(args.dir, "shards")
+    try:
+        if args.status:
+            print(", ".join(f"{n} {status}" for status, n in sorted(manifest.summary().items())) or "No jobs")
+            for source, query, error in manifest.failures():
+                print(f"   {source}:{query}: {error}")
+            return
+
+        resumed = manifest.requeue("running")
+        if resumed:
+            print(f"↩ {resumed} interrupted jobs requeued")
+        if args.retry_failed:
+            print(f"↩ {manifest.requeue('failed')} failed jobs requeued")
+        queries = args.queries or (_read_queries(args.queries_file) if args.queries_file else None)
+        if args.sources or queries:
+            from collectors.registry import get_collectors
+            sources = args.sources or [c.name for c in get_collectors()]
+            jobs = plan(sources, queries, args.limit)
+            print(f"🗂 {manifest.add(jobs)} new jobs added ({len(jobs)} requested)")
+
+        if not args.merge_only:
+            run_jobs(manifest, shard_dir, max(1, args.workers))
+
+        print("🔀 Merging shards...")
+        start = time.perf_counter()
+        saved, dropped = merge_shards(manifest, shard_dir, args.db, args.dedupe_db)
+        print(f"💾 Merged {saved} new records into {args.db}, {dropped} near-duplicates dropped "
+              f"({time.perf_counter() - start:.1f}s)")
+        from utils import columnar
+        if args.db == DB_PATH_DEFAULT and columnar.export_enabled():
+            print(f"🧱 Parquet export: {columnar.export_new_rows(args.db)} new rows")
+        print(", ".join(f"{n} {status}" for status, n in sorted(manifest.summary().items())))
+    finally:
+        manifest.close()
+
+
+if __name__ == "__main__":
+    main()
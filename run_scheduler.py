@@ -1,15 +1,186 @@
-# run_scheduler.py
-import schedule
+# run_scheduler.py - long-running collection daemon
+#
+#   python run_scheduler.py            # run due sources until Ctrl+C / SIGTERM
+#   python run_scheduler.py --once     # one pass over every source, then exit
+import argparse
+import os
+import random
+import signal
+import threading
 import time
-from main import run_pipeline
+from typing import Dict
 
-# Run once immediately
-run_pipeline()
+from collectors.registry import load_config, get_collectors
+from main import export_parquet, run_pipeline
+from utils.clients import clear_pools
+from utils.database import init_db
+from utils.visualizer import render_charts
 
-# Then schedule every hour (can set to every 30 minutes)
-schedule.every(1).hours.do(run_pipeline)
+DEFAULT_INTERVAL = 3600.0
+DEFAULT_JITTER = 0.1
 
-print("Scheduler started. Press Ctrl+C to stop.")
-while True:
-    schedule.run_pending()
-    time.sleep(10)
+
+class Scheduler:
+    """Runs each source on its own cadence, concurrently with the others.
+
+    Every source has an interval (`interval` in its sources.json section,
+    else the top-level `interval`), stretched or shrunk by up to `jitter`
+    (a fraction) so sources don't fire in lockstep. Each due source gets its
+    own pipeline run on its own thread, and a source is never started again
+    while its previous run is in flight, so a slow LinkedIn or a large Stack
+    Overflow run only delays itself. A run that overruns pushes that
+    source's next due time to when it finished: missed runs coalesce into
+    one instead of piling up.
+
+    Steps that read the whole database run on one "publish" slot under
+    `publish_lock`, not from each source's thread: the Parquet export
+    after any run saved rows (several finished runs share one export), and
+    charts every `charts_interval` seconds.
+
+    Collector clients and the pooled HTTP session are module-level, so they
+    are reused from run to run.
+    """
+
+    def __init__(self, config=None):
+        config = load_config() if config is None else config
+        default = float(config.get("interval", DEFAULT_INTERVAL))
+        self.jitter = float(config.get("jitter", DEFAULT_JITTER))
+        self.intervals = {c.name: c.interval or default for c in get_collectors(config)}
+        self.charts_interval = float(config.get("charts_interval", default))
+        now = time.time()
+        self.next_run = {name: now for name in self.intervals}
+        self.next_charts = now
+        self.export_pending = False
+        self.running: Dict[str, threading.Thread] = {}  # in-flight runs by source ("publish" for export/charts)
+        self.lock = threading.Lock()
+        self.publish_lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.wake = threading.Event()
+
+    def _jittered(self, interval):
+        return interval * (1 + random.uniform(-self.jitter, self.jitter))
+
+    def due(self, now):
+        with self.lock:
+            return sorted(name for name, at in self.next_run.items() if at <= now and name not in self.running)
+
+    def _start(self, name, target):
+        thread = threading.Thread(target=target, name=f"run-{name}", daemon=True)
+        with self.lock:
+            self.running[name] = thread
+        thread.start()
+
+    def run_source(self, name):
+        started = time.time()
+        print(f"⏰ Running {name}")
+        saved = 0
+        try:
+            saved = run_pipeline(sources=[name], visualize=False, export=False)["saved"]
+        except Exception as e:
+            # One bad run must not kill the daemon; the source retries on its next slot
+            print(f"{name} run failed: {type(e).__name__}: {e}")
+        finished = time.time()
+        with self.lock:
+            self.next_run[name] = max(finished, started + self._jittered(self.intervals[name]))
+            self.export_pending = self.export_pending or saved > 0
+            self.running.pop(name, None)
+        print(f"⏰ {name} took {finished - started:.1f}s; next in {self.next_run[name] - finished:.0f}s")
+        self.wake.set()
+
+    def _publish_due(self, now):
+        return (self.export_pending or self.next_charts <= now) and "publish" not in self.running
+
+    def publish(self):
+        started = time.time()
+        with self.lock:
+            export, self.export_pending = self.export_pending, False
+            render = self.next_charts <= started
+        with self.publish_lock:
+            if export:
+                export_parquet()
+            if render:
+                try:
+                    charts = render_charts()
+                    print("📊 Charts (screenshots/): " + ", ".join(f"{name} {status}" for name, status in charts.items()))
+                except Exception as e:
+                    print(f"Visualization failed: {e}")
+        with self.lock:
+            if render:
+                self.next_charts = max(time.time(), started + self.charts_interval)
+            self.running.pop("publish", None)
+        self.wake.set()
+
+    def run(self):
+        if not self.intervals:
+            print("No enabled sources to schedule")
+            return
+        # Migrate once up front rather than from several runs at the same time
+        init_db()
+        print("Scheduler started. Press Ctrl+C to stop.")
+        while not self.stop_event.is_set():
+            now = time.time()
+            for name in self.due(now):
+                self._start(name, lambda name=name: self.run_source(name))
+            with self.lock:
+                publish_due = self._publish_due(now)
+            if publish_due:
+                self._start("publish", self.publish)
+            with self.lock:
+                idle = [at for name, at in self.next_run.items() if name not in self.running]
+                if "publish" not in self.running:
+                    idle.append(now if self.export_pending else self.next_charts)
+            self.wake.wait(max(0.0, min(idle) - time.time()) if idle else None)
+            self.wake.clear()
+        with self.lock:
+            in_flight = list(self.running.values())
+        for thread in in_flight:
+            thread.join()
+        if self.export_pending:
+            # Rows saved by the runs that just finished
+            export_parquet()
+        print("Scheduler stopped.")
+
+    def stop(self):
+        self.stop_event.set()
+        self.wake.set()
+
+
+def _install_signal_handlers(scheduler):
+    def handle(signum, frame):
+        if scheduler.stop_event.is_set():
+            print("Second signal received; exiting immediately.")
+            os._exit(130)
+        print("Stopping after the runs in flight finish (signal again to exit now)...")
+        scheduler.stop()
+
+    signal.signal(signal.SIGINT, handle)
+    if hasattr(signal, "SIGTERM"):
+        signal.signal(signal.SIGTERM, handle)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OSINT collection daemon")
+    parser.add_argument("--once", action="store_true", help="run every source once and exit")
+    args = parser.parse_args()
+
+    port = os.getenv("METRICS_PORT")
+    if port:
+        from utils.metrics import serve
+        serve(int(port))
+        print(f"📏 Prometheus metrics for the last run on :{port}/metrics")
+
+    try:
+        if args.once:
+            run_pipeline()
+            return
+        scheduler = Scheduler()
+        _install_signal_handlers(scheduler)
+        scheduler.run()
+    finally:
+        from utils.http import get_client
+        get_client().close()
+        clear_pools()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,33 +1,86 @@
-def clean_text(text): 
- text = re.sub(r"http\S+", "", text) # remove URLs 
- text = re.sub(r"[^A-Za-z0-9\s]", "", text) # remove symbols  return text.strip()
+import html
 import re
-from langdetect import detect, DetectorFactory
 
-# make language detection deterministic
-DetectorFactory.seed = 0
+# URLs, HTML tags and HTML entities are matched by one precompiled alternation,
+# so markup costs a single scan and only when the text can contain it. Tags
+# are only stripped from sources whose text is HTML: in plain text "<" and
+# ">" are content ("I <3 python", "a<b and c>d"), so that pattern leaves them.
+_ENTITY = r"&(?:#[0-9]+|#[xX][0-9a-fA-F]+|[A-Za-z][A-Za-z0-9]*);"
+_MARKUP_RE = re.compile(r"http\S+|<[^<>]+>|" + _ENTITY)
+_TEXT_RE = re.compile(r"http\S+|" + _ENTITY)
 
-def clean_text(text: str) -> str:
-	"""Clean raw text: remove URLs, punctuation, control chars and extra whitespace.
+# Platforms whose collectors return HTML (Mastodon status content)
+HTML_PLATFORMS = frozenset({"mastodon"})
 
-	Returns empty string for None input.
+# Same character class as the original `[^\w\s'"]` punctuation filter:
+# a C-level bytes.translate deletion table for ASCII text, the regex only
+# for text with non-ASCII characters.
+_ASCII_DELETE = bytes(
+	i for i in range(128)
+	if not (chr(i).isalnum() or chr(i) == "_" or chr(i).isspace() or chr(i) in "'\"")
+)
+_PUNCT_RE = re.compile(r"[^\w\s'\"]+")
+
+
+def _markup_repl(m) -> str:
+	s = m.group()
+	if s[0] == "&":
+		# decode the entity; the punctuation pass below decides whether it survives
+		return html.unescape(s)
+	if s[0] == "<":
+		# tags separate words ("</p><p>")
+		return " "
+	return ""
+
+
+def clean_text(text: str, html: bool = False) -> str:
+	"""Clean raw text: remove URLs, HTML entities, punctuation, control chars and extra whitespace.
+
+	Keeps letters, numbers, underscores and basic quotes. HTML tags are
+	removed too when `html` is true. Returns empty string for None input.
 	"""
 	if not text:
 		return ""
 
-	# Remove URLs
-	text = re.sub(r"http\S+", "", text)
+	if html:
+		if "http" in text or "<" in text or "&" in text:
+			text = _MARKUP_RE.sub(_markup_repl, text)
+	elif "http" in text or "&" in text:
+		text = _TEXT_RE.sub(_markup_repl, text)
 
-	# Replace control chars with space
-	text = re.sub(r"[\r\n\t]+", " ", text)
+	if text.isascii():
+		text = text.encode("ascii").translate(None, _ASCII_DELETE).decode("ascii")
+	else:
+		text = _PUNCT_RE.sub("", text)
 
-	# Remove most punctuation (keep letters, numbers, underscores and basic quotes)
-	text = re.sub(r"[^\w\s\'\"]", "", text)
+	# Collapse whitespace (including \r\n\t)
+	return " ".join(text.split())
+
+
+def clean_batch(texts, html=False):
+	"""Clean many texts at once.
+
+	Accepts any iterable of strings (returns a list) or a pandas Series
+	(returns a Series with the same index). `html` applies to the whole
+	batch, or, for a list, may be one flag per text. Repeated texts in the
+	batch, common with reposts and cross-posts, are cleaned once.
+	"""
+	memo = {}
 
-	# Collapse whitespace
-	text = re.sub(r"\s+", " ", text).strip()
+	def _clean(t, is_html=html):
+		if not isinstance(t, str):
+			return ""
+		key = (t, bool(is_html))
+		out = memo.get(key)
+		if out is None:
+			out = memo[key] = clean_text(t, is_html)
+		return out
 
-	return text
+	if hasattr(texts, "index") and hasattr(texts, "map") and hasattr(texts, "dtype"):
+		return texts.map(_clean)
+	if isinstance(html, bool):
+		return [_clean(t) for t in texts]
+	return [_clean(t, h) for t, h in zip(texts, html)]
 
 
 def is_english(text: str) -> bool:
@@ -35,6 +88,9 @@ def is_english(text: str) -> bool:
 	if not text:
 		return False
 	try:
+		from langdetect import detect, DetectorFactory
+		# make language detection deterministic
+		DetectorFactory.seed = 0
 		return detect(text) == "en"
 	except Exception:
 		return False
@@ -43,11 +99,9 @@ def is_english(text: str) -> bool:
 def filter_english(records: list) -> list:
 	"""Keep only records whose 'text' field is detected as English.
 
-	Expects records to be dictionaries with a 'text' key.
+	Expects records to be Records or dictionaries with a 'text' key. Platform
+	language tags ('lang') are trusted when present; see utils.language.LanguageFilter.
 	"""
-	out = []
-	for r in records:
-		text = r.get("text") if isinstance(r, dict) else None
-		if is_english(text):
-			out.append(r)
-	return out
+	from utils.language import LanguageFilter
+	from utils.record import Record
+	return LanguageFilter().filter([r for r in records if isinstance(r, (dict, Record))])
@@ -0,0 +1,145 @@
+# utils/clients.py - long-lived API clients shared across pipeline runs
+import os
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from utils.database import DB_DIR
+
+# Reusable login state (e.g. LinkedIn session cookies) kept between processes
+SESSION_DIR = os.getenv("OSINT_SESSION_DIR", os.path.join(DB_DIR, "sessions"))
+
+_AUTH_ERROR_NAMES = ("Unauthorized", "OAuth", "SessionExpired", "Challenge", "InvalidToken")
+
+
+def is_auth_error(exc: BaseException) -> bool:
+    """True when `exc` means the client's credentials or session were rejected.
+
+    Decided by the HTTP status the client library attached, or by its auth
+    exception type (tweepy.Unauthorized, MastodonUnauthorizedError, PRAW's
+    OAuthException/InvalidToken, linkedin-api's session and challenge
+    errors). The message text is not searched: IDs, URLs and counts can
+    contain "401", and a false positive here throws away a valid session.
+    """
+    response = getattr(exc, "response", None)
+    status = getattr(response, "status_code", None) or getattr(exc, "status_code", None)
+    if status == 401:
+        return True
+    name = type(exc).__name__
+    return any(part in name for part in _AUTH_ERROR_NAMES)
+
+
+class ClientPool:
+    """Lazily built, reusable clients for one API.
+
+    Client libraries such as PRAW are not thread-safe, so each concurrent
+    job checks out its own instance; instances go back to the pool when the
+    job finishes and are reused by later jobs and later scheduler runs
+    instead of being rebuilt (and re-authenticated) on every call.
+
+    Clients are never refreshed pre-emptively. One released with an auth
+    error is dropped together with its idle siblings (they share the same
+    credentials), `on_invalidate` clears any persisted session, and the
+    next `acquire()` logs in again.
+    """
+
+    def __init__(self, factory: Callable[[], Any], max_idle: int = 4,
+                 on_invalidate: Optional[Callable[[], None]] = None):
+        self.factory = factory
+        self.max_idle = max_idle
+        self.on_invalidate = on_invalidate
+        self._idle: List[Any] = []
+        self._lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+        self.refreshed = 0
+
+    def acquire(self) -> Any:
+        """Take an idle client, or build one; the factory's exception propagates."""
+        with self._lock:
+            if self._idle:
+                self.reused += 1
+                return self._idle.pop()
+        client = self.factory()
+        with self._lock:
+            self.created += 1
+        return client
+
+    def release(self, client: Any, error: Optional[BaseException] = None) -> None:
+        """Return `client` to the pool, or invalidate it if `error` is an auth failure."""
+        if error is not None and is_auth_error(error):
+            self.invalidate()
+            return
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(client)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._idle.clear()
+            self.refreshed += 1
+        if self.on_invalidate is not None:
+            try:
+                self.on_invalidate()
+            except OSError:
+                pass
+
+    @contextmanager
+    def client(self) -> Iterator[Any]:
+        client = self.acquire()
+        try:
+            yield client
+        except Exception as e:
+            self.release(client, e)
+            raise
+        self.release(client)
+
+    def call(self, fn: Callable[[Any], Any]) -> Any:
+        """Run `fn(client)`; on an auth failure log in again and retry once."""
+        for attempt in range(2):
+            client = self.acquire()
+            try:
+                result = fn(client)
+            except Exception as e:
+                self.release(client, e)
+                if attempt == 0 and is_auth_error(e):
+                    continue
+                raise
+            self.release(client)
+            return result
+
+    def clear(self) -> None:
+        with self._lock:
+            self._idle.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"created": self.created, "reused": self.reused,
+                    "refreshed": self.refreshed, "idle": len(self._idle)}
+
+
+_pools: Dict[str, ClientPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(name: str, factory: Callable[[], Any],
+             on_invalidate: Optional[Callable[[], None]] = None) -> ClientPool:
+    """Return the process-wide pool for `name`, creating it with `factory` on first use."""
+    with _pools_lock:
+        pool = _pools.get(name)
+        if pool is None:
+            pool = _pools[name] = ClientPool(factory, on_invalidate=on_invalidate)
+        return pool
+
+
+def pool_stats() -> Dict[str, Dict[str, int]]:
+    with _pools_lock:
+        pools = dict(_pools)
+    return {name: pool.stats() for name, pool in sorted(pools.items())}
+
+
+def clear_pools() -> None:
+    """Drop every idle client (e.g. after credentials change)."""
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.clear()
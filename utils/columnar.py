@@ -0,0 +1,264 @@
+# utils/columnar.py - Parquet copy of osint_data, partitioned by platform and day, for column- and partition-pruned reads
+import contextlib
+import glob
+import importlib.util
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Iterable, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: only the in-process lock applies
+    fcntl = None
+
+from utils.database import DB_DIR, DB_PATH_DEFAULT, _ensure_db
+
+# pyarrow is optional: the export is skipped and readers fall back to SQLite
+# when it is missing. It is imported inside the functions that need it.
+PARQUET_DIR = os.getenv("OSINT_PARQUET_DIR", os.path.join(DB_DIR, "parquet"))
+STATE_FILE = "_export_state.json"  # leading "_" keeps it out of dataset scans
+LOCK_FILE = "_export.lock"
+COLUMNS = ("id", "user", "timestamp", "ts", "text", "url", "sentiment", "content_hash")
+PARTITIONS = ("platform", "date")
+COMPACT_MIN_FILES = int(os.getenv("PARQUET_COMPACT_FILES", "16"))
+
+# Exports and compactions of one directory must not interleave: both rewrite
+# the state file and partition files. The lock covers threads in this
+# process (scheduler runs, the CLI); the file lock covers other processes.
+_lock = threading.Lock()
+
+
+def available() -> bool:
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def export_enabled() -> bool:
+    """PARQUET_EXPORT=on|off|auto (default): auto exports whenever pyarrow is installed."""
+    mode = os.getenv("PARQUET_EXPORT", "auto").strip().lower()
+    if mode in ("off", "0", "false", "no"):
+        return False
+    if mode in ("on", "1", "true", "yes"):
+        return True
+    return available()
+
+
+def has_export(out_dir: str = PARQUET_DIR) -> bool:
+    return available() and os.path.exists(os.path.join(out_dir, STATE_FILE))
+
+
+def _schemas():
+    import pyarrow as pa
+    partition = pa.schema([("platform", pa.string()), ("date", pa.string())])
+    table = pa.schema([
+        ("id", pa.int64()), ("user", pa.string()), ("timestamp", pa.string()), ("ts", pa.int64()),
+        ("text", pa.string()), ("url", pa.string()), ("sentiment", pa.float64()), ("content_hash", pa.string()),
+    ] + list(partition))
+    return table, partition
+
+
+def _write_options():
+    import pyarrow.dataset as ds
+    return ds.ParquetFileFormat().make_write_options(compression="zstd")
+
+
+def _load_state(out_dir: str) -> dict:
+    try:
+        with open(os.path.join(out_dir, STATE_FILE), encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return {"last_id": 0}
+
+
+def _save_state(out_dir: str, state: dict) -> None:
+    fd, tmp = tempfile.mkstemp(prefix="_", suffix=".tmp", dir=out_dir)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            json.dump(state, fh)
+        os.replace(tmp, os.path.join(out_dir, STATE_FILE))
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(tmp)
+        raise
+
+
+@contextlib.contextmanager
+def _export_lock(out_dir: str):
+    """Hold the export lock for out_dir, across threads and processes."""
+    os.makedirs(out_dir, exist_ok=True)
+    with _lock, open(os.path.join(out_dir, LOCK_FILE), "a") as fh:
+        if fcntl is not None:
+            fcntl.flock(fh, fcntl.LOCK_EX)  # released when fh is closed
+        yield
+
+
+def _to_table(rows: List[tuple]):
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    schema, _ = _schemas()
+    ids, platforms, users, timestamps, tss, texts, urls, sentiments, hashes = zip(*rows)
+    # Undated posts (ts NULL) get a null date partition, so day ranges exclude them as in term_counts
+    dates = [time.strftime("%Y-%m-%d", time.gmtime(ts)) if ts is not None else None for ts in tss]
+    table = pa.Table.from_arrays(
+        [pa.array(c, type=f.type) for c, f in zip(
+            (ids, users, timestamps, tss, texts, urls, sentiments, hashes, platforms, dates), schema)],
+        schema=schema,
+    )
+    # Sorted by ts within each partition so row-group statistics prune time ranges
+    return table.take(pc.sort_indices(table, [("platform", "ascending"), ("date", "ascending"), ("ts", "ascending")]))
+
+
+def export_new_rows(db_path: str = DB_PATH_DEFAULT, out_dir: str = PARQUET_DIR,
+                    chunk_size: int = 100_000, rebuild: bool = False) -> int:
+    """Append rows added to osint_data since the last export; returns the number exported.
+
+    Rows are only ever inserted (INSERT OR IGNORE), so the highest exported
+    id is a complete watermark. Each chunk becomes one file per
+    platform=<p>/date=<YYYY-MM-DD> partition it touches, named after the
+    chunk's first id, so re-running after a crash overwrites rather than
+    duplicates. Partitions that accumulate COMPACT_MIN_FILES files are
+    compacted afterwards. `rebuild` drops the export and starts from id 0.
+    Concurrent calls for the same out_dir run one at a time.
+    """
+    _ensure_db(db_path)
+    with _export_lock(out_dir):
+        return _export_new_rows(db_path, out_dir, chunk_size, rebuild)
+
+
+def _export_new_rows(db_path: str, out_dir: str, chunk_size: int, rebuild: bool) -> int:
+    import pyarrow.dataset as ds
+    _, partition = _schemas()
+    if rebuild:
+        for path in glob.glob(os.path.join(out_dir, "platform=*", "date=*", "*.parquet")):
+            os.remove(path)
+        _save_state(out_dir, {"last_id": 0})
+    state = _load_state(out_dir)
+    last_id = int(state.get("last_id", 0))
+
+    conn = sqlite3.connect(db_path)
+    exported = 0
+    touched = set()
+    try:
+        max_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM osint_data").fetchone()[0]
+        if max_id < last_id:
+            print(f"Parquet export is ahead of {db_path} (id {last_id} > {max_id}); "
+                  f"run `python -m utils.columnar --rebuild` if the database was recreated")
+            return 0
+        while True:
+            rows = conn.execute(
+                "SELECT id, platform, user, timestamp, ts, text, url, sentiment, content_hash "
+                "FROM osint_data WHERE id > ? ORDER BY id LIMIT ?", (last_id, chunk_size)
+            ).fetchall()
+            if not rows:
+                break
+            table = _to_table(rows)
+            ds.write_dataset(
+                table, out_dir, format="parquet",
+                partitioning=ds.partitioning(partition, flavor="hive"),
+                basename_template=f"part-{rows[0][0]:012d}-{{i}}.parquet",
+                existing_data_behavior="overwrite_or_ignore",
+                file_options=_write_options(),
+                file_visitor=lambda f: touched.add(os.path.dirname(f.path)),
+            )
+            last_id = rows[-1][0]
+            exported += len(rows)
+            _save_state(out_dir, {"last_id": last_id, "db_path": os.path.abspath(db_path)})
+    finally:
+        conn.close()
+    for directory in touched:
+        if len(glob.glob(os.path.join(directory, "*.parquet"))) >= COMPACT_MIN_FILES:
+            _compact_partition(directory)
+    return exported
+
+
+def compact_partition(directory: str) -> None:
+    """Merge a partition's files into one, dropping rows repeated across files.
+
+    The merged file is written under a hidden name and renamed into place
+    before the inputs are removed, so readers never miss rows; a crash in
+    between can only leave duplicates, which the next compaction removes.
+    `directory` is a platform=<p>/date=<d> partition of an export.
+    """
+    with _export_lock(os.path.dirname(os.path.dirname(directory))):
+        _compact_partition(directory)
+
+
+def _compact_partition(directory: str) -> None:
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+    files = sorted(glob.glob(os.path.join(directory, "*.parquet")))
+    if len(files) < 2:
+        return
+    table = ds.dataset(files, format="parquet").to_table()
+    table = table.take(pc.sort_indices(table, [("ts", "ascending"), ("id", "ascending")]))
+    ids = table.column("id").to_pylist()
+    keep = [i for i, row_id in enumerate(ids) if i == 0 or row_id != ids[i - 1]]
+    if len(keep) < len(ids):
+        table = table.take(keep)
+    name = f"part-{min(ids):012d}-compact.parquet"
+    fd, tmp = tempfile.mkstemp(prefix="_", suffix=".parquet.tmp", dir=directory)
+    os.close(fd)
+    try:
+        pq.write_table(table, tmp, compression="zstd")
+        os.replace(tmp, os.path.join(directory, name))
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(tmp)
+        raise
+    for path in files:
+        if os.path.basename(path) != name:
+            os.remove(path)
+
+
+def dataset(out_dir: str = PARQUET_DIR):
+    """The export as a pyarrow Dataset with typed hive partitions (platform, date)."""
+    import pyarrow.dataset as ds
+    _, partition = _schemas()
+    return ds.dataset(out_dir, format="parquet", partitioning=ds.partitioning(partition, flavor="hive"))
+
+
+def partition_filter(platform: Optional[str] = None, since: Optional[str] = None, until: Optional[str] = None):
+    """Filter expression on the partition columns; `since`/`until` are 'YYYY-MM-DD' days, as [since, until)."""
+    import pyarrow.dataset as ds
+    expr = None
+    for clause in (
+        ds.field("platform") == platform if platform is not None else None,
+        ds.field("date") >= since if since is not None else None,
+        ds.field("date") < until if until is not None else None,
+    ):
+        if clause is not None:
+            expr = clause if expr is None else expr & clause
+    return expr
+
+
+def read_table(columns: Iterable[str], platform: Optional[str] = None, since: Optional[str] = None,
+               until: Optional[str] = None, where=None, out_dir: str = PARQUET_DIR):
+    """Read only `columns` from the partitions matching platform/day range (plus an optional `where` expression).
+
+    Partition filters skip whole directories; `where` on a data column such
+    as `ts` is pushed down to row-group statistics.
+    """
+    expr = partition_filter(platform, since, until)
+    if where is not None:
+        expr = where if expr is None else expr & where
+    return dataset(out_dir).to_table(columns=list(columns), filter=expr)
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Export osint_data to partitioned Parquet")
+    parser.add_argument("--db", default=DB_PATH_DEFAULT)
+    parser.add_argument("--out", default=PARQUET_DIR)
+    parser.add_argument("--rebuild", action="store_true", help="drop the export and re-export every row")
+    args = parser.parse_args()
+    start = time.perf_counter()
+    n = export_new_rows(args.db, args.out, rebuild=args.rebuild)
+    print(f"Exported {n} rows to {args.out} in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+# utils/concurrency.py
+import queue
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+@dataclass
+class CollectorResult:
+    """A chunk of records, or the final status, from one collector job.
+
+    Chunks arrive with `done=False`. Each job ends with exactly one
+    `done=True` result carrying the total `count`, the elapsed time, the
+    CPU time the job's thread used and any error or timeout.
+    """
+    name: str
+    records: List[Dict] = field(default_factory=list)
+    elapsed: float = 0.0
+    error: Optional[str] = None
+    timed_out: bool = False
+    done: bool = True
+    count: int = 0
+    cpu: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and not self.timed_out
+
+
+def run_collectors(jobs: List[Tuple],
+                   max_workers: int = 4,
+                   timeout: float = 60.0,
+                   chunk_size: int = 500) -> Iterator[CollectorResult]:
+    """Run collector jobs on a bounded thread pool and stream their records in chunks.
+
+    Each job is a callable returning an iterable (usually a generator that
+    follows the API's pagination). Worker threads cut it into chunks of
+    `chunk_size` records and hand them over through a bounded queue, so a
+    fast source blocks instead of piling records up in memory while the
+    caller is busy cleaning the previous chunk.
+
+    Every job gets its own deadline of `timeout` seconds of fetching,
+    measured from the moment it actually starts running (not from
+    submission), so queued jobs are not penalised by a small pool. Time the
+    job spends blocked on the full output queue is not counted: that is the
+    consumer applying backpressure, not a slow source. Jobs are
+    `(name, fn)` tuples, or `(name, fn, timeout)` to override the deadline
+    for that job. A job that misses its deadline is reported as timed out;
+    chunks it already delivered stay delivered, anything later is discarded.
+    """
+    if not jobs:
+        return
+
+    started: Dict[str, float] = {}
+    blocked: Dict[str, float] = {}        # seconds spent waiting on the output queue
+    blocked_since: Dict[str, float] = {}  # set while the job is waiting right now
+    deadline_for: Dict[str, float] = {}
+    expired = set()
+    lock = threading.Lock()
+    stop = threading.Event()
+    out: "queue.Queue" = queue.Queue(maxsize=max(2, max_workers * 2))
+
+    def _put(name, item) -> bool:
+        # Wait for room in the queue, but give up once the job is abandoned
+        try:
+            out.put_nowait(item)
+            return True
+        except queue.Full:
+            pass
+        with lock:
+            blocked_since[name] = time.monotonic()
+        try:
+            while not stop.is_set() and name not in expired:
+                try:
+                    out.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        finally:
+            with lock:
+                blocked[name] = blocked.get(name, 0.0) + time.monotonic() - blocked_since.pop(name)
+
+    def _deadline(name):
+        # When the job's fetch time runs out, or None while it is not running or is blocked (call with lock held)
+        if name not in started or name in blocked_since:
+            return None
+        return started[name] + blocked.get(name, 0.0) + deadline_for[name]
+
+    def _run(name, fn):
+        start = time.monotonic()
+        cpu_start = time.thread_time()
+        with lock:
+            started[name] = start
+        count = 0
+        chunk = []
+        records = None
+        try:
+            records = iter(fn() or [])
+            for r in records:
+                if stop.is_set() or name in expired:
+                    return
+                chunk.append(r)
+                count += 1
+                if len(chunk) >= chunk_size:
+                    if not _put(name, ("chunk", name, chunk, count, 0.0)):
+                        return
+                    chunk = []
+            if chunk and not _put(name, ("chunk", name, chunk, count, 0.0)):
+                return
+            _put(name, ("done", name, None, count, time.thread_time() - cpu_start))
+        except Exception as e:
+            if chunk:
+                _put(name, ("chunk", name, chunk, count, 0.0))
+            _put(name, ("done", name, f"{type(e).__name__}: {e}", count, time.thread_time() - cpu_start))
+        finally:
+            close = getattr(records, "close", None)
+            if close is not None:
+                try:
+                    close()
+                except Exception:
+                    pass
+
+    pool = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="collector")
+    active = set()
+    delivered: Dict[str, int] = {}
+    for job in jobs:
+        name, fn = job[0], job[1]
+        deadline_for[name] = job[2] if len(job) > 2 and job[2] is not None else timeout
+        active.add(name)
+        pool.submit(_run, name, fn)
+
+    try:
+        while active:
+            now = time.monotonic()
+            with lock:
+                deadlines = [d for d in map(_deadline, active) if d is not None]
+            wait_for = max(0.0, min(deadlines) - now) if deadlines else min(deadline_for[n] for n in active)
+            try:
+                kind, name, payload, count, cpu = out.get(timeout=max(wait_for, 0.01))
+            except queue.Empty:
+                kind = None
+
+            if kind is not None and name in active:
+                elapsed = time.monotonic() - started.get(name, now)
+                if kind == "chunk":
+                    delivered[name] = count
+                    yield CollectorResult(name, payload, elapsed, done=False, count=count)
+                else:
+                    active.discard(name)
+                    yield CollectorResult(name, [], elapsed, error=payload, count=count, cpu=cpu)
+
+            now = time.monotonic()
+            for name in list(active):
+                with lock:
+                    start, deadline = started.get(name), _deadline(name)
+                if deadline is not None and now >= deadline:
+                    active.discard(name)
+                    expired.add(name)
+                    yield CollectorResult(name, [], now - start, timed_out=True, count=delivered.get(name, 0))
+    finally:
+        # Don't block on collectors that blew their deadline; their threads
+        # notice the stop flag (or finish their current request) in the
+        # background and whatever they fetched is dropped.
+        stop.set()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def format_timings(results: List[CollectorResult]) -> str:
+    """Render a per-collector timing table from final results, slowest first."""
+    lines = []
+    for r in sorted((r for r in results if r.done), key=lambda r: r.elapsed, reverse=True):
+        if r.timed_out:
+            status = "timeout"
+        elif r.error:
+            status = "failed"
+        else:
+            status = f"{r.count} records"
+        lines.append(f"   {r.name:<16} {r.elapsed:7.2f}s {r.cpu:6.2f}s cpu  {status}")
+    return "\n".join(lines)
@@ -1,9 +1,16 @@
 import sqlite3
 import os
-from typing import Iterable, Dict
+import threading
+import time
+from collections import Counter
+from typing import Iterable, Dict, List, Optional, Tuple
 
+from utils.hashing import content_hash
+from utils.timeutil import to_epoch
 
-DB_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+
+# OSINT_DATA_DIR relocates every database, cache and metrics file (benchmarks use a temp dir)
+DB_DIR = os.getenv("OSINT_DATA_DIR", os.path.join(os.path.dirname(os.path.dirname(__file__)), "data"))
 DB_PATH_DEFAULT = os.path.join(DB_DIR, "osint.db")
 
 
@@ -11,6 +18,7 @@ def init_db(db_path: str = DB_PATH_DEFAULT):
 	os.makedirs(os.path.dirname(db_path), exist_ok=True)
 	conn = sqlite3.connect(db_path)
 	cur = conn.cursor()
+	# Original (version 0) layout; `migrate` brings it up to SCHEMA_VERSION
 	cur.execute(
 		"""
 		CREATE TABLE IF NOT EXISTS osint_data (
@@ -23,34 +31,621 @@ def init_db(db_path: str = DB_PATH_DEFAULT):
 		)
 		"""
 	)
+	cur.execute(
+		"""
+		CREATE TABLE IF NOT EXISTS collector_cursors (
+			source TEXT NOT NULL,
+			query TEXT NOT NULL,
+			cursor INTEGER,
+			fetched_total INTEGER DEFAULT 0,
+			skipped_total INTEGER DEFAULT 0,
+			updated_at TEXT,
+			PRIMARY KEY (source, query)
+		)
+		"""
+	)
 	conn.commit()
 	conn.close()
+	conn = sqlite3.connect(db_path, isolation_level=None)
+	try:
+		migrate(conn)
+	finally:
+		conn.close()
+
+
+def _migrate_1(conn: sqlite3.Connection) -> None:
+	"""Rebuild osint_data with an integer id, epoch `ts` and `content_hash`, and index them.
+
+	`ts` is backfilled from the stored timestamp strings; values that can't be
+	parsed (e.g. LinkedIn's "N/A") stay NULL. Old Stack Overflow rows were
+	stored in the collector's local time and are read as UTC.
+	"""
+	conn.execute(
+		"""
+		CREATE TABLE osint_data_v1 (
+			id INTEGER PRIMARY KEY,
+			platform TEXT,
+			user TEXT,
+			timestamp TEXT,
+			ts INTEGER,
+			text TEXT,
+			url TEXT UNIQUE,
+			sentiment REAL,
+			content_hash TEXT
+		)
+		"""
+	)
+	rows = conn.execute("SELECT platform, user, timestamp, text, url, sentiment FROM osint_data ORDER BY rowid")
+	conn.executemany(
+		"INSERT OR IGNORE INTO osint_data_v1 (platform, user, timestamp, ts, text, url, sentiment, content_hash) "
+		"VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+		(
+			(platform, user, timestamp, to_epoch(timestamp), text, url, sentiment, content_hash(text) if text else None)
+			for platform, user, timestamp, text, url, sentiment in rows
+		),
+	)
+	conn.execute("DROP TABLE osint_data")
+	conn.execute("ALTER TABLE osint_data_v1 RENAME TO osint_data")
+	conn.execute("CREATE INDEX idx_osint_platform_ts ON osint_data (platform, ts)")
+	conn.execute("CREATE INDEX idx_osint_ts ON osint_data (ts)")
+	conn.execute("CREATE INDEX idx_osint_content_hash ON osint_data (content_hash)")
+
+
+def _migrate_2(conn: sqlite3.Connection) -> None:
+	"""Add the osint_fts full-text index over osint_data.text.
+
+	External-content FTS5 table: it stores only the index, reads text back
+	from osint_data by id, and triggers keep it in sync with every insert,
+	update and delete, in the same transaction as the write.
+	"""
+	conn.execute(
+		"""
+		CREATE VIRTUAL TABLE osint_fts USING fts5(
+			text,
+			content='osint_data',
+			content_rowid='id',
+			tokenize='unicode61 remove_diacritics 2'
+		)
+		"""
+	)
+	conn.execute(
+		"""
+		CREATE TRIGGER osint_fts_ai AFTER INSERT ON osint_data BEGIN
+			INSERT INTO osint_fts (rowid, text) VALUES (new.id, new.text);
+		END
+		"""
+	)
+	conn.execute(
+		"""
+		CREATE TRIGGER osint_fts_ad AFTER DELETE ON osint_data BEGIN
+			INSERT INTO osint_fts (osint_fts, rowid, text) VALUES ('delete', old.id, old.text);
+		END
+		"""
+	)
+	conn.execute(
+		"""
+		CREATE TRIGGER osint_fts_au AFTER UPDATE OF text ON osint_data BEGIN
+			INSERT INTO osint_fts (osint_fts, rowid, text) VALUES ('delete', old.id, old.text);
+			INSERT INTO osint_fts (rowid, text) VALUES (new.id, new.text);
+		END
+		"""
+	)
+	conn.execute("INSERT INTO osint_fts (osint_fts) VALUES ('rebuild')")
+
+
+# Same tokenisation plot_top_words always used: lowercase whitespace split, words longer than 3 chars
+TERM_MIN_LEN = 4
+
+
+def _day(ts: Optional[int]) -> str:
+	# '' for undated posts (e.g. LinkedIn) sorts before every date, so day ranges exclude them
+	return time.strftime("%Y-%m-%d", time.gmtime(ts)) if ts is not None else ""
+
+
+def _add_term_counts(conn: sqlite3.Connection, rows: Iterable[Tuple]) -> None:
+	"""Add the terms of (platform, ts, text) rows to term_counts, inside the caller's transaction."""
+	counts: Dict[Tuple[str, str], Counter] = {}
+	for platform, ts, text in rows:
+		if not text:
+			continue
+		key = (platform or "", _day(ts))
+		bucket = counts.get(key)
+		if bucket is None:
+			bucket = counts[key] = Counter()
+		bucket.update(w for w in text.lower().split() if len(w) >= TERM_MIN_LEN)
+	if counts:
+		conn.executemany(
+			"""
+			INSERT INTO term_counts (platform, day, term, count) VALUES (?, ?, ?, ?)
+			ON CONFLICT(platform, day, term) DO UPDATE SET count = count + excluded.count
+			""",
+			((p, d, t, n) for (p, d), bucket in counts.items() for t, n in bucket.items()),
+		)
+
+
+def _add_daily_sentiment(conn: sqlite3.Connection, rows: Iterable[Tuple]) -> None:
+	"""Add (platform, ts, sentiment) rows to daily_sentiment, inside the caller's transaction."""
+	sums: Dict[Tuple[str, str], List[float]] = {}
+	for platform, ts, sentiment in rows:
+		if sentiment is None:
+			continue
+		key = (platform or "", _day(ts))
+		bucket = sums.get(key)
+		if bucket is None:
+			bucket = sums[key] = [0, 0.0]
+		bucket[0] += 1
+		bucket[1] += sentiment
+	if sums:
+		conn.executemany(
+			"""
+			INSERT INTO daily_sentiment (platform, day, n, total) VALUES (?, ?, ?, ?)
+			ON CONFLICT(platform, day) DO UPDATE SET n = n + excluded.n, total = total + excluded.total
+			""",
+			((p, d, n, total) for (p, d), (n, total) in sums.items()),
+		)
+
+
+def _add_aggregates(conn: sqlite3.Connection, rows: List[Tuple]) -> None:
+	"""Maintain every ingest-time aggregate from new (platform, ts, text, sentiment) rows."""
+	_add_term_counts(conn, ((p, ts, text) for p, ts, text, _ in rows))
+	_add_daily_sentiment(conn, ((p, ts, sentiment) for p, ts, _, sentiment in rows))
+
+
+def _rebuild_term_counts(conn: sqlite3.Connection, chunk_size: int = 5000) -> None:
+	conn.execute("DELETE FROM term_counts")
+	cur = conn.execute("SELECT platform, ts, text FROM osint_data")
+	while True:
+		rows = cur.fetchmany(chunk_size)
+		if not rows:
+			break
+		_add_term_counts(conn, rows)
+
+
+def _rebuild_daily_sentiment(conn: sqlite3.Connection) -> None:
+	conn.execute("DELETE FROM daily_sentiment")
+	conn.execute(
+		"""
+		INSERT INTO daily_sentiment (platform, day, n, total)
+		SELECT COALESCE(platform, ''), COALESCE(strftime('%Y-%m-%d', ts, 'unixepoch'), ''), COUNT(*), SUM(sentiment)
+		FROM osint_data WHERE sentiment IS NOT NULL GROUP BY 1, 2
+		"""
+	)
+
+
+def _migrate_3(conn: sqlite3.Connection) -> None:
+	"""Add term_counts(platform, day, term, count), maintained at ingest, and fill it from existing rows."""
+	conn.execute(
+		"""
+		CREATE TABLE term_counts (
+			platform TEXT NOT NULL,
+			day TEXT NOT NULL,
+			term TEXT NOT NULL,
+			count INTEGER NOT NULL,
+			PRIMARY KEY (platform, day, term)
+		) WITHOUT ROWID
+		"""
+	)
+	conn.execute("CREATE INDEX idx_term_counts_day ON term_counts (day)")
+	_rebuild_term_counts(conn)
+
+
+def _migrate_4(conn: sqlite3.Connection) -> None:
+	"""Add daily_sentiment(platform, day, n, total), maintained at ingest, and fill it from existing rows.
+
+	Charts read per-day sums from it instead of averaging osint_data.
+	"""
+	conn.execute(
+		"""
+		CREATE TABLE daily_sentiment (
+			platform TEXT NOT NULL,
+			day TEXT NOT NULL,
+			n INTEGER NOT NULL,
+			total REAL NOT NULL,
+			PRIMARY KEY (platform, day)
+		) WITHOUT ROWID
+		"""
+	)
+	conn.execute("CREATE INDEX idx_daily_sentiment_day ON daily_sentiment (day)")
+	_rebuild_daily_sentiment(conn)
+
+
+# (version, step) pairs applied in order; the schema version lives in PRAGMA user_version
+MIGRATIONS = (
+	(1, _migrate_1),
+	(2, _migrate_2),
+	(3, _migrate_3),
+	(4, _migrate_4),
+)
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def migrate(conn: sqlite3.Connection) -> int:
+	"""Apply pending migrations, each in its own transaction. Returns the resulting version.
+
+	`conn` must be in autocommit mode (isolation_level=None). BEGIN IMMEDIATE
+	plus a re-read of user_version makes concurrent pipelines safe: only one
+	of them applies a given step.
+	"""
+	version = conn.execute("PRAGMA user_version").fetchone()[0]
+	for target, step in MIGRATIONS:
+		if target <= version:
+			continue
+		conn.execute("BEGIN IMMEDIATE")
+		try:
+			version = conn.execute("PRAGMA user_version").fetchone()[0]
+			if target > version:
+				step(conn)
+				conn.execute(f"PRAGMA user_version = {target}")
+				version = target
+			conn.execute("COMMIT")
+		except Exception:
+			conn.execute("ROLLBACK")
+			raise
+	return version
+
+
+INSERT_SQL = (
+	"INSERT OR IGNORE INTO osint_data (platform, user, timestamp, ts, text, url, sentiment, content_hash) "
+	"VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+# WAL lets readers (visualizer, ad-hoc queries) run while the pipeline writes;
+# synchronous=NORMAL is durable across application crashes in WAL mode and
+# avoids an fsync per transaction.
+PRAGMAS = (
+	"PRAGMA journal_mode=WAL",
+	"PRAGMA synchronous=NORMAL",
+	"PRAGMA cache_size=-65536",  # 64 MiB page cache
+	"PRAGMA temp_store=MEMORY",
+)
+
+# Seconds a writer waits for another process's write lock before raising
+# "database is locked"; backfill workers and scheduled runs write concurrently.
+BUSY_TIMEOUT = 60.0
+
+# Errors caused by a single record's values; anything else (locks, I/O) is
+# not the record's fault and must not be skipped over.
+_RECORD_ERRORS = (sqlite3.IntegrityError, sqlite3.InterfaceError, sqlite3.ProgrammingError,
+	sqlite3.DataError, OverflowError, TypeError, ValueError)
+
+_initialized = set()
+_writers = {}
+_writers_lock = threading.Lock()
+
+
+def connect(db_path: str = DB_PATH_DEFAULT) -> sqlite3.Connection:
+	"""Open a connection with the pipeline's pragmas applied.
+
+	The connection is in autocommit mode (isolation_level=None); callers
+	manage transactions explicitly with BEGIN/COMMIT.
+	"""
+	conn = sqlite3.connect(db_path, isolation_level=None, check_same_thread=False, timeout=BUSY_TIMEOUT)
+	for pragma in PRAGMAS:
+		conn.execute(pragma)
+	return conn
+
+
+def _ensure_db(db_path: str) -> None:
+	if db_path not in _initialized:
+		init_db(db_path)
+		_initialized.add(db_path)
+
+
+def _row(r: Dict) -> Tuple:
+	ts = to_epoch(r.get("ts"))
+	if ts is None:
+		ts = to_epoch(r.get("timestamp"))
+	text = r.get("text")
+	return (
+		r.get("platform"),
+		r.get("user"),
+		r.get("timestamp"),
+		ts,
+		text,
+		r.get("url"),
+		r.get("sentiment"),
+		content_hash(text) if text else None,
+	)
+
+
+class DatabaseWriter:
+	"""Batched, transactional writer that keeps one connection open.
+
+	Records are inserted with executemany in batches of `batch_size`, each
+	batch in its own explicit transaction. The inserted count comes from the
+	cursor's `rowcount`, so rows ignored by the UNIQUE(url) constraint and
+	rows written by triggers (the FTS index) are not counted.
+
+	The same transaction adds the new rows to term_counts and
+	daily_sentiment. New rows are exactly those with an id above the
+	pre-batch maximum (ids are assigned as max(id) + 1), so duplicates
+	ignored by INSERT OR IGNORE are never counted twice. The maximum is
+	read after BEGIN IMMEDIATE, which takes the write lock up front: no
+	other process can insert between that read and COMMIT, so its rows are
+	never mistaken for ours. If a batch fails on a record SQLite can't
+	bind it is rolled back and retried row by row, skipping only the
+	problematic records; lock and I/O errors (OperationalError) propagate.
+	"""
+
+	def __init__(self, db_path: str = DB_PATH_DEFAULT, batch_size: int = 1000):
+		_ensure_db(db_path)
+		self.db_path = db_path
+		self.batch_size = batch_size
+		self.conn = connect(db_path)
+		self._lock = threading.Lock()
+
+	def write(self, records: Iterable[Dict]) -> int:
+		"""Insert records, returning the number of new rows."""
+		inserted = 0
+		batch = []
+		for r in records:
+			batch.append(r)
+			if len(batch) >= self.batch_size:
+				inserted += self._write_batch(batch)
+				batch = []
+		if batch:
+			inserted += self._write_batch(batch)
+		return inserted
+
+	def _write_batch(self, batch: List[Dict]) -> int:
+		with self._lock:
+			conn = self.conn
+			last_id = self._begin()
+			try:
+				try:
+					inserted = conn.executemany(INSERT_SQL, [_row(r) for r in batch]).rowcount
+				except _RECORD_ERRORS:
+					conn.execute("ROLLBACK")
+					inserted = 0
+					last_id = self._begin()
+					for r in batch:
+						try:
+							inserted += conn.execute(INSERT_SQL, _row(r)).rowcount
+						except _RECORD_ERRORS:
+							# skip problematic record
+							continue
+				if inserted:
+					_add_aggregates(conn, conn.execute(
+						"SELECT platform, ts, text, sentiment FROM osint_data WHERE id > ?", (last_id,)
+					).fetchall())
+				conn.execute("COMMIT")
+			except Exception:
+				if conn.in_transaction:
+					conn.execute("ROLLBACK")
+				raise
+			return inserted
+
+	def _begin(self) -> int:
+		"""Open a write transaction and return the current maximum id."""
+		self.conn.execute("BEGIN IMMEDIATE")
+		return self.conn.execute("SELECT COALESCE(MAX(id), 0) FROM osint_data").fetchone()[0]
+
+	def close(self) -> None:
+		with self._lock:
+			self.conn.close()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc):
+		self.close()
+
+
+def get_writer(db_path: str = DB_PATH_DEFAULT) -> DatabaseWriter:
+	"""Return the process-wide writer for db_path, creating it on first use."""
+	with _writers_lock:
+		writer = _writers.get(db_path)
+		if writer is None:
+			writer = _writers[db_path] = DatabaseWriter(db_path)
+		return writer
 
 
 def save_to_db(records: Iterable[Dict], db_path: str = DB_PATH_DEFAULT) -> int:
 	"""Save records into the DB. Returns number of inserted rows."""
-	init_db(db_path)
+	return get_writer(db_path).write(records)
+
+
+def get_records(platform: Optional[str] = None, since: Optional[int] = None, until: Optional[int] = None,
+				limit: Optional[int] = None, db_path: str = DB_PATH_DEFAULT) -> List[Dict]:
+	"""Return stored records for a platform and/or epoch window [since, until), newest first.
+
+	Served by the (platform, ts) and (ts) indexes rather than a table scan.
+	"""
+	_ensure_db(db_path)
+	clauses, params = [], []
+	if platform is not None:
+		clauses.append("platform = ?")
+		params.append(platform)
+	if since is not None:
+		clauses.append("ts >= ?")
+		params.append(int(since))
+	if until is not None:
+		clauses.append("ts < ?")
+		params.append(int(until))
+	sql = "SELECT id, platform, user, timestamp, ts, text, url, sentiment, content_hash FROM osint_data"
+	if clauses:
+		sql += " WHERE " + " AND ".join(clauses)
+	sql += " ORDER BY ts DESC"
+	if limit is not None:
+		sql += " LIMIT ?"
+		params.append(int(limit))
 	conn = sqlite3.connect(db_path)
-	cur = conn.cursor()
-	inserted = 0
-	for r in records:
+	conn.row_factory = sqlite3.Row
+	try:
+		return [dict(row) for row in conn.execute(sql, params)]
+	finally:
+		conn.close()
+
+
+def get_top_terms(top_n: int = 20, platform: Optional[str] = None, since: Optional[str] = None,
+				  until: Optional[str] = None, db_path: str = DB_PATH_DEFAULT) -> List[Tuple[str, int]]:
+	"""Most frequent terms as (term, count), from the precomputed term_counts table.
+
+	`since`/`until` are 'YYYY-MM-DD' days, bounding the range as [since, until).
+	"""
+	_ensure_db(db_path)
+	clauses, params = [], []
+	if platform is not None:
+		clauses.append("platform = ?")
+		params.append(platform)
+	if since is not None:
+		clauses.append("day >= ?")
+		params.append(since)
+	if until is not None:
+		clauses.append("day < ?")
+		params.append(until)
+	sql = "SELECT term, SUM(count) FROM term_counts"
+	if clauses:
+		sql += " WHERE " + " AND ".join(clauses)
+	sql += " GROUP BY term ORDER BY 2 DESC, term LIMIT ?"
+	params.append(int(top_n))
+	conn = sqlite3.connect(db_path)
+	try:
+		return conn.execute(sql, params).fetchall()
+	finally:
+		conn.close()
+
+
+def check_daily_sentiment(db_path: str = DB_PATH_DEFAULT) -> Tuple[int, int]:
+	"""(SUM(n) in daily_sentiment, scored rows in osint_data); equal unless the aggregate has drifted.
+
+	A row counted twice (or missed) by an ingest-time update shows up as a
+	difference here; rebuild_daily_sentiment() recomputes the table.
+	"""
+	_ensure_db(db_path)
+	conn = sqlite3.connect(db_path)
+	try:
+		aggregated = conn.execute("SELECT COALESCE(SUM(n), 0) FROM daily_sentiment").fetchone()[0]
+		scored = conn.execute("SELECT COUNT(*) FROM osint_data WHERE sentiment IS NOT NULL").fetchone()[0]
+		return aggregated, scored
+	finally:
+		conn.close()
+
+
+def get_daily_sentiment(platform: Optional[str] = None, since: Optional[str] = None, until: Optional[str] = None,
+						db_path: str = DB_PATH_DEFAULT) -> List[Tuple[str, str, int, float]]:
+	"""(platform, day, scored posts, sentiment sum) rows from daily_sentiment, by platform and day.
+
+	`since`/`until` are 'YYYY-MM-DD' days, bounding the range as [since, until).
+	"""
+	_ensure_db(db_path)
+	clauses, params = [], []
+	if platform is not None:
+		clauses.append("platform = ?")
+		params.append(platform)
+	if since is not None:
+		clauses.append("day >= ?")
+		params.append(since)
+	if until is not None:
+		clauses.append("day < ?")
+		params.append(until)
+	sql = "SELECT platform, day, n, total FROM daily_sentiment"
+	if clauses:
+		sql += " WHERE " + " AND ".join(clauses)
+	sql += " ORDER BY platform, day"
+	conn = sqlite3.connect(db_path)
+	try:
+		return conn.execute(sql, params).fetchall()
+	finally:
+		conn.close()
+
+
+def get_max_id(db_path: str = DB_PATH_DEFAULT) -> int:
+	"""Highest osint_data id; rows are insert-only, so it changes exactly when data is added."""
+	_ensure_db(db_path)
+	conn = sqlite3.connect(db_path)
+	try:
+		return conn.execute("SELECT COALESCE(MAX(id), 0) FROM osint_data").fetchone()[0]
+	finally:
+		conn.close()
+
+
+def rebuild_term_counts(db_path: str = DB_PATH_DEFAULT, chunk_size: int = 5000) -> None:
+	"""Recompute term_counts from osint_data, streaming rows with fetchmany.
+
+	Only needed after rows are deleted or edited outside the writer; ingest
+	keeps the table current on its own.
+	"""
+	_ensure_db(db_path)
+	conn = connect(db_path)
+	try:
+		conn.execute("BEGIN IMMEDIATE")
 		try:
-			cur.execute(
-				"INSERT OR IGNORE INTO osint_data (platform, user, timestamp, text, url, sentiment) VALUES (?, ?, ?, ?, ?, ?)",
-				(
-					r.get("platform"),
-					r.get("user"),
-					r.get("timestamp"),
-					r.get("text"),
-					r.get("url"),
-					r.get("sentiment"),
-				),
-			)
-			if cur.rowcount == 1:
-				inserted += 1
+			_rebuild_term_counts(conn, chunk_size)
+			conn.execute("COMMIT")
 		except Exception:
-			# skip problematic record
-			continue
-	conn.commit()
-	conn.close()
-	return inserted
+			conn.execute("ROLLBACK")
+			raise
+	finally:
+		conn.close()
+
+
+def rebuild_daily_sentiment(db_path: str = DB_PATH_DEFAULT) -> None:
+	"""Recompute daily_sentiment from osint_data in one GROUP BY.
+
+	Needed after rows are deleted or edited outside the writer, or when
+	check_daily_sentiment() reports a mismatch.
+	"""
+	_ensure_db(db_path)
+	conn = connect(db_path)
+	try:
+		conn.execute("BEGIN IMMEDIATE")
+		try:
+			_rebuild_daily_sentiment(conn)
+			conn.execute("COMMIT")
+		except Exception:
+			conn.execute("ROLLBACK")
+			raise
+	finally:
+		conn.close()
+
+
+def get_cursor(source: str, query: str, db_path: str = DB_PATH_DEFAULT) -> Optional[int]:
+	"""Return the stored incremental cursor for (source, query), or None on first run."""
+	_ensure_db(db_path)
+	conn = sqlite3.connect(db_path)
+	try:
+		row = conn.execute(
+			"SELECT cursor FROM collector_cursors WHERE source = ? AND query = ?", (source, query)
+		).fetchone()
+	finally:
+		conn.close()
+	return row[0] if row and row[0] is not None else None
+
+
+def update_cursor(source: str, query: str, cursor: Optional[int], fetched: int = 0, skipped: int = 0,
+				  db_path: str = DB_PATH_DEFAULT) -> None:
+	"""Advance the cursor for (source, query) and accumulate fetched/skipped counters.
+
+	The cursor never moves backwards, so committing an older run's cursor late is harmless.
+	"""
+	_ensure_db(db_path)
+	conn = sqlite3.connect(db_path)
+	try:
+		conn.execute(
+			"""
+			INSERT INTO collector_cursors (source, query, cursor, fetched_total, skipped_total, updated_at)
+			VALUES (?, ?, ?, ?, ?, datetime('now'))
+			ON CONFLICT(source, query) DO UPDATE SET
+				cursor = MAX(COALESCE(collector_cursors.cursor, excluded.cursor), COALESCE(excluded.cursor, collector_cursors.cursor)),
+				fetched_total = collector_cursors.fetched_total + excluded.fetched_total,
+				skipped_total = collector_cursors.skipped_total + excluded.skipped_total,
+				updated_at = excluded.updated_at
+			""",
+			(source, query, cursor, fetched, skipped),
+		)
+		conn.commit()
+	finally:
+		conn.close()
+
+
+def get_cursor_stats(db_path: str = DB_PATH_DEFAULT) -> List[Tuple]:
+	"""Return (source, query, cursor, fetched_total, skipped_total, updated_at) rows."""
+	_ensure_db(db_path)
+	conn = sqlite3.connect(db_path)
+	try:
+		return conn.execute(
+			"SELECT source, query, cursor, fetched_total, skipped_total, updated_at FROM collector_cursors ORDER BY source, query"
+		).fetchall()
+	finally:
+		conn.close()
@@ -0,0 +1,240 @@
+# utils/dedupe.py
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
+
+from utils.database import DB_DIR
+
+# numpy is imported by the functions that hash, so importing the pipeline
+# doesn't load it (see benchmarks/bench_startup.py)
+if TYPE_CHECKING:
+    import numpy as np
+
+DEDUPE_DB_DEFAULT = os.path.join(DB_DIR, "dedupe.db")
+
+# 64 permutations in 16 bands of 4 rows: pairs above ~0.5 Jaccard become
+# candidates with high probability, pairs below ~0.2 almost never do.
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+
+_PRIME = (1 << 31) - 1
+
+# Retweet/cross-post boilerplate that shouldn't make two posts look different
+_STOPWORDS = frozenset(("rt", "via", "cc", "amp"))
+_TOKEN_RE = re.compile(r"\w+")
+
+
+@lru_cache(maxsize=1)
+def _permutations() -> Tuple["np.ndarray", "np.ndarray"]:
+    import numpy as np
+    rng = np.random.RandomState(20240501)  # fixed: signatures are persisted
+    a = rng.randint(1, _PRIME, size=NUM_PERM).astype(np.uint64)
+    b = rng.randint(0, _PRIME, size=NUM_PERM).astype(np.uint64)
+    return a, b
+
+
+@lru_cache(maxsize=200_000)
+def _feature_hash(feature: str) -> int:
+    # Stable across processes (unlike hash()), which a persistent index needs
+    return int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=4).digest(), "big")
+
+
+def shingles(text: str) -> List[str]:
+    """Word unigrams and bigrams of a text, without retweet/cross-post boilerplate."""
+    tokens = [t for t in _TOKEN_RE.findall(text.lower()) if t not in _STOPWORDS]
+    return tokens + [a + " " + b for a, b in zip(tokens, tokens[1:])]
+
+
+def minhash(text: str) -> "np.ndarray":
+    """MinHash signature (NUM_PERM uint32 values) over the text's shingles."""
+    import numpy as np
+    features = set(shingles(text))
+    if not features:
+        return np.full(NUM_PERM, _PRIME, dtype=np.uint32)
+    x = np.fromiter((_feature_hash(f) for f in features), dtype=np.uint64, count=len(features))
+    perm_a, perm_b = _permutations()
+    # (a * x + b) mod p for every permutation at once; a, x < 2**32 keeps it in uint64
+    hashed = (x[:, None] * perm_a + perm_b) % _PRIME
+    return hashed.min(axis=0).astype(np.uint32)
+
+
+def _band_keys(sig: "np.ndarray") -> List[int]:
+    # One key per band with the band number mixed in, so a single
+    # `key IN (...)` probe on the primary key covers all bands.
+    # SQLite integers are signed 64-bit.
+    rows = sig.reshape(BANDS, ROWS)
+    return [int.from_bytes(hashlib.blake2b(bytes([b]) + rows[b].tobytes(), digest_size=8).digest(), "big", signed=True)
+            for b in range(BANDS)]
+
+
+class NearDuplicateIndex:
+    """Persistent MinHash LSH index for cross-run, cross-platform near-duplicate detection.
+
+    Each text's signature is cut into bands and every band is hashed to a key
+    stored in an indexed table, so a lookup is one indexed probe for the
+    text's band keys - sublinear in the index size - followed by an exact
+    signature comparison against the few candidates. A text whose estimated
+    Jaccard similarity to an indexed text is at least `threshold` (default
+    0.7; retweets, cross-posts and trailing hashtags typically land at
+    0.8-0.95) is a near-duplicate and joins that text's cluster.
+
+    Changes made by `filter()` stay in an open transaction until `commit()`,
+    so the caller can commit only after the surviving records are saved; a
+    crash in between re-processes them instead of marking them seen.
+
+    The transaction takes the write lock when it starts (BEGIN IMMEDIATE),
+    so indexes on the same file in concurrent pipeline runs (the scheduler
+    runs sources in parallel, a backfill merge may overlap) wait for each
+    other's commits, up to `busy_timeout` seconds, instead of failing on a
+    stale snapshot.
+    """
+
+    def __init__(self, db_path: str = DEDUPE_DB_DEFAULT, threshold: Optional[float] = None,
+                 busy_timeout: float = 300.0):
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self.db_path = db_path
+        self.threshold = threshold if threshold is not None else float(os.getenv("DEDUPE_THRESHOLD", "0.7"))
+        self.conn = sqlite3.connect(db_path, timeout=busy_timeout, isolation_level=None, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._lock = threading.Lock()
+        self._in_tx = False
+        self._init_schema()
+        self.reset_stats()
+
+    def _init_schema(self) -> None:
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS signatures (
+                id INTEGER PRIMARY KEY,
+                cluster INTEGER NOT NULL,
+                platform TEXT,
+                url TEXT,
+                sig BLOB NOT NULL
+            )
+            """
+        )
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS lsh_bands (
+                key INTEGER NOT NULL,
+                doc INTEGER NOT NULL,
+                PRIMARY KEY (key, doc)
+            ) WITHOUT ROWID
+            """
+        )
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS clusters (
+                id INTEGER PRIMARY KEY,
+                size INTEGER NOT NULL DEFAULT 1,
+                platforms TEXT
+            )
+            """
+        )
+
+    def reset_stats(self) -> None:
+        self.seen = 0
+        self.duplicates = 0
+
+    @property
+    def dedupe_ratio(self) -> float:
+        return self.duplicates / self.seen if self.seen else 0.0
+
+    def _begin(self) -> None:
+        if not self._in_tx:
+            self.conn.execute("BEGIN IMMEDIATE")
+            self._in_tx = True
+
+    def _match(self, sig: "np.ndarray", keys: List[int]) -> Optional[int]:
+        import numpy as np
+        placeholders = ", ".join("?" * len(keys))
+        rows = self.conn.execute(
+            f"""
+            SELECT s.cluster, s.sig FROM signatures s
+            WHERE s.id IN (SELECT doc FROM lsh_bands WHERE key IN ({placeholders}))
+            """,
+            keys,
+        ).fetchall()
+        best, best_sim = None, self.threshold
+        for cluster, blob in rows:
+            sim = float(np.count_nonzero(np.frombuffer(blob, dtype=np.uint32) == sig)) / NUM_PERM
+            if sim >= best_sim:
+                best, best_sim = cluster, sim
+        return best
+
+    def check(self, text: str, platform: Optional[str] = None, url: Optional[str] = None) -> Tuple[bool, int]:
+        """Look up `text`, add it to the index, and return (is_duplicate, cluster_id)."""
+        sig = minhash(text)
+        keys = _band_keys(sig)
+        with self._lock:
+            self._begin()
+            self.seen += 1
+            cluster = self._match(sig, keys)
+            if cluster is not None:
+                self.duplicates += 1
+                self.conn.execute(
+                    """
+                    UPDATE clusters SET size = size + 1,
+                        platforms = CASE WHEN instr(',' || platforms || ',', ',' || ? || ',') THEN platforms
+                                         ELSE platforms || ',' || ? END
+                    WHERE id = ?
+                    """,
+                    (platform or "", platform or "", cluster),
+                )
+                return True, cluster
+            # Only cluster representatives are indexed; members add nothing new to match against
+            cur = self.conn.execute(
+                "INSERT INTO signatures (cluster, platform, url, sig) VALUES (0, ?, ?, ?)",
+                (platform, url, sig.tobytes()),
+            )
+            cluster = cur.lastrowid
+            self.conn.execute("UPDATE signatures SET cluster = ? WHERE id = ?", (cluster, cluster))
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO lsh_bands (key, doc) VALUES (?, ?)",
+                [(key, cluster) for key in keys],
+            )
+            self.conn.execute("INSERT INTO clusters (id, size, platforms) VALUES (?, 1, ?)", (cluster, platform or ""))
+            return False, cluster
+
+    def filter(self, records: Sequence[Dict]) -> List[Dict]:
+        """Return the records that are not near-duplicates of anything indexed (including earlier ones in this batch)."""
+        out = []
+        for r in records:
+            is_dup, _ = self.check(r.get("text") or "", r.get("platform"), r.get("url"))
+            if not is_dup:
+                out.append(r)
+        return out
+
+    def commit(self) -> None:
+        with self._lock:
+            if self._in_tx:
+                self.conn.execute("COMMIT")
+                self._in_tx = False
+
+    def rollback(self) -> None:
+        with self._lock:
+            if self._in_tx:
+                self.conn.execute("ROLLBACK")
+                self._in_tx = False
+
+    def cluster_sizes(self, top: int = 10) -> List[Tuple[int, int, str]]:
+        """Largest clusters as (cluster_id, size, platforms)."""
+        with self._lock:
+            return self.conn.execute(
+                "SELECT id, size, platforms FROM clusters WHERE size > 1 ORDER BY size DESC LIMIT ?", (top,)
+            ).fetchall()
+
+    def size_histogram(self) -> Dict[int, int]:
+        """{cluster size: number of clusters}."""
+        with self._lock:
+            return dict(self.conn.execute("SELECT size, COUNT(*) FROM clusters GROUP BY size ORDER BY size").fetchall())
+
+    def close(self) -> None:
+        self.commit()
+        self.conn.close()
@@ -0,0 +1,26 @@
+# utils/env.py - one-time .env loading
+import os
+import threading
+from typing import Optional
+
+_loaded = False
+_lock = threading.Lock()
+
+
+def load_env() -> None:
+    """Load `.env` into os.environ once per process (existing variables win)."""
+    global _loaded
+    if _loaded:
+        return
+    with _lock:
+        if not _loaded:
+            from dotenv import load_dotenv
+            load_dotenv()
+            _loaded = True
+
+
+def getenv(name: str, default: Optional[str] = None) -> Optional[str]:
+    """os.getenv after `load_env()`, with accidental surrounding whitespace trimmed."""
+    load_env()
+    value = os.getenv(name, default)
+    return value.strip() if isinstance(value, str) else value
@@ -0,0 +1,7 @@
+# utils/hashing.py
+import hashlib
+
+
+def content_hash(text: str) -> str:
+    """Stable 128-bit hex digest of a text, used as a key for caches and dedupe."""
+    return hashlib.blake2b((text or "").encode("utf-8"), digest_size=16).hexdigest()
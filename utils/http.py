@@ -0,0 +1,282 @@
+# utils/http.py - shared HTTP layer for the REST-based collectors
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from utils.http_cache import CacheMiss, ResponseCache, cache_key, cache_mode
+
+# Requests per second (and burst) allowed per host, within each API's published limits
+HOST_RATES = {
+    "hn.algolia.com": (2.5, 5),           # 10,000 requests/hour per IP
+    "api.stackexchange.com": (20.0, 20),  # 30 requests/second per IP
+    "api.github.com": (0.5, 5),           # search: 30/minute authenticated
+}
+DEFAULT_RATE = (5.0, 5)
+# Fraction of each host's rate this process may use; run_backfill.py gives
+# each of its N worker processes 1/N so together they stay within the limits.
+RATE_SHARE = 1.0
+
+RETRY_STATUSES = frozenset((429, 500, 502, 503, 504))
+MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "4"))
+MAX_WAIT = float(os.getenv("HTTP_MAX_WAIT", "30"))  # longest server-requested wait we block for
+
+
+class RateLimited(Exception):
+    """The host asked us to wait longer than we are willing to block."""
+
+    def __init__(self, host: str, wait: float):
+        super().__init__(f"{host} rate limit: retry in {wait:.0f}s")
+        self.host = host
+        self.wait = wait
+
+
+def backoff_delay(attempt: int, base: float = 1.0, cap: float = 30.0) -> float:
+    """Full-jitter exponential backoff: uniform in [0, min(cap, base * 2**attempt)]."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def _retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (seconds or HTTP date) into seconds from now."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _reset_wait(value: Optional[str]) -> Optional[float]:
+    # X-RateLimit-Reset is an epoch on GitHub/Twitter and a delta in the IETF draft
+    try:
+        reset = float(value)
+    except (TypeError, ValueError):
+        return None
+    if reset > 1e9:
+        reset -= time.time()
+    return max(0.0, reset)
+
+
+def rate_limit_wait(headers) -> Optional[float]:
+    """Seconds the server asks us to wait, from `Retry-After` or an exhausted `X-RateLimit-*` window."""
+    wait = _retry_after(headers.get("Retry-After"))
+    remaining = headers.get("X-RateLimit-Remaining") or headers.get("RateLimit-Remaining")
+    if wait is None and remaining is not None and str(remaining).strip() == "0":
+        wait = _reset_wait(headers.get("X-RateLimit-Reset") or headers.get("RateLimit-Reset"))
+    return wait
+
+
+class TokenBucket:
+    """Thread-safe token bucket with an optional hard pause (server-requested backoff)."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def pause(self, seconds: float) -> None:
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def acquire(self, max_wait: float) -> Optional[float]:
+        """Take a token, sleeping until one is available.
+
+        Returns None, or - without taking a token - the required wait when it
+        exceeds `max_wait`.
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if now >= self.paused_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return None
+                wait = max(self.paused_until - now, (1 - self.tokens) / self.rate)
+            if wait > max_wait:
+                return wait
+            time.sleep(wait)
+
+
+class HttpClient:
+    """Pooled, rate-limited HTTP client shared by the REST collectors.
+
+    - One `requests.Session` with a keep-alive connection pool per host.
+    - A token bucket per host (`HOST_RATES`), paused when the server says
+      so: `Retry-After`, `X-RateLimit-Remaining: 0` with `X-RateLimit-Reset`,
+      or a Stack Exchange `backoff` field in the JSON body.
+    - Connection errors, timeouts and 429/5xx responses are retried with
+      full-jitter exponential backoff, up to `max_retries` times.
+
+    Waits longer than `max_wait` seconds raise `RateLimited` instead of
+    blocking a collector past its deadline.
+
+    With a `ResponseCache`, fresh entries are served without a request (or a
+    rate-limit token), stale ones are revalidated with If-None-Match /
+    If-Modified-Since, and in `replay` mode the network is never used.
+    """
+
+    def __init__(self, max_retries: Optional[int] = None, max_wait: Optional[float] = None,
+                 timeout: float = 10.0, pool_size: int = 10,
+                 cache: Optional[ResponseCache] = None, mode: str = "on"):
+        self.max_retries = max_retries if max_retries is not None else MAX_RETRIES
+        self.max_wait = max_wait if max_wait is not None else MAX_WAIT
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+        self.cache = cache
+        self.mode = mode
+        # Last quota seen per host: {"remaining", "limit", "reset"} (missing keys unknown)
+        self.quota: Dict[str, Dict[str, float]] = {}
+
+    def bucket(self, host: str) -> TokenBucket:
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                rate, burst = HOST_RATES.get(host, DEFAULT_RATE)
+                bucket = self._buckets[host] = TokenBucket(rate * RATE_SHARE, max(1.0, burst * RATE_SHARE))
+            return bucket
+
+    def backoff(self, url: str, seconds: float) -> None:
+        """Hold all requests to `url`'s host for `seconds`."""
+        self.bucket(urlsplit(url).hostname or "").pause(seconds)
+
+    def _record_quota(self, host: str, **values) -> None:
+        parsed = {}
+        for key, value in values.items():
+            try:
+                parsed[key] = float(value)
+            except (TypeError, ValueError):
+                continue
+        if parsed:
+            with self._lock:
+                self.quota.setdefault(host, {}).update(parsed)
+
+    def _observe(self, host: str, resp: requests.Response) -> Optional[float]:
+        """Apply rate-limit headers to the host's bucket; return a server-requested wait, if any."""
+        headers = resp.headers
+        self._record_quota(
+            host,
+            remaining=headers.get("X-RateLimit-Remaining") or headers.get("RateLimit-Remaining"),
+            limit=headers.get("X-RateLimit-Limit") or headers.get("RateLimit-Limit"),
+            reset=headers.get("X-RateLimit-Reset") or headers.get("RateLimit-Reset"),
+        )
+        wait = rate_limit_wait(resp.headers)
+        if wait:
+            self.bucket(host).pause(wait)
+        return wait
+
+    def get(self, url: str, params=None, headers=None, timeout: Optional[float] = None) -> requests.Response:
+        cache = self.cache
+        if cache is None:
+            return self._fetch(url, params, headers, timeout)
+        key = cache_key(url, params, headers)
+        entry = cache.get(key)
+        if self.mode == "replay":
+            if entry is None:
+                raise CacheMiss(f"no cached response for {url} {params or ''}")
+            cache.hits += 1
+            return entry["response"]
+        if entry is not None and self.mode == "on":
+            if cache.is_fresh(entry):
+                cache.hits += 1
+                return entry["response"]
+            conditional = dict(headers or {})
+            if entry["etag"]:
+                conditional["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                conditional["If-Modified-Since"] = entry["last_modified"]
+            resp = self._fetch(url, params, conditional, timeout)
+            if resp.status_code == 304:
+                cache.touch(key)
+                cache.revalidated += 1
+                return entry["response"]
+        else:
+            resp = self._fetch(url, params, headers, timeout)
+        cache.misses += 1
+        if resp.status_code == 200:
+            cache.put(key, resp)
+        return resp
+
+    def _fetch(self, url: str, params, headers, timeout: Optional[float]) -> requests.Response:
+        host = urlsplit(url).hostname or ""
+        bucket = self.bucket(host)
+        attempt = 0
+        while True:
+            too_long = bucket.acquire(self.max_wait)
+            if too_long is not None:
+                raise RateLimited(host, too_long)
+            try:
+                resp = self.session.get(url, params=params, headers=headers, timeout=timeout or self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= self.max_retries:
+                    raise
+                time.sleep(backoff_delay(attempt))
+                attempt += 1
+                continue
+
+            wait = self._observe(host, resp)
+            if resp.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                delay = wait if wait is not None else backoff_delay(attempt)
+                if delay > self.max_wait:
+                    raise RateLimited(host, delay)
+                # The bucket already holds a server-requested pause; only sleep for our own backoff
+                if wait is None:
+                    time.sleep(delay)
+                attempt += 1
+                continue
+            resp.raise_for_status()
+            return resp
+
+    def get_json(self, url: str, params=None, headers=None, timeout: Optional[float] = None):
+        """GET and decode JSON, honouring a Stack Exchange-style `backoff` field in the body."""
+        data = self.get(url, params=params, headers=headers, timeout=timeout).json()
+        if isinstance(data, dict):
+            if data.get("backoff"):
+                self.backoff(url, float(data["backoff"]))
+            # Stack Exchange reports its daily quota in the body
+            self._record_quota(urlsplit(url).hostname or "",
+                               remaining=data.get("quota_remaining"), limit=data.get("quota_max"))
+        return data
+
+    def close(self) -> None:
+        self.session.close()
+        if self.cache is not None:
+            self.cache.close()
+
+
+_client: Optional[HttpClient] = None
+_client_lock = threading.Lock()
+
+
+def set_rate_share(share: float) -> None:
+    """Scale the per-host rates of buckets created after this call (e.g. 1/N in each of N processes)."""
+    global RATE_SHARE
+    RATE_SHARE = max(0.0, min(1.0, share)) or 1.0
+
+
+def get_client() -> HttpClient:
+    """Return the process-wide HTTP client, creating it on first use."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            mode = cache_mode()
+            _client = HttpClient(cache=ResponseCache() if mode != "off" else None, mode=mode)
+        return _client
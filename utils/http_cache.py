@@ -0,0 +1,161 @@
+# utils/http_cache.py - on-disk HTTP response cache for utils.http
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+from utils.database import BUSY_TIMEOUT, DB_DIR
+
+CACHE_PATH_DEFAULT = os.path.join(DB_DIR, "http_cache.db")
+MODES = ("off", "on", "record", "replay")
+
+# Response headers worth keeping: decoding and revalidation
+_KEEP_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Date")
+
+
+class CacheMiss(Exception):
+    """Replay mode found no cached response for a request."""
+
+
+def cache_key(url: str, params=None, headers=None) -> str:
+    """Stable key for a GET: URL, sorted params and the credential it was made with (hashed)."""
+    items = sorted((str(k), str(v)) for k, v in (params or {}).items())
+    auth = (headers or {}).get("Authorization", "")
+    raw = json.dumps([url, items, auth], separators=(",", ":"))
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class ResponseCache:
+    """SQLite-backed GET response cache with TTL, size-bounded LRU eviction and revalidation data.
+
+    Entries older than `ttl` seconds are stale: the client revalidates them
+    with If-None-Match / If-Modified-Since when the server sent an ETag or
+    Last-Modified, and a 304 refreshes the entry without a body transfer.
+    When the stored bodies exceed `max_bytes`, least recently used entries
+    are evicted down to 90% of the bound.
+    """
+
+    def __init__(self, path: str = CACHE_PATH_DEFAULT, ttl: Optional[float] = None,
+                 max_bytes: Optional[int] = None):
+        self.path = path
+        self.ttl = ttl if ttl is not None else float(os.getenv("HTTP_CACHE_TTL", "600"))
+        self.max_bytes = max_bytes if max_bytes is not None else int(float(os.getenv("HTTP_CACHE_MAX_MB", "256")) * 1024 * 1024)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # Backfill workers share one cache file; wait out each other's writes
+        # instead of failing a fetch with "database is locked"
+        self.conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False, timeout=BUSY_TIMEOUT)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                url TEXT,
+                status INTEGER,
+                headers TEXT,
+                body BLOB,
+                size INTEGER,
+                fetched_at REAL,
+                accessed_at REAL
+            )
+            """
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed_at)")
+        self._lock = threading.Lock()
+        self.total_bytes = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return the entry for `key` ({"response", "fetched_at", "etag", "last_modified"}) or None."""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT url, status, headers, body, fetched_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self.conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        # requests is imported here so reading `cache_mode()` stays cheap
+        import requests
+        from requests.structures import CaseInsensitiveDict
+
+        url, status, headers, body, fetched_at = row
+        resp = requests.Response()
+        resp.status_code = status
+        resp.url = url
+        resp.headers = CaseInsensitiveDict(json.loads(headers))
+        resp._content = body
+        resp.encoding = requests.utils.get_encoding_from_headers(resp.headers) or "utf-8"
+        return {
+            "response": resp,
+            "fetched_at": fetched_at,
+            "etag": resp.headers.get("ETag"),
+            "last_modified": resp.headers.get("Last-Modified"),
+        }
+
+    def is_fresh(self, entry: Dict) -> bool:
+        return time.time() - entry["fetched_at"] < self.ttl
+
+    def put(self, key: str, resp) -> None:
+        headers = {h: resp.headers[h] for h in _KEEP_HEADERS if h in resp.headers}
+        body = resp.content
+        now = time.time()
+        with self._lock:
+            old = self.conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses (key, url, status, headers, body, size, fetched_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, resp.url, resp.status_code, json.dumps(headers), body, len(body), now, now),
+            )
+            self.total_bytes += len(body) - (old[0] if old else 0)
+            if self.total_bytes > self.max_bytes:
+                self._evict(int(self.max_bytes * 0.9))
+
+    def touch(self, key: str) -> None:
+        """Mark a revalidated (304) entry as freshly fetched."""
+        now = time.time()
+        with self._lock:
+            self.conn.execute("UPDATE responses SET fetched_at = ?, accessed_at = ? WHERE key = ?", (now, now, key))
+
+    def _evict(self, target: int) -> None:
+        cur = self.conn.execute("SELECT key, size FROM responses ORDER BY accessed_at")
+        doomed = []
+        for key, size in cur:
+            if self.total_bytes <= target:
+                break
+            doomed.append((key,))
+            self.total_bytes -= size
+        self.conn.executemany("DELETE FROM responses WHERE key = ?", doomed)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.conn.execute("DELETE FROM responses")
+            self.total_bytes = 0
+
+    def info(self) -> Dict[str, int]:
+        with self._lock:
+            entries = self.conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        return {"hits": self.hits, "misses": self.misses, "revalidated": self.revalidated,
+                "entries": entries, "bytes": self.total_bytes}
+
+    def close(self) -> None:
+        with self._lock:
+            self.conn.close()
+
+
+def cache_mode() -> str:
+    """HTTP_CACHE mode.
+
+    - `off` (default): no cache. Scheduled sources poll more often than
+      entries stay fresh, so live collection must always hit the API.
+    - `on`: serve fresh entries, revalidate stale ones (backfills, re-runs).
+    - `record`: always hit the network and store every response, with
+      incremental cursors off so the snapshot is complete.
+    - `replay`: serve only from the cache and never touch the network.
+    """
+    mode = os.getenv("HTTP_CACHE", "off").strip().lower()
+    return mode if mode in MODES else "off"
@@ -0,0 +1,154 @@
+# utils/language.py
+import os
+import re
+import time
+from typing import Dict, List, Optional, Sequence
+
+from utils.cache import LRUCache
+from utils.hashing import content_hash
+from utils.parallel import get_process_pool
+
+# Function words that are frequent in English and rare as whole words in
+# other Latin-script languages ("in", "is", "to", "a" are deliberately left out).
+ENGLISH_MARKERS = frozenset((
+    "the", "and", "of", "with", "that", "this", "for", "you", "are", "was",
+    "have", "has", "from", "what", "which", "would", "there", "their", "been",
+    "were", "will", "your", "about", "just", "how", "they", "it's", "don't",
+))
+_WORD_RE = re.compile(r"[^\W\d_]+(?:'[^\W\d_]+)?")
+
+PATHS = ("tagged", "cached", "prefilter", "detected")
+
+# Verdicts outlive a single LanguageFilter so the long-running scheduler
+# doesn't re-detect texts it has already seen.
+_shared_cache = LRUCache(int(os.getenv("LANG_CACHE_SIZE", "100000")))
+
+
+def _detect_chunk(texts: List[str]) -> List[bool]:
+    """langdetect a chunk of texts; runs inline or inside a pool worker."""
+    from langdetect import detect, DetectorFactory
+    # make language detection deterministic (also in fresh worker processes)
+    DetectorFactory.seed = 0
+    out = []
+    for text in texts:
+        try:
+            out.append(detect(text) == "en")
+        except Exception:
+            out.append(False)
+    return out
+
+
+def prefilter(text: str) -> Optional[bool]:
+    """Cheap verdict for obvious cases, None when langdetect is needed.
+
+    Mostly non-Latin text is rejected outright; text with several distinct
+    English function words, making up a real share of its words, is
+    accepted.
+    """
+    words = _WORD_RE.findall(text.lower())
+    if not words:
+        return False
+    latin = sum(1 for w in words if w.isascii())
+    if latin / len(words) < 0.5:
+        return False
+    markers = [w for w in words if w in ENGLISH_MARKERS]
+    if len(set(markers)) >= 2 and len(markers) / len(words) >= 0.1:
+        return True
+    return None
+
+
+class LanguageFilter:
+    """English-only filter stage, cheapest path first.
+
+    1. `tagged`: trust a platform-supplied language tag (record["lang"],
+       e.g. Twitter v2 `lang`, Mastodon `language`).
+    2. `cached`: reuse an earlier verdict for the same text (content hash LRU).
+    3. `prefilter`: decide obvious cases with the stopword/script heuristic.
+    4. `detected`: batch the rest through langdetect, across a process pool
+       when `workers` > 1 and the batch is large enough.
+
+    `stats` holds the number of records and seconds spent on each path.
+    """
+
+    def __init__(self, workers: Optional[int] = None, min_parallel: int = 500,
+                 chunk_size: int = 200, cache: Optional[LRUCache] = None):
+        self.workers = workers if workers is not None else int(os.getenv("LANG_DETECT_WORKERS", "1"))
+        self.min_parallel = min_parallel
+        self.chunk_size = chunk_size
+        self.cache = cache if cache is not None else _shared_cache
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        self.stats: Dict[str, Dict[str, float]] = {p: {"records": 0, "seconds": 0.0} for p in PATHS}
+
+    def _account(self, path: str, records: int, seconds: float) -> None:
+        self.stats[path]["records"] += records
+        self.stats[path]["seconds"] += seconds
+
+    def filter(self, records: Sequence[Dict]) -> List[Dict]:
+        """Return the records whose text is English, preserving order."""
+        verdicts: List[Optional[bool]] = [None] * len(records)
+
+        start = time.perf_counter()
+        n = 0
+        for idx, r in enumerate(records):
+            tag = r.get("lang")
+            if tag and tag not in ("und", "zxx"):
+                verdicts[idx] = str(tag).lower().startswith("en")
+                n += 1
+        self._account("tagged", n, time.perf_counter() - start)
+
+        start = time.perf_counter()
+        n = 0
+        keys = {}
+        for idx, r in enumerate(records):
+            if verdicts[idx] is not None:
+                continue
+            key = keys[idx] = content_hash(r.get("text") or "")
+            cached = self.cache.get(key)
+            if cached is not None:
+                verdicts[idx] = cached
+                n += 1
+        self._account("cached", n, time.perf_counter() - start)
+
+        start = time.perf_counter()
+        n = 0
+        undecided: List[int] = []
+        for idx, r in enumerate(records):
+            if verdicts[idx] is not None:
+                continue
+            verdict = prefilter(r.get("text") or "")
+            if verdict is None:
+                undecided.append(idx)
+                continue
+            verdicts[idx] = verdict
+            self.cache.put(keys[idx], verdict)
+            n += 1
+        self._account("prefilter", n, time.perf_counter() - start)
+
+        if undecided:
+            start = time.perf_counter()
+            # Duplicates inside the batch are detected once
+            by_key: Dict[str, List[int]] = {}
+            for idx in undecided:
+                by_key.setdefault(keys[idx], []).append(idx)
+            unique = list(by_key)
+            texts = [records[by_key[k][0]].get("text") or "" for k in unique]
+            chunks = [texts[i:i + self.chunk_size] for i in range(0, len(texts), self.chunk_size)]
+            if self.workers > 1 and len(texts) >= self.min_parallel:
+                results = get_process_pool(self.workers).map(_detect_chunk, chunks)
+            else:
+                results = map(_detect_chunk, chunks)
+            flat = [v for chunk in results for v in chunk]
+            for key, verdict in zip(unique, flat):
+                self.cache.put(key, verdict)
+                for idx in by_key[key]:
+                    verdicts[idx] = verdict
+            self._account("detected", len(undecided), time.perf_counter() - start)
+
+        return [r for r, keep in zip(records, verdicts) if keep]
+
+    def format_stats(self) -> str:
+        return ", ".join(
+            f"{p} {int(s['records'])} ({s['seconds']:.2f}s)" for p, s in self.stats.items()
+        )
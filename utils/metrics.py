@@ -0,0 +1,241 @@
+# utils/metrics.py - per-run pipeline metrics (JSON lines, Prometheus text) and an opt-in stage profiler
+import itertools
+import json
+import os
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterable, List, Optional
+
+from utils.database import DB_DIR
+
+METRICS_DIR = os.getenv("OSINT_METRICS_DIR", os.path.join(DB_DIR, "metrics"))
+RUNS_PATH_DEFAULT = os.path.join(METRICS_DIR, "runs.jsonl")
+PROM_PATH_DEFAULT = os.path.join(METRICS_DIR, "osint.prom")
+PROFILERS = ("cprofile", "pyinstrument")
+
+_last_run: Optional["RunMetrics"] = None
+_last_lock = threading.Lock()
+_write_lock = threading.Lock()
+_run_seq = itertools.count(1)  # run ids stay unique when the scheduler starts runs in the same second
+
+
+def _label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+class RunMetrics:
+    """Everything measured about one pipeline run.
+
+    - `stages`: wall and CPU seconds inside each stage, records in/out,
+      batches and seconds blocked on a full downstream queue.
+    - `collectors`: wall and CPU seconds, records and status per job.
+    - `drops`: records removed, by reason (too_short, non_english,
+      duplicate, already_stored).
+    - `quota`: last API quota seen per host (remaining/limit/reset).
+
+    `write()` appends the run as one JSON line and rewrites a Prometheus
+    text file (for node_exporter's textfile collector); `serve()` exposes
+    the latest run over HTTP.
+
+    `cpu` is this run's own threads only (the calling thread plus its
+    stages and collectors, each measured with thread_time), so concurrent
+    runs in one process don't count each other's work. Work handed to the
+    shared process pools is not included.
+    """
+
+    def __init__(self, sources: Optional[Iterable[str]] = None):
+        self.started = time.time()
+        self.run_id = time.strftime("%Y%m%dT%H%M%SZ", time.gmtime(self.started)) + f"-{os.getpid()}-{next(_run_seq)}"
+        self.sources = sorted(sources) if sources is not None else None
+        self._cpu_start = time.thread_time()
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.status = "running"
+        self.error: Optional[str] = None
+        self.stages: Dict[str, Dict] = {}
+        self.collectors: Dict[str, Dict] = {}
+        self.drops: Counter = Counter()
+        self.quota: Dict[str, Dict[str, float]] = {}
+
+    def record_pipeline(self, pipeline) -> None:
+        """Copy per-stage counters from a `utils.pipeline.Pipeline`."""
+        self.stages["collect"] = {"blocked": round(pipeline.collect_blocked, 4)}
+        for s in pipeline.stages:
+            self.stages[s.name] = {
+                "wall": round(s.busy, 4), "cpu": round(s.cpu, 4),
+                "records_in": s.records_in, "records_out": s.records_out,
+                "batches": s.batches, "blocked": round(s.blocked, 4),
+            }
+            if s.drop_reason and s.records_in > s.records_out:
+                self.drops[s.drop_reason] += s.records_in - s.records_out
+
+    def record_collectors(self, results) -> None:
+        for r in results:
+            status = "timeout" if r.timed_out else "error" if r.error else "ok"
+            self.collectors[r.name] = {"wall": round(r.elapsed, 4), "cpu": round(r.cpu, 4),
+                                       "records": r.count, "status": status}
+
+    def record_quota(self, quota: Dict[str, Dict[str, float]]) -> None:
+        self.quota = {host: dict(values) for host, values in quota.items()}
+
+    def finish(self, status: str = "ok", error: Optional[str] = None) -> "RunMetrics":
+        global _last_run
+        self.wall = time.time() - self.started
+        self.cpu = (time.thread_time() - self._cpu_start
+                    + sum(s.get("cpu", 0.0) for s in self.stages.values())
+                    + sum(c["cpu"] for c in self.collectors.values()))
+        self.status = status
+        self.error = error
+        with _last_lock:
+            _last_run = self
+        return self
+
+    def to_dict(self) -> Dict:
+        return {
+            "run_id": self.run_id, "started": round(self.started, 3), "wall": round(self.wall, 4),
+            "cpu": round(self.cpu, 4), "status": self.status, "error": self.error, "sources": self.sources,
+            "stages": self.stages, "collectors": self.collectors, "drops": dict(self.drops), "quota": self.quota,
+        }
+
+    def to_prometheus(self) -> str:
+        lines: List[str] = []
+
+        def metric(name, help_text, samples):
+            lines.append(f"# HELP osint_{name} {help_text}")
+            lines.append(f"# TYPE osint_{name} gauge")
+            for labels, value in samples:
+                label_str = ",".join(f'{k}="{_label(v)}"' for k, v in labels.items())
+                lines.append(f"osint_{name}{{{label_str}}} {value}" if label_str else f"osint_{name} {value}")
+
+        metric("run_timestamp_seconds", "Start time of the last run.", [({}, self.started)])
+        metric("run_wall_seconds", "Wall time of the last run.", [({}, self.wall)])
+        metric("run_cpu_seconds", "CPU time of the last run's threads.", [({}, self.cpu)])
+        metric("run_success", "1 if the last run completed.", [({}, int(self.status == "ok"))])
+        stages = [(name, s) for name, s in self.stages.items() if "wall" in s]
+        metric("stage_wall_seconds", "Wall time spent inside each stage.", [({"stage": n}, s["wall"]) for n, s in stages])
+        metric("stage_cpu_seconds", "CPU time spent inside each stage.", [({"stage": n}, s["cpu"]) for n, s in stages])
+        metric("stage_records_in", "Records entering each stage.", [({"stage": n}, s["records_in"]) for n, s in stages])
+        metric("stage_records_out", "Records leaving each stage.", [({"stage": n}, s["records_out"]) for n, s in stages])
+        metric("stage_blocked_seconds", "Time each stage waited on a full downstream queue.",
+               [({"stage": n}, s["blocked"]) for n, s in self.stages.items()])
+        metric("collector_wall_seconds", "Wall time per collector job.",
+               [({"collector": n}, c["wall"]) for n, c in self.collectors.items()])
+        metric("collector_cpu_seconds", "CPU time per collector job.",
+               [({"collector": n}, c["cpu"]) for n, c in self.collectors.items()])
+        metric("collector_records", "Records fetched per collector job.",
+               [({"collector": n, "status": c["status"]}, c["records"]) for n, c in self.collectors.items()])
+        metric("dropped_records", "Records dropped in the last run, by reason.",
+               [({"reason": r}, n) for r, n in sorted(self.drops.items())])
+        for key in ("remaining", "limit"):
+            metric(f"api_quota_{key}", f"Last API quota {key} reported per host.",
+                   [({"host": h}, q[key]) for h, q in sorted(self.quota.items()) if key in q])
+        return "\n".join(lines) + "\n"
+
+    def write(self, runs_path: str = RUNS_PATH_DEFAULT, prom_path: Optional[str] = PROM_PATH_DEFAULT) -> None:
+        # Scheduler runs finish on their own threads; one writer at a time
+        # keeps lines whole and the shared .tmp name from being clobbered
+        with _write_lock:
+            os.makedirs(os.path.dirname(runs_path) or ".", exist_ok=True)
+            with open(runs_path, "a", encoding="utf-8") as fh:
+                fh.write(json.dumps(self.to_dict(), separators=(",", ":")) + "\n")
+            if prom_path:
+                os.makedirs(os.path.dirname(prom_path) or ".", exist_ok=True)
+                tmp = prom_path + ".tmp"
+                with open(tmp, "w", encoding="utf-8") as fh:
+                    fh.write(self.to_prometheus())
+                os.replace(tmp, prom_path)  # scrapers never see a half-written file
+
+    def format_drops(self) -> str:
+        return ", ".join(f"{reason} {n}" for reason, n in self.drops.most_common()) or "none"
+
+
+def last_run() -> Optional[RunMetrics]:
+    with _last_lock:
+        return _last_run
+
+
+def serve(port: int, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+    """Expose the latest finished run at http://host:port/metrics in Prometheus text format."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.rstrip("/") not in ("", "/metrics"):
+                self.send_error(404)
+                return
+            run = last_run()
+            body = (run.to_prometheus() if run else "").encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+
+class StageProfiler:
+    """Profile every call of one stage with cProfile or pyinstrument.
+
+    Enable with PROFILE_STAGE=<stage> (normalize, lang, dedupe, score,
+    persist) and optionally PROFILER=pyinstrument. The profiler runs on
+    the stage's own thread around each batch, so the report covers only
+    that stage. `report()` saves it next to the run metrics and prints the
+    hottest functions.
+    """
+
+    def __init__(self, stage: str, kind: str = "cprofile"):
+        if kind not in PROFILERS:
+            raise ValueError(f"unknown profiler {kind!r}; expected one of {PROFILERS}")
+        self.stage = stage
+        self.kind = kind
+        if kind == "pyinstrument":
+            from pyinstrument import Profiler
+            self._profiler = Profiler()
+        else:
+            import cProfile
+            self._profiler = cProfile.Profile()
+
+    def wrap(self, fn: Callable) -> Callable:
+        profiler = self._profiler
+
+        def profiled(records):
+            if self.kind == "pyinstrument":
+                profiler.start()
+                try:
+                    return fn(records)
+                finally:
+                    profiler.stop()
+            return profiler.runcall(fn, records)
+
+        return profiled
+
+    def report(self, run_id: str, top: int = 15) -> Optional[str]:
+        os.makedirs(METRICS_DIR, exist_ok=True)
+        base = os.path.join(METRICS_DIR, f"profile-{self.stage}-{run_id}")
+        if self.kind == "pyinstrument":
+            if self._profiler.last_session is None:
+                return None
+            path = base + ".html"
+            with open(path, "w", encoding="utf-8") as fh:
+                fh.write(self._profiler.output_html())
+            print(self._profiler.output_text(unicode=True, color=False))
+            return path
+        import pstats
+        path = base + ".prof"
+        self._profiler.dump_stats(path)
+        pstats.Stats(path).sort_stats("cumulative").print_stats(top)
+        return path
+
+
+def profiler_from_env() -> Optional[StageProfiler]:
+    stage = os.getenv("PROFILE_STAGE", "").strip()
+    if not stage:
+        return None
+    return StageProfiler(stage, os.getenv("PROFILER", "cprofile").strip().lower())
@@ -0,0 +1,35 @@
+# utils/parallel.py
+import atexit
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict
+
+_pools: Dict[int, ProcessPoolExecutor] = {}
+_pool_lock = threading.Lock()
+
+
+def get_process_pool(workers: int) -> ProcessPoolExecutor:
+    """Return a process pool shared by the CPU-heavy stages (sentiment, language detection, charts).
+
+    Worker start-up (interpreter + TextBlob/langdetect imports) is the
+    expensive part, so pools are kept for the life of the process. There is
+    one pool per worker count, and a pool is never shut down while the
+    process runs: stages on other threads (the pipeline scores and detects
+    languages concurrently) may still be submitting to it.
+    """
+    with _pool_lock:
+        pool = _pools.get(workers)
+        if pool is None:
+            pool = _pools[workers] = ProcessPoolExecutor(max_workers=workers)
+        return pool
+
+
+def shutdown_process_pool() -> None:
+    with _pool_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown(wait=True)
+
+
+atexit.register(shutdown_process_pool)
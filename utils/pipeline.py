@@ -0,0 +1,292 @@
+# utils/pipeline.py - staged streaming pipeline with bounded queues
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Union
+
+from utils.concurrency import CollectorResult
+
+StageFn = Callable[[List[Dict]], Union[List[Dict], int]]
+
+_END = object()
+
+
+@dataclass
+class Batch:
+    """Records from one collector job travelling between stages."""
+    job: str
+    records: List[Dict]
+
+
+@dataclass
+class JobEnd:
+    """In-band marker that follows a job's last batch through every stage.
+
+    Stages flush their buffers before forwarding it, so once it leaves the
+    last stage every record of the job has been persisted.
+    """
+    result: CollectorResult
+
+
+@dataclass
+class Stage:
+    """One pipeline step, run on its own thread.
+
+    Incoming records are regrouped into batches of `batch_size` (a batch
+    never mixes jobs) and passed to `fn`, which returns the records to
+    forward. The last stage is a sink and may return a count instead.
+    Records a stage does not forward are counted under `drop_reason`.
+    """
+    name: str
+    fn: StageFn
+    batch_size: int = 500
+    drop_reason: Optional[str] = None
+    records_in: int = 0
+    records_out: int = 0
+    batches: int = 0
+    busy: float = 0.0      # seconds inside fn
+    cpu: float = 0.0       # CPU seconds of the stage thread inside fn
+    blocked: float = 0.0   # seconds waiting for room downstream (backpressure)
+    per_job: Dict[str, List[int]] = field(default_factory=dict)
+
+
+class PipelineError(RuntimeError):
+    """A stage raised; the original exception is chained as __cause__."""
+
+
+class CommitGate:
+    """Commit a stateful stage's transaction only once its output is persisted.
+
+    The near-duplicate index marks texts as seen inside an open transaction.
+    With stages running concurrently, batches it has passed may still be
+    queued for scoring or saving, so `passed()` counts records leaving the
+    stage and `persisted()` counts them into the database; the transaction
+    is committed whenever nothing is in between. Under steady load that
+    point may never come on its own, so once `commit_every` records have
+    passed or `commit_interval` seconds have gone by since the last commit,
+    `__enter__` holds the stage back until the downstream stages drain and
+    the commit happens. After `max_pending` records in flight the stage
+    waits as well, so the transaction stays bounded in size and age.
+    """
+
+    def __init__(self, commit: Callable[[], None], max_pending: int = 5000,
+                 commit_every: int = 20_000, commit_interval: float = 10.0):
+        self.commit = commit
+        self.max_pending = max_pending
+        self.commit_every = commit_every
+        self.commit_interval = commit_interval
+        self.pending = 0
+        self.uncommitted = 0
+        self._opened_at: Optional[float] = None
+        self._cond = threading.Condition()
+        self._stopped = False
+
+    def _commit_due(self) -> bool:
+        return self.uncommitted >= self.commit_every or (
+            self._opened_at is not None and time.monotonic() - self._opened_at >= self.commit_interval)
+
+    def _commit(self) -> None:
+        self.commit()
+        self.uncommitted = 0
+        self._opened_at = None
+        self._cond.notify_all()
+
+    def __enter__(self):
+        self._cond.acquire()
+        while not self._stopped and (self.pending >= self.max_pending or (self.pending and self._commit_due())):
+            self._cond.wait(0.1)
+        if self._opened_at is None:
+            self._opened_at = time.monotonic()
+        return self
+
+    def __exit__(self, *exc):
+        self._cond.release()
+
+    def passed(self, n: int) -> None:
+        """Called inside `with gate:` after the guarded stage forwarded `n` records."""
+        self.pending += n
+        self.uncommitted += n
+        if self.pending <= 0:
+            # Nothing in flight (e.g. a batch of duplicates): its index updates can commit now
+            self._commit()
+
+    def persisted(self, n: int) -> None:
+        with self._cond:
+            self.pending -= n
+            if self.pending <= 0:
+                self.pending = 0
+                self._commit()
+
+    def stop(self) -> None:
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+
+
+class Pipeline:
+    """Run `stages` concurrently, each fed by a bounded queue of `queue_size` batches.
+
+    The caller's thread is the collect stage: `run()` drains `source` (the
+    `CollectorResult` stream of `utils.concurrency.run_collectors`) into the
+    first queue. A full queue blocks the stage in front of it, and the
+    collector threads behind that, so memory is bounded by the queue and
+    batch sizes instead of the run volume. Each batch is committed by the
+    sink stage as soon as it gets there; a failure later in the run loses at
+    most the batches still in flight.
+
+    `on_job_end(result)` runs on the sink's thread when a job's marker has
+    passed every stage, i.e. after all of the job's records are stored.
+    `gates` are released when the pipeline aborts so no stage waits forever.
+    """
+
+    def __init__(self, stages: Sequence[Stage], queue_size: int = 4,
+                 on_job_end: Optional[Callable[[CollectorResult], None]] = None,
+                 gates: Sequence[CommitGate] = ()):
+        if not stages:
+            raise ValueError("pipeline needs at least one stage")
+        self.stages = list(stages)
+        self.queue_size = max(1, queue_size)
+        self.on_job_end = on_job_end
+        self.gates = list(gates)
+        self.stop = threading.Event()
+        self.error: Optional[BaseException] = None
+        self.failed_stage: Optional[str] = None
+        self.collect_blocked = 0.0
+
+    def _abort(self) -> None:
+        self.stop.set()
+        for gate in self.gates:
+            gate.stop()
+
+    def _put(self, q: "queue.Queue", item) -> Optional[float]:
+        """Blocking put that gives up when the pipeline stops; returns the time spent waiting."""
+        start = time.perf_counter()
+        while not self.stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return time.perf_counter() - start
+            except queue.Full:
+                continue
+        return None
+
+    def _get(self, q: "queue.Queue"):
+        while not self.stop.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _END
+
+    def _process(self, stage: Stage, job: str, records: List[Dict], out: Optional["queue.Queue"]) -> bool:
+        start, cpu_start = time.perf_counter(), time.thread_time()
+        result = stage.fn(records)
+        stage.busy += time.perf_counter() - start
+        stage.cpu += time.thread_time() - cpu_start
+        n_out = result if isinstance(result, int) else len(result)
+        stage.batches += 1
+        stage.records_in += len(records)
+        stage.records_out += n_out
+        counts = stage.per_job.setdefault(job, [0, 0])
+        counts[0] += len(records)
+        counts[1] += n_out
+        if out is None or isinstance(result, int) or not result:
+            return True
+        waited = self._put(out, Batch(job, result))
+        if waited is None:
+            return False
+        stage.blocked += waited
+        return True
+
+    def _run_stage(self, stage: Stage, inq: "queue.Queue", out: Optional["queue.Queue"]) -> None:
+        buf: List[Dict] = []
+        job: Optional[str] = None
+
+        def flush() -> bool:
+            nonlocal buf
+            ok = not buf or self._process(stage, job, buf, out)
+            buf = []
+            return ok
+
+        try:
+            while True:
+                item = self._get(inq)
+                if item is _END:
+                    if self.stop.is_set():
+                        return
+                    if flush() and out is not None:
+                        self._put(out, _END)
+                    return
+                if isinstance(item, JobEnd):
+                    if not flush():
+                        return
+                    if out is not None:
+                        if self._put(out, item) is None:
+                            return
+                    elif self.on_job_end is not None:
+                        self.on_job_end(item.result)
+                    continue
+                if job is not None and item.job != job and not flush():
+                    return
+                job = item.job
+                buf.extend(item.records)
+                while len(buf) >= stage.batch_size:
+                    head, buf = buf[:stage.batch_size], buf[stage.batch_size:]
+                    if not self._process(stage, job, head, out):
+                        return
+        except BaseException as e:
+            if self.error is None:
+                self.error, self.failed_stage = e, stage.name
+            self._abort()
+
+    def run(self, source: Iterable[CollectorResult]) -> List[CollectorResult]:
+        """Feed `source` through the stages; returns the final per-job results.
+
+        Raises PipelineError if a stage failed. Everything committed before
+        the failure stays committed.
+        """
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        threads = []
+        for i, stage in enumerate(self.stages):
+            out = queues[i + 1] if i + 1 < len(self.stages) else None
+            t = threading.Thread(target=self._run_stage, args=(stage, queues[i], out),
+                                 name=f"stage-{stage.name}", daemon=True)
+            t.start()
+            threads.append(t)
+
+        results = []
+        first = queues[0]
+        source_iter = iter(source)
+        try:
+            for result in source_iter:
+                item = JobEnd(result) if result.done else Batch(result.name, result.records)
+                if result.done:
+                    results.append(result)
+                waited = self._put(first, item)
+                if waited is None:
+                    break
+                self.collect_blocked += waited
+            else:
+                self._put(first, _END)
+        except BaseException:
+            self._abort()
+            raise
+        finally:
+            close = getattr(source_iter, "close", None)
+            if close is not None and self.stop.is_set():
+                close()
+            for t in threads:
+                t.join()
+
+        if self.error is not None:
+            raise PipelineError(f"stage {self.failed_stage} failed: "
+                                f"{type(self.error).__name__}: {self.error}") from self.error
+        return results
+
+    def format_stats(self) -> str:
+        """Per-stage table: records in/out, batches, wall and CPU time, backpressure time."""
+        lines = [f"   {'collect':<10} {'':>8} {'':>8} {'':>7} {'':>8} {'':>8} {self.collect_blocked:8.2f}s blocked"]
+        for s in self.stages:
+            lines.append(f"   {s.name:<10} {s.records_in:8d} {s.records_out:8d} {s.batches:7d} "
+                         f"{s.busy:7.2f}s {s.cpu:7.2f}s {s.blocked:8.2f}s blocked")
+        return "\n".join(lines)
@@ -0,0 +1,77 @@
+# utils/record.py - compact record type produced by every collector
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+FIELDS = ("platform", "user", "timestamp", "text", "url", "ts", "lang", "source_id", "sentiment")
+_FIELD_SET = frozenset(FIELDS)
+
+
+class Record:
+    """One collected post, with a fixed set of slots instead of a per-record dict.
+
+    A `__slots__` instance is about a third of the size of the equivalent
+    dict and has no per-instance `__dict__`, so the objects queued between
+    pipeline stages stay small. Stages update the same object in place
+    (cleaned text, sentiment) rather than copying it.
+
+    It keeps the mapping-style access the pipeline was written against
+    (`r.get("text")`, `r["sentiment"] = ...`) for the known fields; unknown
+    keys raise KeyError on assignment and read as missing.
+    """
+
+    __slots__ = FIELDS
+
+    def __init__(self, platform: Optional[str] = None, user: Any = "unknown", timestamp: Any = "",
+                 text: Optional[str] = "", url: Optional[str] = "", ts: Optional[int] = None,
+                 lang: Optional[str] = None, source_id: Optional[int] = None,
+                 sentiment: Optional[float] = None):
+        self.platform = platform
+        self.user = user
+        self.timestamp = timestamp
+        self.text = text
+        self.url = url
+        self.ts = ts
+        self.lang = lang
+        self.source_id = source_id
+        self.sentiment = sentiment
+
+    @classmethod
+    def from_dict(cls, d: Dict) -> "Record":
+        """Build a Record from a collector-shaped dict, ignoring unknown keys."""
+        if isinstance(d, Record):
+            return d
+        return cls(**{k: v for k, v in d.items() if k in _FIELD_SET})
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {k: getattr(self, k) for k in FIELDS}
+
+    # --- mapping-style access ----------------------------------------------
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key) if key in _FIELD_SET else default
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in _FIELD_SET:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key not in _FIELD_SET:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key: str) -> bool:
+        return key in _FIELD_SET
+
+    def keys(self) -> Tuple[str, ...]:
+        return FIELDS
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        return ((k, getattr(self, k)) for k in FIELDS)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Record):
+            return all(getattr(self, k) == getattr(other, k) for k in FIELDS)
+        return NotImplemented
+
+    def __repr__(self):
+        return f"Record(platform={self.platform!r}, user={self.user!r}, url={self.url!r})"
@@ -0,0 +1,139 @@
+# utils/search.py - ranked full-text search over collected posts
+#
+#   python -m utils.search "credential dump"
+#   python -m utils.search "lockbit ransomware" --phrase --platform reddit --since 2025-10-01
+#   python -m utils.search 'phish* NOT kit' --raw --limit 50
+import argparse
+import sqlite3
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from utils.cleaner import clean_text
+from utils.database import DB_PATH_DEFAULT, _ensure_db
+from utils.timeutil import to_epoch
+
+MODES = ("terms", "phrase", "raw")
+
+
+def _quote(term: str) -> str:
+    # An FTS5 string: matched as a phrase, no operators or column filters
+    return '"' + term.replace('"', '""') + '"'
+
+
+def build_match(query: str, mode: str = "terms") -> str:
+    """Turn user input into an FTS5 MATCH expression.
+
+    The index holds the cleaned text, in which punctuation is deleted and
+    URLs are removed (utils.cleaner.clean_text), so `terms` and `phrase`
+    queries are cleaned the same way first. An IOC such as `evil.com`,
+    `1.2.3.4` or `CVE-2024-3094` then matches the token it was stored as
+    (`evilcom`, `1234`, `CVE20243094`); URLs cannot be searched.
+
+    - `terms`: every word must occur, in any order.
+    - `phrase`: the words must occur next to each other, in order.
+    - `raw`: the query is passed through as FTS5 syntax (AND/OR/NOT,
+      `prefix*`, "phrases", NEAR(...)) and is not cleaned.
+    """
+    if mode not in MODES:
+        raise ValueError(f"mode must be one of {MODES}, got {mode!r}")
+    if mode == "raw":
+        return query
+    if mode == "phrase":
+        phrase = clean_text(query)
+        return _quote(phrase) if phrase else ""
+    return " ".join(_quote(t) for t in clean_text(query).split())
+
+
+def search(query: str,
+           platform: Optional[str] = None,
+           since=None,
+           until=None,
+           limit: int = 20,
+           mode: str = "terms",
+           db_path: str = DB_PATH_DEFAULT) -> List[Dict]:
+    """Search osint_data by relevance (BM25), best match first.
+
+    `since`/`until` bound the post time as [since, until) and take anything
+    `utils.timeutil.to_epoch` understands (epoch seconds, ISO dates). Each
+    hit is a dict with the row's columns, a highlighted `snippet` and its
+    `score` (lower is more relevant, as FTS5 ranks).
+    """
+    match = build_match(query, mode)
+    if not match.strip():
+        return []
+    clauses = ["osint_fts MATCH ?"]
+    params: list = [match]
+    if platform is not None:
+        clauses.append("d.platform = ?")
+        params.append(platform)
+    if since is not None:
+        clauses.append("d.ts >= ?")
+        params.append(to_epoch(since))
+    if until is not None:
+        clauses.append("d.ts < ?")
+        params.append(to_epoch(until))
+    params.append(int(limit))
+    sql = f"""
+        SELECT d.id, d.platform, d.user, d.timestamp, d.ts, d.url, d.sentiment,
+               snippet(osint_fts, 0, '[', ']', '…', 16) AS snippet,
+               rank AS score
+        FROM osint_fts JOIN osint_data d ON d.id = osint_fts.rowid
+        WHERE {' AND '.join(clauses)}
+        ORDER BY rank
+        LIMIT ?
+    """
+    _ensure_db(db_path)
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    try:
+        return [dict(row) for row in conn.execute(sql, params)]
+    except sqlite3.OperationalError as e:
+        if "fts5" in str(e):
+            raise ValueError(f"invalid search query {match!r}: {e}") from None
+        raise
+    finally:
+        conn.close()
+
+
+def count(query: str, mode: str = "terms", db_path: str = DB_PATH_DEFAULT) -> int:
+    """Number of posts matching `query` (no ranking)."""
+    match = build_match(query, mode)
+    if not match.strip():
+        return 0
+    _ensure_db(db_path)
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM osint_fts WHERE osint_fts MATCH ?", (match,)).fetchone()[0]
+    finally:
+        conn.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Full-text search over collected OSINT posts.")
+    parser.add_argument("query")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--phrase", action="store_true", help="match the words as an exact phrase")
+    group.add_argument("--raw", action="store_true", help="pass the query through as FTS5 syntax")
+    parser.add_argument("--platform", help="only this platform (e.g. reddit, twitter)")
+    parser.add_argument("--since", help="posts at or after this time (ISO date or epoch)")
+    parser.add_argument("--until", help="posts before this time (ISO date or epoch)")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--db", default=DB_PATH_DEFAULT, help="database path")
+    args = parser.parse_args(argv)
+
+    mode = "phrase" if args.phrase else "raw" if args.raw else "terms"
+    try:
+        hits = search(args.query, platform=args.platform, since=args.since, until=args.until,
+                      limit=args.limit, mode=mode, db_path=args.db)
+    except ValueError as e:
+        parser.error(str(e))
+    for hit in hits:
+        when = datetime.fromtimestamp(hit["ts"], tz=timezone.utc).strftime("%Y-%m-%d") if hit["ts"] is not None else "?"
+        print(f"{hit['score']:7.2f}  {hit['platform']:<13} {when}  {hit['user']}")
+        print(f"         {hit['snippet']}")
+        print(f"         {hit['url']}")
+    print(f"🔎 {len(hits)} result(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,26 +1,207 @@
-from textblob import TextBlob
-from typing import Union
+import os
+import re
+import threading
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple, Union
+
+from utils.cache import LRUCache
+from utils.hashing import content_hash
+from utils.parallel import get_process_pool
+from utils.record import Record
+
+# numpy is imported by score_batch, so importing the pipeline doesn't load it
+if TYPE_CHECKING:
+    import numpy as np
+
+BACKENDS = ("textblob", "lexicon")
+DEFAULT_BACKEND = os.getenv("SENTIMENT_BACKEND", "textblob")
+
+
+# LRU of polarity scores keyed by content hash: duplicate texts across
+# platforms and, in the long-running scheduler, across runs are scored once.
+_cache = LRUCache(int(os.getenv("SENTIMENT_CACHE_SIZE", "100000")))
+
+
+def cache_info() -> dict:
+    """Hit/miss counters and size of the shared sentiment cache."""
+    return _cache.info()
+
+
+def _cache_key(text: str, backend: str) -> str:
+    # TextBlob scores keep the bare content hash; other backends are namespaced
+    key = content_hash(text)
+    return key if backend == "textblob" else f"{backend}:{key}"
+
+
+# --- lexicon backend ---------------------------------------------------------
+
+NEGATIONS = frozenset(("no", "not", "n't", "never"))
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?=n't)|n't|[a-z0-9]+(?:'[a-z]+)?|!")
+_lexicon: Optional[Dict[str, Tuple[float, float, bool]]] = None
+_lexicon_lock = threading.Lock()
+
+
+def _load_lexicon() -> Dict[str, Tuple[float, float, bool]]:
+    """Compile TextBlob's pattern lexicon into a flat {word: (polarity, intensity, is_modifier)} dict.
+
+    Built once per process; scoring is then a dict lookup per token instead
+    of TextBlob's tokenizer, Blob objects and nested per-POS dicts.
+    """
+    global _lexicon
+    if _lexicon is None:
+        with _lexicon_lock:
+            if _lexicon is None:
+                from textblob.en import sentiment as pattern_lexicon
+                pattern_lexicon.load()
+                compiled = {}
+                for word, senses in dict.items(pattern_lexicon):
+                    if None not in senses:
+                        continue
+                    p, _, i = senses[None]
+                    compiled[word] = (p, i, "RB" in senses or word.endswith("ly"))
+                _lexicon = compiled
+    return _lexicon
+
+
+def lexicon_polarity(text: str) -> float:
+    """Fast approximation of TextBlob polarity using the precompiled lexicon.
+
+    Mirrors pattern's rules: a modifier ("very") scales the next known word
+    by its intensity, a negation ("not") flips the score to -0.5x, "!"
+    boosts the previous assessment, and the result is the mean over the
+    known words.
+    """
+    lexicon = _lexicon if _lexicon is not None else _load_lexicon()
+    scores: List[List[float]] = []  # [polarity, intensity, negated]
+    modifier = False
+    negation = False
+    for w in _TOKEN_RE.findall(text.lower()):
+        entry = lexicon.get(w)
+        if entry is not None:
+            p, i, is_modifier = entry
+            if modifier and scores:
+                scores[-1][0] = max(-1.0, min(p * scores[-1][1], 1.0))
+                scores[-1][1] = i
+            else:
+                scores.append([p, i, 0])
+            if negation:
+                scores[-1][1] = 1.0 / scores[-1][1] if scores[-1][1] else 1.0
+                scores[-1][2] = 1
+            modifier = is_modifier
+            negation = w in NEGATIONS
+        else:
+            if w in NEGATIONS:
+                negation = True
+            elif negation and len(w.strip("'")) > 1:
+                negation = False
+            if negation and modifier and scores:
+                scores[-1][2] = 1
+                negation = False
+            elif modifier and len(w) > 2:
+                modifier = False
+            if w == "!" and scores:
+                scores[-1][0] = max(-1.0, min(scores[-1][0] * 1.25, 1.0))
+    if not scores:
+        return 0.0
+    return sum(p * -0.5 if neg else p for p, _, neg in scores) / len(scores)
+
+
+# --- scoring API -------------------------------------------------------------
+
+def _score_one(text: str, backend: str) -> float:
+    try:
+        if backend == "lexicon":
+            return lexicon_polarity(text)
+        from textblob import TextBlob
+        return TextBlob(text).sentiment.polarity
+    except Exception:
+        return 0.0
+
+
+def _score_chunk(args: Tuple[List[str], str]) -> List[float]:
+    texts, backend = args
+    return [_score_one(t, backend) for t in texts]
+
+
+def score_batch(texts: Sequence[str],
+                backend: Optional[str] = None,
+                workers: Optional[int] = None,
+                chunk_size: int = 500,
+                min_parallel: int = 2000) -> "np.ndarray":
+    """Score many texts at once, returning a float64 array aligned with `texts`.
+
+    Cached texts and duplicates inside the batch are scored once. The
+    remaining unique texts are split into `chunk_size` chunks and spread over
+    a process pool when `workers` > 1 and there are at least `min_parallel`
+    of them; smaller batches are scored inline, where pool overhead would
+    dominate. `backend` is "textblob" (reference) or "lexicon" (faster,
+    dictionary-based approximation); defaults come from SENTIMENT_BACKEND
+    and SENTIMENT_WORKERS.
+    """
+    import numpy as np
+    backend = backend or DEFAULT_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown sentiment backend {backend!r}; expected one of {BACKENDS}")
+    if workers is None:
+        workers = int(os.getenv("SENTIMENT_WORKERS", "1"))
+
+    scores = np.zeros(len(texts), dtype=np.float64)
+    todo: Dict[str, List[int]] = {}
+    keys: Dict[str, str] = {}
+    for idx, text in enumerate(texts):
+        text = text if isinstance(text, str) else ("" if text is None else str(text))
+        if not text:
+            continue
+        if text in todo:
+            todo[text].append(idx)
+            continue
+        key = _cache_key(text, backend)
+        cached = _cache.get(key)
+        if cached is not None:
+            scores[idx] = cached
+            continue
+        todo[text] = [idx]
+        keys[text] = key
+
+    unique = list(todo)
+    if not unique:
+        return scores
+
+    chunks = [unique[i:i + chunk_size] for i in range(0, len(unique), chunk_size)]
+    if workers > 1 and len(unique) >= min_parallel:
+        results = get_process_pool(workers).map(_score_chunk, [(c, backend) for c in chunks])
+    else:
+        results = map(_score_chunk, [(c, backend) for c in chunks])
+
+    for chunk, chunk_scores in zip(chunks, results):
+        for text, score in zip(chunk, chunk_scores):
+            _cache.put(keys[text], score)
+            scores[todo[text]] = score
+    return scores
 
 
 def add_sentiment(text: Union[str, dict]) -> float:
     """Add sentiment analysis to text or record.
     
     Args:
-        text: Either a string of text or a dict record
+        text: Either a string of text or a record (Record or dict)
         
     Returns:
         float: Sentiment polarity score (-1.0 to 1.0)
     """
     try:
-        if isinstance(text, dict):
+        if isinstance(text, (dict, Record)):
             text_content = text.get("text", "")
         else:
             text_content = str(text)
             
         if not text_content:
             return 0.0
-            
-        polarity = TextBlob(text_content).sentiment.polarity
+
+        key = _cache_key(text_content, DEFAULT_BACKEND)
+        polarity = _cache.get(key)
+        if polarity is None:
+            polarity = _score_one(text_content, DEFAULT_BACKEND)
+            _cache.put(key, polarity)
         return polarity
     except Exception:
         return 0.0
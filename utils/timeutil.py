@@ -0,0 +1,36 @@
+# utils/timeutil.py
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+
+def to_epoch(value: Any) -> Optional[int]:
+    """Normalise a collector timestamp to integer epoch seconds (UTC).
+
+    Accepts epoch numbers (or numeric strings such as Reddit's
+    "1714564800.0"), datetimes and ISO-8601 strings ("2024-05-01T12:00:00Z",
+    "2024-05-01 12:00:00+00:00"). Naive values are taken as UTC. Returns
+    None for placeholders like "N/A" or anything unparseable.
+    """
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, datetime):
+        dt = value
+    else:
+        s = str(value).strip()
+        if not s:
+            return None
+        try:
+            return int(float(s))
+        except (ValueError, OverflowError):
+            pass
+        if s.endswith("Z"):
+            s = s[:-1] + "+00:00"
+        try:
+            dt = datetime.fromisoformat(s)
+        except ValueError:
+            return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp())
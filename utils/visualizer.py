@@ -1,46 +1,290 @@
 # utils/visualizer.py
+import calendar
+import hashlib
+import json
 import sqlite3
-import pandas as pd
-import matplotlib.pyplot as plt
-from collections import Counter
 import os
+import time
+from utils import columnar
+from utils.database import DB_PATH_DEFAULT, get_daily_sentiment, get_max_id, get_top_terms
 
+# pandas, pyarrow and matplotlib are imported inside the functions that use
+# them so importing this module (and main) stays cheap when no charts are drawn.
 OUTDIR = "screenshots"
-os.makedirs(OUTDIR, exist_ok=True)
+# auto: read the Parquet export (utils.columnar) when there is one, else SQLite
+ANALYTICS_SOURCE = os.getenv("ANALYTICS_SOURCE", "auto").strip().lower()
+POST_COLUMNS = ("id", "platform", "date", "user", "timestamp", "ts", "text", "url", "sentiment", "content_hash")
 
-def plot_sentiment_by_platform(db_path="data/osint.db"):
+
+def _output_path(name):
+    os.makedirs(OUTDIR, exist_ok=True)
+    return os.path.join(OUTDIR, name)
+
+def _parquet_source(db_path, parquet_dir):
+    """The Parquet directory to read instead of db_path, or None to query SQLite."""
+    if ANALYTICS_SOURCE == "sqlite":
+        return None
+    if parquet_dir is None and db_path == DB_PATH_DEFAULT:
+        parquet_dir = columnar.PARQUET_DIR
+    if parquet_dir is not None and columnar.has_export(parquet_dir):
+        return parquet_dir
+    if ANALYTICS_SOURCE == "parquet":
+        raise RuntimeError("ANALYTICS_SOURCE=parquet but there is no Parquet export; run `python -m utils.columnar`")
+    return None
+
+def _day_bounds(since, until):
+    """SQL clauses and params bounding ts to the days [since, until), like the date partitions."""
+    clauses, params = [], []
+    if since is not None:
+        clauses.append("ts >= ?")
+        params.append(calendar.timegm(time.strptime(since, "%Y-%m-%d")))
+    if until is not None:
+        clauses.append("ts < ?")
+        params.append(calendar.timegm(time.strptime(until, "%Y-%m-%d")))
+    return clauses, params
+
+def sentiment_by_platform(db_path=DB_PATH_DEFAULT, platform=None, since=None, until=None, parquet_dir=None):
+    """(platform, average sentiment) pairs, lowest first; `since`/`until` are 'YYYY-MM-DD' days."""
+    # Scores are computed once at ingest (utils.sentiment) and stored in the
+    # `sentiment` column, so the chart only needs a grouped average.
+    source = _parquet_source(db_path, parquet_dir)
+    if source is not None:
+        # Only the sentiment column is read; platform and date come from the partition paths
+        import pyarrow.dataset as ds
+        table = columnar.read_table(["platform", "sentiment"], platform, since, until,
+                                    where=ds.field("sentiment").is_valid(), out_dir=source)
+        agg = table.group_by("platform").aggregate([("sentiment", "mean")])
+        return sorted(zip(agg.column("platform").to_pylist(), agg.column("sentiment_mean").to_pylist()),
+                      key=lambda row: row[1])
+    clauses, params = _day_bounds(since, until)
+    clauses.append("sentiment IS NOT NULL")
+    if platform is not None:
+        clauses.append("platform = ?")
+        params.append(platform)
     conn = sqlite3.connect(db_path)
-    df = pd.read_sql("SELECT platform, text FROM osint_data", conn)
-    conn.close()
-    from textblob import TextBlob
-    df['sentiment'] = df['text'].fillna('').apply(lambda x: TextBlob(x).sentiment.polarity)
-    agg = df.groupby('platform')['sentiment'].mean().sort_values()
-    ax = agg.plot(kind='bar', title='Average Sentiment by Platform', figsize=(8,4))
-    ax.set_ylabel('Average sentiment')
-    plt.tight_layout()
-    out = os.path.join(OUTDIR, "sentiment_by_platform.png")
-    plt.savefig(out)
-    plt.close()
-    print("Saved", out)
+    try:
+        return conn.execute(
+            "SELECT platform, AVG(sentiment) FROM osint_data "
+            f"WHERE {' AND '.join(clauses)} GROUP BY platform ORDER BY 2", params
+        ).fetchall()
+    finally:
+        conn.close()
 
-def plot_top_words(db_path="data/osint.db", top_n=20):
+def load_posts(columns=("platform", "ts", "sentiment"), platform=None, since=None, until=None,
+               db_path=DB_PATH_DEFAULT, parquet_dir=None):
+    """DataFrame of the requested columns for one platform and/or day range, for ad-hoc analysis.
+
+    From the Parquet export only those columns and the matching
+    platform/date partitions are read, into Arrow-backed columns; without
+    an export the same selection is queried from SQLite.
+    """
+    columns = list(columns)
+    unknown = set(columns) - set(POST_COLUMNS)
+    if unknown:
+        raise ValueError(f"unknown columns {sorted(unknown)}; expected some of {POST_COLUMNS}")
+    import pandas as pd
+    source = _parquet_source(db_path, parquet_dir)
+    if source is not None:
+        return columnar.read_table(columns, platform, since, until, out_dir=source).to_pandas(types_mapper=pd.ArrowDtype)
+    clauses, params = _day_bounds(since, until)
+    if platform is not None:
+        clauses.append("platform = ?")
+        params.append(platform)
+    select = ", ".join("strftime('%Y-%m-%d', ts, 'unixepoch') AS date" if c == "date" else c for c in columns)
+    sql = f"SELECT {select} FROM osint_data"
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
     conn = sqlite3.connect(db_path)
-    df = pd.read_sql("SELECT text FROM osint_data", conn)
-    conn.close()
-    all_text = " ".join(df['text'].dropna().values).lower()
-    words = [w for w in all_text.split() if len(w) > 3]
-    c = Counter(words)
-    common = c.most_common(top_n)
+    try:
+        return pd.read_sql_query(sql, conn, params=params)
+    finally:
+        conn.close()
+
+# --- charts -----------------------------------------------------------------
+#
+# Chart data comes from the aggregates maintained at ingest (term_counts,
+# daily_sentiment), never from osint_data itself. `render_charts` redraws a
+# chart only when those inputs changed: an unchanged MAX(id) skips even the
+# aggregate query, and an unchanged data digest skips the drawing.
+
+_agg_ready = False
+
+def _figure(figsize):
+    """A Figure on the non-interactive Agg backend, created without pyplot so charts can render in parallel."""
+    global _agg_ready
+    if not _agg_ready:
+        import matplotlib
+        matplotlib.use("Agg")
+        _agg_ready = True
+    from matplotlib.figure import Figure
+    return Figure(figsize=figsize)
+
+
+def _sentiment_by_platform_data(db_path, platform=None, since=None, until=None):
+    totals = {}
+    for p, _, n, total in get_daily_sentiment(platform, since, until, db_path=db_path):
+        bucket = totals.setdefault(p, [0, 0.0])
+        bucket[0] += n
+        bucket[1] += total
+    return sorted(([p, round(total / n, 6)] for p, (n, total) in totals.items() if n), key=lambda row: row[1])
+
+def _top_words_data(db_path, top_n=20, platform=None, since=None, until=None):
+    return [list(row) for row in get_top_terms(top_n, platform=platform, since=since, until=until, db_path=db_path)]
+
+def _sentiment_over_time_data(db_path, since, platform=None):
+    # Reads only the window's rows of the daily aggregate
+    return [[p, day, round(total / n, 6)] for p, day, n, total in
+            get_daily_sentiment(platform, since, None, db_path=db_path) if n and day]
+
+
+def _draw_sentiment_by_platform(fig, data):
+    ax = fig.add_subplot()
+    platforms, averages = zip(*data)
+    ax.bar(platforms, averages)
+    ax.set_title("Average Sentiment by Platform")
+    ax.set_ylabel("Average sentiment")
+    ax.tick_params(axis="x", rotation=90)
+
+def _draw_top_words(fig, data):
+    ax = fig.add_subplot()
+    words, counts = zip(*data)
+    ax.bar(words, counts)
+    ax.set_title("Top words")
+    for label in ax.get_xticklabels():
+        label.set_rotation(45)
+        label.set_horizontalalignment("right")
+
+def _draw_sentiment_over_time(fig, data):
+    from datetime import date
+    ax = fig.add_subplot()
+    series = {}
+    for platform, day, avg in data:
+        series.setdefault(platform, ([], []))
+        series[platform][0].append(date.fromisoformat(day))
+        series[platform][1].append(avg)
+    for platform, (days, averages) in sorted(series.items()):
+        ax.plot(days, averages, marker=".", label=platform)
+    ax.axhline(0, color="grey", linewidth=0.5)
+    ax.set_title("Daily average sentiment by platform")
+    ax.set_ylabel("Average sentiment")
+    ax.legend(loc="best", fontsize="small")
+    fig.autofmt_xdate()
+
+# name -> (output file, figure size, draw function)
+CHARTS = {
+    "sentiment_by_platform": ("sentiment_by_platform.png", (8, 4), _draw_sentiment_by_platform),
+    "top_words": ("top_words.png", (10, 5), _draw_top_words),
+    "sentiment_over_time": ("sentiment_over_time.png", (10, 5), _draw_sentiment_over_time),
+}
+CHART_DAYS = int(os.getenv("CHART_DAYS", "30"))
+STATE_FILE = ".chart_state.json"
+
+
+def _render(job):
+    """Draw one chart and write its PNG atomically; runs inline or in a pool worker."""
+    name, data, path = job
+    _, figsize, draw = CHARTS[name]
+    fig = _figure(figsize)
+    draw(fig, data)
+    fig.tight_layout()
+    tmp = path + ".tmp"
+    fig.savefig(tmp, format="png")
+    os.replace(tmp, path)
+    return path
+
+def _window(name):
+    # Part of the cache key: the rolling window moves daily even when no data arrives
+    if name == "sentiment_over_time":
+        return {"since": time.strftime("%Y-%m-%d", time.gmtime(time.time() - CHART_DAYS * 86400))}
+    return {}
+
+def _chart_data(name, db_path):
+    """Data for a chart's default view, read from the ingest aggregates."""
+    if name == "sentiment_by_platform":
+        return _sentiment_by_platform_data(db_path)
+    if name == "top_words":
+        return _top_words_data(db_path, 20)
+    return _sentiment_over_time_data(db_path, _window(name)["since"])
+
+def _load_state(path):
+    try:
+        with open(path, encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return {}
+
+def render_charts(db_path=DB_PATH_DEFAULT, charts=tuple(CHARTS), workers=None, force=False):
+    """Redraw the charts whose inputs changed since they were last drawn; returns {chart: status}.
+
+    Status is "rendered", "unchanged" (kept the existing PNG) or "empty".
+    Stale charts are drawn in parallel on the shared process pool when
+    `workers` (default CHART_WORKERS, 2) is above 1.
+    """
+    os.makedirs(OUTDIR, exist_ok=True)
+    state_path = os.path.join(OUTDIR, STATE_FILE)
+    state = _load_state(state_path)
+    watermark = get_max_id(db_path)
+    status, jobs, pending = {}, [], {}
+    for name in charts:
+        path = _output_path(CHARTS[name][0])
+        entry = state.get(name, {})
+        fresh = not force and os.path.exists(path) and entry.get("db_path") == os.path.abspath(db_path)
+        if fresh and entry.get("watermark") == watermark and entry.get("window") == _window(name):
+            status[name] = "unchanged"
+            continue
+        data = _chart_data(name, db_path)
+        if not data:
+            status[name] = "empty"
+            continue
+        digest = hashlib.sha256(json.dumps([_window(name), data]).encode("utf-8")).hexdigest()
+        pending[name] = {"db_path": os.path.abspath(db_path), "watermark": watermark,
+                         "window": _window(name), "digest": digest}
+        if fresh and entry.get("digest") == digest:
+            status[name] = "unchanged"
+            continue
+        jobs.append((name, data, path))
+
+    if workers is None:
+        workers = int(os.getenv("CHART_WORKERS", "2"))
+    if workers > 1 and len(jobs) > 1:
+        from utils.parallel import get_process_pool
+        list(get_process_pool(workers).map(_render, jobs))
+    else:
+        for job in jobs:
+            _render(job)
+    status.update({name: "rendered" for name, _, _ in jobs})
+
+    state.update(pending)
+    with open(state_path + ".tmp", "w", encoding="utf-8") as fh:
+        json.dump(state, fh)
+    os.replace(state_path + ".tmp", state_path)
+    return status
+
+
+def plot_sentiment_by_platform(db_path=DB_PATH_DEFAULT, platform=None, since=None, until=None):
+    data = _sentiment_by_platform_data(db_path, platform, since, until)
+    if not data:
+        print("No sentiment data to plot")
+        return
+    out = _render(("sentiment_by_platform", data, _output_path(CHARTS["sentiment_by_platform"][0])))
+    print("Saved", out)
+
+def plot_top_words(db_path=DB_PATH_DEFAULT, top_n=20, platform=None, since=None, until=None):
+    # Term counts are maintained per platform and day at ingest
+    # (utils.database.term_counts), so this reads aggregates instead of
+    # re-tokenizing the whole corpus.
+    common = _top_words_data(db_path, top_n, platform, since, until)
     if not common:
         print("No words to plot")
         return
-    words, counts = zip(*common)
-    plt.figure(figsize=(10,5))
-    plt.bar(words, counts)
-    plt.xticks(rotation=45, ha='right')
-    plt.title("Top words")
-    plt.tight_layout()
-    out = os.path.join(OUTDIR, "top_words.png")
-    plt.savefig(out)
-    plt.close()
+    out = _render(("top_words", common, _output_path(CHARTS["top_words"][0])))
+    print("Saved", out)
+
+def plot_sentiment_over_time(db_path=DB_PATH_DEFAULT, days=CHART_DAYS, platform=None):
+    since = time.strftime("%Y-%m-%d", time.gmtime(time.time() - days * 86400))
+    data = _sentiment_over_time_data(db_path, since, platform)
+    if not data:
+        print(f"No sentiment data in the last {days} days")
+        return
+    out = _render(("sentiment_over_time", data, _output_path(CHARTS["sentiment_over_time"][0])))
     print("Saved", out)